@@ -23,15 +23,17 @@ def run(
     distribuir: bool = typer.Option(False, "--distribuir", help="Distribuir aos médicos"),
     force: bool = typer.Option(False, "--force", help="Continua mesmo com erros de validação (uso em testes)"),
     retificar: bool = typer.Option(False, "--retificar", help="Usa indRetif=2/ALT para retificar eventos já enviados"),
+    resume: bool = typer.Option(False, "--resume", help="Pula etapas já concluídas (checkpoint) para esta planilha/competência"),
 ):
     """Executa o pipeline completo."""
     console.print(f"[bold blue]IRB EFD-Reinf — Pipeline[/]")
     console.print(f"  Planilha: {planilha}")
     console.print(f"  Período: {ano}-{mes:02d}")
     console.print(f"  Ambiente: [yellow]{settings.reinf_ambiente}[/]")
-    console.print(f"  Enviar: {enviar}  |  Distribuir: {distribuir}  |  Force: {force}  |  Retificar: {retificar}\n")
+    console.print(f"  Enviar: {enviar}  |  Distribuir: {distribuir}  |  Force: {force}  |  Retificar: {retificar}  |  Resume: {resume}\n")
 
-    relatorio = executar_pipeline(planilha, ano, mes, enviar, distribuir, force=force, retificar=retificar)
+    relatorio = executar_pipeline(planilha, ano, mes, enviar, distribuir,
+                                  force=force, retificar=retificar, resume=resume)
 
     console.print("\n[bold green]📊 Relatório:[/]")
     table = Table(show_header=True, header_style="bold magenta")
@@ -40,6 +42,8 @@ def run(
     for etapa, dados in relatorio.get("etapas", {}).items():
         table.add_row(etapa, str(dados))
     console.print(table)
+    if relatorio.get("retomadas"):
+        console.print(f"Retomadas do checkpoint: {', '.join(relatorio['retomadas'])}")
     console.print(f"\nStatus final: [bold]{relatorio.get('status', '?')}[/]")
 
 
@@ -1,11 +1,20 @@
-"""Dashboard FastAPI — visualização do estado dos eventos e distribuições."""
+"""Dashboard FastAPI — visualização do estado dos eventos e distribuições.
+
+As páginas HTML e a API JSON (`/api/resumo`, `/api/eventos`) compartilham as
+mesmas consultas: só as colunas exibidas são lidas (nunca `xml_assinado`), a
+listagem é paginada por keyset `(criado_em, id)` e os resultados ficam num
+cache em memória de TTL curto.
+"""
+import base64
+import time
 from datetime import datetime
 from pathlib import Path
+from typing import Callable, Optional
 
-from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi import Depends, FastAPI, HTTPException, Query, status
 from fastapi.responses import HTMLResponse, FileResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from sqlalchemy import func
+from sqlalchemy import and_, func, or_, select
 
 from irb_reinf.audit.db import (
     Beneficiario, Distribuicao, EventoREINF, get_session, init_db,
@@ -16,6 +25,13 @@ from irb_reinf.config import settings
 app = FastAPI(title="IRB EFD-Reinf — Dashboard")
 security = HTTPBasic()
 
+CACHE_TTL = 5.0          # segundos
+CACHE_MAX_ENTRADAS = 256
+PAGINA_PADRAO = 100
+PAGINA_MAX = 500
+
+_cache: dict[tuple, tuple[float, object]] = {}
+
 
 def auth(creds: HTTPBasicCredentials = Depends(security)):
     if creds.username != settings.dashboard_user or creds.password != settings.dashboard_pass:
@@ -28,15 +44,129 @@ def _startup():
     init_db()
 
 
+def _cached(chave: tuple, fn: Callable[[], object], ttl: float = CACHE_TTL):
+    """Devolve o valor em cache para `chave` ou recalcula com `fn()`."""
+    agora = time.monotonic()
+    hit = _cache.get(chave)
+    if hit and hit[0] > agora:
+        return hit[1]
+    valor = fn()
+    if len(_cache) >= CACHE_MAX_ENTRADAS:
+        _cache.clear()
+    _cache[chave] = (agora + ttl, valor)
+    return valor
+
+
+def _encode_cursor(criado_em: datetime, ev_id: str) -> str:
+    raw = f"{criado_em.isoformat()}|{ev_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, ev_id = raw.split("|", 1)
+        return datetime.fromisoformat(ts), ev_id
+    except Exception:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="cursor 'after' inválido")
+
+
+def _resumo() -> dict:
+    """Agregados do painel: 1 GROUP BY nos eventos + 1 linha de contagens."""
+    with get_session() as s:
+        grupos = s.execute(
+            select(EventoREINF.status, EventoREINF.tipo, func.count())
+            .group_by(EventoREINF.status, EventoREINF.tipo)
+        ).all()
+        tot_benef, tot_dist, dist_ok = s.execute(
+            select(
+                select(func.count()).select_from(Beneficiario).scalar_subquery(),
+                select(func.count()).select_from(Distribuicao).scalar_subquery(),
+                select(func.count()).select_from(Distribuicao)
+                .where(Distribuicao.status == "ok").scalar_subquery(),
+            )
+        ).one()
+
+    por_status: dict[str, int] = {}
+    por_tipo: dict[str, int] = {}
+    for st, tipo, n in grupos:
+        por_status[st] = por_status.get(st, 0) + n
+        por_tipo[tipo] = por_tipo.get(tipo, 0) + n
+    return {
+        "eventos": sum(por_status.values()),
+        "por_status": por_status,
+        "por_tipo": por_tipo,
+        "beneficiarios": tot_benef,
+        "distribuicoes": tot_dist,
+        "distribuicoes_ok": dist_ok,
+    }
+
+
+def _pagina_eventos(
+    after: Optional[str] = None,
+    limit: int = PAGINA_PADRAO,
+    status_evt: Optional[str] = None,
+    tipo: Optional[str] = None,
+) -> dict:
+    """Uma página de eventos (mais recentes primeiro) sem carregar o XML."""
+    stmt = select(
+        EventoREINF.id, EventoREINF.tipo, EventoREINF.cpf_cnpj_benef,
+        EventoREINF.perApur, EventoREINF.status, EventoREINF.protocolo,
+        EventoREINF.recibo, EventoREINF.criado_em,
+    )
+    if after:
+        ts, ev_id = _decode_cursor(after)
+        stmt = stmt.where(or_(
+            EventoREINF.criado_em < ts,
+            and_(EventoREINF.criado_em == ts, EventoREINF.id < ev_id),
+        ))
+    if status_evt:
+        stmt = stmt.where(EventoREINF.status == status_evt)
+    if tipo:
+        stmt = stmt.where(EventoREINF.tipo == tipo)
+    stmt = stmt.order_by(EventoREINF.criado_em.desc(), EventoREINF.id.desc()).limit(limit + 1)
+
+    with get_session() as s:
+        rows = s.execute(stmt).all()
+
+    tem_mais = len(rows) > limit
+    rows = rows[:limit]
+    items = [
+        {
+            "id": r.id, "tipo": r.tipo, "cpf_cnpj_benef": r.cpf_cnpj_benef,
+            "perApur": r.perApur, "status": r.status, "protocolo": r.protocolo,
+            "recibo": r.recibo, "criado_em": r.criado_em.isoformat() if r.criado_em else None,
+        }
+        for r in rows
+    ]
+    proximo = _encode_cursor(rows[-1].criado_em, rows[-1].id) if tem_mais and rows[-1].criado_em else None
+    return {"items": items, "next": proximo}
+
+
+@app.get("/api/resumo")
+def api_resumo(_: str = Depends(auth)):
+    return _cached(("resumo",), _resumo)
+
+
+@app.get("/api/eventos")
+def api_eventos(
+    after: Optional[str] = Query(None, description="cursor devolvido em 'next'"),
+    limit: int = Query(PAGINA_PADRAO, ge=1, le=PAGINA_MAX),
+    status_evt: Optional[str] = Query(None, alias="status"),
+    tipo: Optional[str] = None,
+    _: str = Depends(auth),
+):
+    return _cached(
+        ("eventos", after, limit, status_evt, tipo),
+        lambda: _pagina_eventos(after, limit, status_evt, tipo),
+    )
+
+
 @app.get("/", response_class=HTMLResponse)
 def home(_: str = Depends(auth)):
-    with get_session() as s:
-        tot_evt = s.query(EventoREINF).count()
-        por_status = dict(s.query(EventoREINF.status, func.count()).group_by(EventoREINF.status).all())
-        por_tipo = dict(s.query(EventoREINF.tipo, func.count()).group_by(EventoREINF.tipo).all())
-        tot_benef = s.query(Beneficiario).count()
-        tot_dist = s.query(Distribuicao).count()
-        dist_ok = s.query(Distribuicao).filter(Distribuicao.status == "ok").count()
+    r = _cached(("resumo",), _resumo)
+    tot_evt, por_status, por_tipo = r["eventos"], r["por_status"], r["por_tipo"]
+    tot_benef, tot_dist, dist_ok = r["beneficiarios"], r["distribuicoes"], r["distribuicoes_ok"]
 
     return f"""
     <html><head><title>IRB EFD-Reinf</title>
@@ -79,18 +209,26 @@ def home(_: str = Depends(auth)):
 
 
 @app.get("/eventos", response_class=HTMLResponse)
-def eventos(_: str = Depends(auth)):
-    with get_session() as s:
-        evs = s.query(EventoREINF).order_by(EventoREINF.criado_em.desc()).limit(500).all()
+def eventos(
+    after: Optional[str] = None,
+    limit: int = Query(PAGINA_PADRAO, ge=1, le=PAGINA_MAX),
+    _: str = Depends(auth),
+):
+    pagina = _cached(("eventos", after, limit, None, None), lambda: _pagina_eventos(after, limit))
     rows = []
-    for e in evs:
-        st_class = "ok" if e.status == "sucesso" else ("erro" if e.status == "erro" else "pending")
+    for e in pagina["items"]:
+        st_class = "ok" if e["status"] == "sucesso" else ("erro" if e["status"] == "erro" else "pending")
+        criado = datetime.fromisoformat(e["criado_em"]).strftime('%d/%m %H:%M') if e["criado_em"] else ""
         rows.append(f"""<tr>
-            <td>{e.id[:24]}…</td><td>{e.tipo}</td>
-            <td>{e.cpf_cnpj_benef or ''}</td><td>{e.perApur or ''}</td>
-            <td><span class="badge {st_class}">{e.status}</span></td>
-            <td>{e.protocolo or ''}</td><td>{e.criado_em.strftime('%d/%m %H:%M')}</td>
+            <td>{e["id"][:24]}…</td><td>{e["tipo"]}</td>
+            <td>{e["cpf_cnpj_benef"] or ''}</td><td>{e["perApur"] or ''}</td>
+            <td><span class="badge {st_class}">{e["status"]}</span></td>
+            <td>{e["protocolo"] or ''}</td><td>{criado}</td>
         </tr>""")
+    proxima = (
+        f'<a href="/eventos?after={pagina["next"]}&limit={limit}">próxima página →</a>'
+        if pagina["next"] else ""
+    )
     return f"""
     <html><head><title>Eventos</title><style>
       body {{font-family:-apple-system,sans-serif;background:#f7f8fb;padding:24px}}
@@ -102,10 +240,10 @@ def eventos(_: str = Depends(auth)):
       .badge.erro{{background:#fee2e2;color:#991b1b}}
       .badge.pending{{background:#fef9c3;color:#854d0e}}
     </style></head><body>
-    <h1>Eventos REINF (últimos 500)</h1>
+    <h1>Eventos REINF (mais recentes)</h1>
     <table><tr><th>ID</th><th>Tipo</th><th>Benef.</th><th>perApur</th><th>Status</th><th>Protocolo</th><th>Criado</th></tr>
     {''.join(rows)}
     </table>
-    <p><a href="/">← voltar</a></p>
+    <p><a href="/">← voltar</a> {proxima}</p>
     </body></html>
     """
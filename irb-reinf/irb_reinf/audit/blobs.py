@@ -0,0 +1,44 @@
+"""Armazenamento endereçado por conteúdo dos XMLs assinados.
+
+Cada XML é gravado uma única vez, comprimido com gzip, em
+`{blob_dir}/ab/abcdef....xml.gz`, onde o nome é o SHA-256 do XML original.
+A tabela `eventos_reinf` guarda só o hash e o tamanho; o conteúdo é lido sob
+demanda. XMLs idênticos (reenvios, retificações sem mudança) ocupam um só
+arquivo.
+"""
+import gzip
+import hashlib
+import os
+from pathlib import Path
+
+from irb_reinf.config import settings
+
+
+def _caminho(sha256: str, base: Path | None = None) -> Path:
+    base = Path(base or settings.blob_dir)
+    return base / sha256[:2] / f"{sha256}.xml.gz"
+
+
+def salvar_xml(xml: str, base: Path | str | None = None) -> tuple[str, int]:
+    """Grava o XML (se ainda não existir) e devolve (sha256, tamanho_em_bytes)."""
+    dados = xml.encode("utf-8")
+    sha256 = hashlib.sha256(dados).hexdigest()
+    destino = _caminho(sha256, base)
+    if not destino.exists():
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        tmp = destino.with_suffix(f".tmp{os.getpid()}")
+        tmp.write_bytes(gzip.compress(dados, compresslevel=6))
+        os.replace(tmp, destino)  # atômico: leitores nunca veem arquivo parcial
+    return sha256, len(dados)
+
+
+def carregar_xml(sha256: str, base: Path | str | None = None) -> str:
+    """Lê e descomprime o XML do hash informado."""
+    destino = _caminho(sha256, base)
+    if not destino.exists():
+        raise FileNotFoundError(f"Blob XML não encontrado: {sha256}")
+    return gzip.decompress(destino.read_bytes()).decode("utf-8")
+
+
+def existe(sha256: str, base: Path | str | None = None) -> bool:
+    return _caminho(sha256, base).exists()
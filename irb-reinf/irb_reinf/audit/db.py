@@ -4,10 +4,12 @@ from pathlib import Path
 from typing import Optional
 
 from sqlalchemy import (
-    Column, DateTime, ForeignKey, Integer, String, Text, create_engine, Numeric,
+    Column, DateTime, ForeignKey, Index, Integer, String, Text, create_engine, Numeric,
+    inspect, text,
 )
 from sqlalchemy.orm import DeclarativeBase, Session, relationship
 
+from irb_reinf.audit import blobs
 from irb_reinf.config import settings, DATA_DIR
 
 
@@ -25,7 +27,8 @@ class EventoREINF(Base):
     tipo = Column(String(8))                           # R-1000 / R-1050 / R-4010 / etc.
     cpf_cnpj_benef = Column(String(14), nullable=True)
     perApur = Column(String(7))
-    xml_assinado = Column(Text)
+    xml_sha256 = Column(String(64), nullable=True)     # conteúdo em audit/blobs.py
+    xml_tamanho = Column(Integer, nullable=True)       # bytes do XML descomprimido
     status = Column(String(20), default="gerado")
     protocolo = Column(String(60), nullable=True)
     recibo = Column(String(60), nullable=True)
@@ -34,6 +37,27 @@ class EventoREINF(Base):
     enviado_em = Column(DateTime, nullable=True)
     confirmado_em = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        # paginação keyset do dashboard (ORDER BY criado_em DESC, id DESC)
+        Index("ix_eventos_reinf_criado_id", "criado_em", "id"),
+        # contagens agrupadas do painel saem só do índice, sem ler xml_assinado
+        Index("ix_eventos_reinf_status_tipo", "status", "tipo"),
+    )
+
+    @property
+    def xml_assinado(self) -> Optional[str]:
+        """XML do evento, lido do blob store só quando acessado."""
+        if not self.xml_sha256:
+            return None
+        return blobs.carregar_xml(self.xml_sha256)
+
+    @xml_assinado.setter
+    def xml_assinado(self, xml: Optional[str]) -> None:
+        if xml is None:
+            self.xml_sha256, self.xml_tamanho = None, None
+        else:
+            self.xml_sha256, self.xml_tamanho = blobs.salvar_xml(xml)
+
 
 class Beneficiario(Base):
     __tablename__ = "beneficiarios"
@@ -57,11 +81,61 @@ class Distribuicao(Base):
     visualizado_em = Column(DateTime, nullable=True)
 
 
+class Checkpoint(Base):
+    """Etapa concluída do pipeline, por competência + hash da planilha."""
+    __tablename__ = "pipeline_checkpoints"
+    competencia = Column(String(7), primary_key=True)    # AAAA-MM
+    chave = Column(String(64), primary_key=True)         # SHA-256 da entrada
+    etapa = Column(String(30), primary_key=True)         # leitura | geracao_xml | ...
+    relatorio = Column(Text)                             # JSON das entradas em relatorio["etapas"]
+    dados = Column(Text)                                 # JSON para restaurar a saída da etapa
+    concluido_em = Column(DateTime, default=datetime.utcnow)
+
+
 _engine = create_engine(settings.database_url, future=True)
 
 
+def _migrar_xml_para_blobs(lote: int = 500) -> None:
+    """Move o antigo `eventos_reinf.xml_assinado` (TEXT) para o blob store.
+
+    Bancos criados antes do blob store têm a coluna TEXT e não têm
+    `xml_sha256`/`xml_tamanho`. A coluna antiga é esvaziada, não removida.
+    Migra em lotes por id, com commit a cada lote: a memória fica limitada
+    a um lote e uma interrupção não desfaz o que já foi migrado.
+    """
+    cols = {c["name"] for c in inspect(_engine).get_columns("eventos_reinf")}
+    with _engine.begin() as conn:
+        if "xml_sha256" not in cols:
+            conn.execute(text("ALTER TABLE eventos_reinf ADD COLUMN xml_sha256 VARCHAR(64)"))
+            conn.execute(text("ALTER TABLE eventos_reinf ADD COLUMN xml_tamanho INTEGER"))
+    if "xml_assinado" not in cols:
+        return
+    ultimo = ""
+    while True:
+        with _engine.begin() as conn:
+            rows = conn.execute(text(
+                "SELECT id, xml_assinado FROM eventos_reinf "
+                "WHERE xml_assinado IS NOT NULL AND id > :ultimo ORDER BY id LIMIT :n"
+            ), {"ultimo": ultimo, "n": lote}).all()
+            for ev_id, xml in rows:
+                sha256, tamanho = blobs.salvar_xml(xml)
+                conn.execute(
+                    text("UPDATE eventos_reinf SET xml_sha256 = :h, xml_tamanho = :t, "
+                         "xml_assinado = NULL WHERE id = :id"),
+                    {"h": sha256, "t": tamanho, "id": ev_id},
+                )
+        if len(rows) < lote:
+            return
+        ultimo = rows[-1][0]
+
+
 def init_db():
     Base.metadata.create_all(_engine)
+    _migrar_xml_para_blobs()
+    # create_all ignora índices novos em tabelas que já existem
+    for table in Base.metadata.sorted_tables:
+        for idx in table.indexes:
+            idx.create(_engine, checkfirst=True)
 
 
 def get_session() -> Session:
@@ -0,0 +1,92 @@
+"""Ingestão dos recibos (nrRecArqBase) devolvidos na consulta de protocolo.
+
+A resposta do lote é lida com `iterparse` (sem montar a árvore inteira) e os
+recibos aceitos são aplicados em um único UPDATE executemany por id do evento.
+"""
+from io import BytesIO
+from typing import NamedTuple
+
+from lxml import etree
+from sqlalchemy import bindparam, select, update
+
+from irb_reinf.audit.db import EventoREINF, get_session
+
+
+LOTE_IN = 500  # ids por cláusula IN (limite de variáveis do SQLite)
+
+
+class Recibo(NamedTuple):
+    id_evento: str
+    recibo: str
+    status: str
+    cpf_benef: str | None = None
+
+
+def _texto(elem: etree._Element, tag: str) -> str | None:
+    el = elem.find(f".//{{*}}{tag}")
+    return el.text.strip() if el is not None and el.text else None
+
+
+def extrair_recibos(xml: str | bytes) -> list[Recibo]:
+    """Devolve os eventos aceitos (cdRetorno=0) da resposta de consulta."""
+    if isinstance(xml, str):
+        xml = xml.encode("utf-8")
+    recibos: list[Recibo] = []
+    for _, evento in etree.iterparse(BytesIO(xml), events=("end",), tag="{*}evento"):
+        if next(evento.iterancestors("{*}evento"), None) is not None:
+            continue  # evento aninhado: tratado junto com o externo
+        if _texto(evento, "cdRetorno") == "0":
+            id_ev = _texto(evento, "idEv")
+            nr_rec = _texto(evento, "nrRecArqBase")
+            if id_ev and nr_rec:
+                recibos.append(Recibo(id_ev, nr_rec, "aceito", _texto(evento, "cpfBenef")))
+        evento.clear()
+        while evento.getprevious() is not None:
+            del evento.getparent()[0]
+    return recibos
+
+
+def aplicar_recibos(recibos: list[Recibo], per_apur: str) -> int:
+    """Grava recibo/status nos EventoREINF. Devolve quantos eventos foram atualizados.
+
+    Eventos cujo idEv não bate com a chave local caem no fallback por
+    CPF + período (R-4010/R-4020), resolvido com uma única consulta.
+    """
+    if not recibos:
+        return 0
+    with get_session() as s:
+        ids = [r.id_evento for r in recibos]
+        existentes: set[str] = set()
+        for i in range(0, len(ids), LOTE_IN):
+            existentes.update(s.execute(
+                select(EventoREINF.id).where(EventoREINF.id.in_(ids[i:i + LOTE_IN]))
+            ).scalars())
+
+        orfaos = {r.cpf_benef: r for r in recibos if r.id_evento not in existentes and r.cpf_benef}
+        por_cpf: dict[str, str] = {}
+        if orfaos:
+            rows = s.execute(
+                select(EventoREINF.cpf_cnpj_benef, EventoREINF.id).where(
+                    EventoREINF.perApur == per_apur,
+                    EventoREINF.tipo.in_(["R-4010", "R-4020"]),
+                    EventoREINF.cpf_cnpj_benef.in_(list(orfaos)),
+                )
+            ).all()
+            for cpf, ev_id in rows:
+                por_cpf.setdefault(cpf, ev_id)
+
+        params = [
+            {"b_id": r.id_evento, "recibo": r.recibo, "status": r.status}
+            for r in recibos if r.id_evento in existentes
+        ] + [
+            {"b_id": por_cpf[cpf], "recibo": r.recibo, "status": r.status}
+            for cpf, r in orfaos.items() if cpf in por_cpf
+        ]
+        if params:
+            tabela = EventoREINF.__table__
+            s.execute(
+                update(tabela).where(tabela.c.id == bindparam("b_id")),
+                params,
+            )
+        s.commit()
+    return len(params)
@@ -2,7 +2,7 @@
 from pathlib import Path
 from typing import Literal
 
-from pydantic import Field
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -59,6 +59,13 @@ class Settings(BaseSettings):
 
     # DB
     database_url: str = "sqlite:///data/irb-reinf.db"
+    blob_dir: Path = DATA_DIR / "blobs"   # XMLs assinados (gzip, por SHA-256)
+
+    @field_validator("blob_dir")
+    @classmethod
+    def _blob_dir_absoluto(cls, v: Path) -> Path:
+        """Relativo ao DATA_DIR, não ao diretório de onde o CLI/dashboard rodou."""
+        return v if v.is_absolute() else DATA_DIR / v
 
     # ============ derivados ============
     @property
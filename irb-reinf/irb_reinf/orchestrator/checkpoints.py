@@ -0,0 +1,44 @@
+"""Checkpoints persistidos das etapas do pipeline (tabela `pipeline_checkpoints`).
+
+Cada etapa concluída grava o trecho do relatório que produziu e os dados
+necessários para restaurar sua saída, sob a chave (competência, hash da
+entrada). `irb-reinf run --resume` restaura as etapas já concluídas em vez
+de reexecutá-las.
+"""
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+from irb_reinf.audit.db import Checkpoint, get_session
+
+
+def hash_entrada(planilha: Path | str, **variantes) -> str:
+    """SHA-256 do conteúdo da planilha + opções que mudam a saída (ex.: retificar)."""
+    h = hashlib.sha256()
+    with open(planilha, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    for k in sorted(variantes):
+        h.update(f"|{k}={variantes[k]}".encode())
+    return h.hexdigest()
+
+
+def carregar(competencia: str, chave: str, etapa: str) -> dict | None:
+    """Devolve {relatorio, dados} da etapa concluída, ou None."""
+    with get_session() as s:
+        cp = s.get(Checkpoint, (competencia, chave, etapa))
+        if cp is None:
+            return None
+        return {"relatorio": json.loads(cp.relatorio), "dados": json.loads(cp.dados)}
+
+
+def salvar(competencia: str, chave: str, etapa: str, relatorio: dict, dados: dict) -> None:
+    with get_session() as s:
+        s.merge(Checkpoint(
+            competencia=competencia, chave=chave, etapa=etapa,
+            relatorio=json.dumps(relatorio, default=str),
+            dados=json.dumps(dados, default=str),
+            concluido_em=datetime.utcnow(),
+        ))
+        s.commit()
@@ -9,17 +9,28 @@
 7. Gera PDFs do comprovante
 8. Distribui aos beneficiários (email + WhatsApp)
 9. Tudo registrado no SQLite
+
+Cada etapa grava um checkpoint (orchestrator/checkpoints.py); com
+`resume=True` as etapas já concluídas para a mesma competência e planilha
+são restauradas em vez de reexecutadas.
 """
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
+from decimal import Decimal
 from pathlib import Path
 from typing import Iterable
 
 from loguru import logger
+from lxml import etree
+from sqlalchemy import select
 
+from irb_reinf.audit import blobs
 from irb_reinf.audit.db import (
     Beneficiario as BenefDB, Distribuicao, EventoREINF, get_session, init_db,
 )
+from irb_reinf.audit.recibos import aplicar_recibos, extrair_recibos
 from irb_reinf.config import DATA_DIR, settings
 from irb_reinf.distribution.email_sender import enviar_email_informe
 from irb_reinf.distribution.whatsapp_uazapi import enviar_pdf_whatsapp
@@ -31,6 +42,7 @@ from irb_reinf.generators.xml_r4010 import gerar_r4010
 from irb_reinf.generators.xml_r4020 import gerar_r4020
 from irb_reinf.generators.xml_r4099 import gerar_r4099
 from irb_reinf.models import Pagamento, TipoBenef
+from irb_reinf.orchestrator import checkpoints
 from irb_reinf.signer.xml_signer import assinar_xml
 from irb_reinf.webservice.reinf_client import ReinfClient
 
@@ -38,43 +50,12 @@ from irb_reinf.webservice.reinf_client import ReinfClient
 def _salvar_recibos_db(consulta_resp: dict, competencia_ano: int, competencia_mes: int) -> None:
     """Parseia a resposta de consulta de protocolo e persiste nrRecArqBase nos EventoREINF."""
     try:
-        from lxml import etree as _et
         xml_txt = consulta_resp.get("response_text", "")
         if not xml_txt:
             return
-        root = _et.fromstring(xml_txt.encode())
         per_apur = f"{competencia_ano}-{competencia_mes:02d}"
-        with get_session() as s:
-            for evento in root.findall(".//{*}evento"):
-                cd = evento.find(".//{*}cdRetorno")
-                if cd is None or cd.text != "0":
-                    continue  # só eventos aceitos
-                id_ev = evento.find(".//{*}idEv")
-                nr_rec = evento.find(".//{*}nrRecArqBase")
-                cpf_benef = evento.find(".//{*}cpfBenef")
-                if id_ev is None or nr_rec is None:
-                    continue
-                # atualiza pelo idEv (campo id da tabela)
-                db_evt = s.get(EventoREINF, id_ev.text)
-                if db_evt:
-                    db_evt.recibo = nr_rec.text
-                    db_evt.status = "aceito"
-                else:
-                    # fallback: busca por CPF/período se idEv não bater com chave local
-                    if cpf_benef is not None:
-                        from sqlalchemy import select as _sel
-                        match = s.execute(
-                            _sel(EventoREINF).where(
-                                EventoREINF.cpf_cnpj_benef == cpf_benef.text,
-                                EventoREINF.perApur == per_apur,
-                                EventoREINF.tipo.in_(["R-4010", "R-4020"]),
-                            )
-                        ).scalars().first()
-                        if match:
-                            match.recibo = nr_rec.text
-                            match.status = "aceito"
-            s.commit()
-        logger.info(f"nrRecArqBase persistidos no DB para {per_apur}")
+        n = aplicar_recibos(extrair_recibos(xml_txt), per_apur)
+        logger.info(f"{n} nrRecArqBase persistidos no DB para {per_apur}")
     except Exception as e:
         logger.warning(f"Falha ao salvar recibos no DB: {e}")
 
@@ -117,59 +98,83 @@ def reabrir_periodo(
     return relatorio
 
 
-def executar_pipeline(
-    planilha: Path | str,
-    competencia_ano: int,
-    competencia_mes: int = 12,
-    enviar_para_receita: bool = False,
-    distribuir: bool = False,
-    force: bool = False,
-    retificar: bool = False,
-) -> dict:
-    """Executa o pipeline completo.
+# ============================================================== etapas
+# Cada etapa recebe o contexto, preenche sua saída nele e devolve
+# (entradas do relatório, dados do checkpoint). dados=None significa que a
+# etapa não concluiu e não deve ser marcada como feita. A função de
+# restauração recoloca no contexto a saída gravada no checkpoint.
 
-    Args:
-        retificar: Usa operacao=ALT (indRetif=2) para eventos já enviados anteriormente.
-                   Útil para corrigir dados já registrados na Receita Federal.
-    """
-    init_db()
-    relatorio = {
-        "inicio": datetime.now().isoformat(),
-        "etapas": {},
-    }
+@dataclass
+class _Contexto:
+    planilha: Path
+    competencia_ano: int
+    competencia_mes: int
+    enviar_para_receita: bool
+    distribuir: bool
+    force: bool
+    retificar: bool
+    chave: str = ""
+    relatorio: dict = field(default_factory=dict)
+    pagamentos: list[Pagamento] = field(default_factory=list)
+    xmls: list[tuple[str, str | None, str]] = field(default_factory=list)
+    xmls_assinados: list[tuple[str, str | None, str]] = field(default_factory=list)
+    assinatura_completa: bool = False
+    pdfs_gerados: list[tuple[Pagamento, Path]] = field(default_factory=list)
 
-    # ===== 1. Ler planilha =====
-    pagamentos = ler_planilha(planilha)
+    @property
+    def per_apur(self) -> str:
+        return f"{self.competencia_ano}-{self.competencia_mes:02d}"
+
+
+def _xmls_para_blobs(xmls) -> list:
+    return [[tipo, doc, blobs.salvar_xml(xml)[0]] for tipo, doc, xml in xmls]
+
+
+def _xmls_de_blobs(dados) -> list:
+    return [(tipo, doc, blobs.carregar_xml(sha)) for tipo, doc, sha in dados]
+
+
+def _etapa_leitura(ctx: _Contexto):
+    pagamentos = ler_planilha(ctx.planilha)
     val = validar(pagamentos)
-    relatorio["etapas"]["leitura"] = {
-        "registros": len(pagamentos),
-        "validacao": val,
-    }
-    if not val["ok"] and not force:
-        relatorio["status"] = "erro_validacao"
-        return relatorio
-    if not val["ok"] and force:
+    etapas = {"leitura": {"registros": len(pagamentos), "validacao": val}}
+    if not val["ok"] and not ctx.force:
+        return etapas, None
+    if not val["ok"] and ctx.force:
         logger.warning(f"Validacao com avisos (--force): {val}")
 
-    # ===== 2. Persistir beneficiários =====
-    with get_session() as s:
+    # Pré-calcula percentual SCP proporcional ao valor distribuído
+    total_scp = sum(p.vlr_lucros_scp for p in pagamentos if p.vlr_lucros_scp > 0)
+    if total_scp > 0:
         for p in pagamentos:
+            if p.vlr_lucros_scp > 0 and (p.scp_percentual is None or p.scp_percentual <= 0):
+                p.scp_percentual = (p.vlr_lucros_scp / total_scp * 100).quantize(Decimal("0.1"))
+
+    ctx.pagamentos = pagamentos
+    return etapas, {"pagamentos": [p.model_dump(mode="json") for p in pagamentos]}
+
+
+def _restaurar_leitura(ctx: _Contexto, dados: dict) -> None:
+    ctx.pagamentos = [Pagamento.model_validate(p) for p in dados["pagamentos"]]
+
+
+def _etapa_beneficiarios(ctx: _Contexto):
+    with get_session() as s:
+        for p in ctx.pagamentos:
             s.merge(BenefDB(
                 cpf_cnpj=p.cpf_cnpj, tipo=p.tipo.value, nome=p.nome,
             ))
         s.commit()
+    return {}, {}
 
-    # ===== 3. Gerar XMLs =====
-    # Pré-calcula percentual SCP proporcional ao valor distribuído
-    from decimal import Decimal as D
-    total_scp = sum(p.vlr_lucros_scp for p in pagamentos if p.vlr_lucros_scp > 0)
-    if total_scp > 0:
-        for p in pagamentos:
-            if p.vlr_lucros_scp > 0 and (p.scp_percentual is None or p.scp_percentual <= 0):
-                p.scp_percentual = (p.vlr_lucros_scp / total_scp * 100).quantize(D("0.1"))
+
+def _etapa_geracao_xml(ctx: _Contexto):
+    pagamentos = ctx.pagamentos
+    competencia_ano, competencia_mes = ctx.competencia_ano, ctx.competencia_mes
+    retificar = ctx.retificar
 
     xmls = []
-    out_xmls = DATA_DIR / "output" / "xmls" / f"{competencia_ano}-{competencia_mes:02d}"
+    out_xmls = DATA_DIR / "output" / "xmls" / ctx.per_apur
     out_xmls.mkdir(parents=True, exist_ok=True)
 
     op_cadastro = "ALT" if retificar else "INC"  # R-1000 / R-1050
@@ -188,12 +193,11 @@ def executar_pipeline(
         (out_xmls / f"r1050_{seq:03d}.xml").write_text(r1050)
 
     # R-4010 / R-4020
-    per_apur_str = f"{competencia_ano}-{competencia_mes:02d}"
+    per_apur_str = ctx.per_apur
     # Em modo retificação, busca os nrRecibo salvos no DB
     recibos_map: dict[str, str] = {}
     if retificar:
         with get_session() as s:
-            from sqlalchemy import select
             rows = s.execute(
                 select(EventoREINF.cpf_cnpj_benef, EventoREINF.recibo).where(
                     EventoREINF.tipo.in_(["R-4010", "R-4020"]),
@@ -229,148 +233,294 @@ def executar_pipeline(
     xmls.append(("R-4099", None, r4099))
     (out_xmls / f"r4099_{seq:03d}.xml").write_text(r4099)
 
-    relatorio["etapas"]["geracao_xml"] = {"total": len(xmls)}
+    ctx.xmls = xmls
+    return {"geracao_xml": {"total": len(xmls)}}, {"xmls": _xmls_para_blobs(xmls)}
 
-    # ===== 4. Assinar =====
+
+def _restaurar_geracao_xml(ctx: _Contexto, dados: dict) -> None:
+    ctx.xmls = _xmls_de_blobs(dados["xmls"])
+
+
+def _etapa_assinatura(ctx: _Contexto):
+    """Só vira checkpoint se todos os XMLs foram assinados; senão roda de novo no --resume."""
     xmls_assinados = []
     if Path(settings.cert_a1_path).exists() and settings.cert_a1_senha:
-        for tipo, doc, xml in xmls:
+        falhas = 0
+        for tipo, doc, xml in ctx.xmls:
             try:
                 signed = assinar_xml(xml)
                 xmls_assinados.append((tipo, doc, signed))
             except Exception as e:
                 logger.error(f"Falha ao assinar {tipo} {doc}: {e}")
                 xmls_assinados.append((tipo, doc, xml))  # fica não assinado
-        relatorio["etapas"]["assinatura"] = {"assinados": len(xmls_assinados), "ok": True}
+                falhas += 1
+        etapa = {"assinados": len(xmls_assinados) - falhas, "falhas": falhas, "ok": falhas == 0}
     else:
         logger.warning("Certificado não disponível — XMLs não serão assinados")
-        xmls_assinados = xmls
-        relatorio["etapas"]["assinatura"] = {"ok": False, "motivo": "cert ausente"}
+        xmls_assinados = ctx.xmls
+        etapa = {"ok": False, "motivo": "cert ausente"}
 
-    # ===== 5. Persistir eventos no DB =====
+    ctx.xmls_assinados = xmls_assinados
+    ctx.assinatura_completa = etapa["ok"]
+    if not ctx.assinatura_completa:
+        return {"assinatura": etapa}, None
+    return {"assinatura": etapa}, {"xmls": _xmls_para_blobs(xmls_assinados)}
+
+
+def _restaurar_assinatura(ctx: _Contexto, dados: dict) -> None:
+    ctx.xmls_assinados = _xmls_de_blobs(dados["xmls"])
+    ctx.assinatura_completa = True  # só há checkpoint com todos assinados
+
+
+def _etapa_persistencia(ctx: _Contexto):
     with get_session() as s:
-        for tipo, doc, xml in xmls_assinados:
-            from lxml import etree
+        for tipo, doc, xml in ctx.xmls_assinados:
             try:
                 root = etree.fromstring(xml.encode("utf-8"))
                 evt = root.find(".//*[@id]")
-                ev_id = evt.get("id") if evt is not None else f"unknown_{seq}"
+                ev_id = evt.get("id") if evt is not None else f"unknown_{len(ctx.xmls_assinados)}"
             except Exception:
                 ev_id = f"unknown_{datetime.now().timestamp()}"
             s.merge(EventoREINF(
                 id=ev_id, tipo=tipo, cpf_cnpj_benef=doc,
-                perApur=f"{competencia_ano}-{competencia_mes:02d}",
-                xml_assinado=xml, status="assinado",
+                perApur=ctx.per_apur,
+                xml_assinado=xml, status="assinado" if ctx.assinatura_completa else "gerado",
             ))
         s.commit()
-
-    # ===== 6. Enviar à Receita =====
-    if enviar_para_receita:
-        try:
-            with ReinfClient() as c:
-                if retificar:
-                    # Retificação (3 lotes sequenciais):
-                    # Lote 0: reabertura (R-4099 fechRet=0) — abre período se fechado
-                    # Lote 1: eventos ALT (R-1000 + R-1050 + R-4010/R-4020)
-                    # Lote 2: fechamento (R-4099 fechRet=1)
-                    r4099_reabertura = gerar_r4099(
-                        competencia_ano, competencia_mes, sequencial=999, fechar=False,
-                    )
-                    try:
-                        r4099_reabertura = assinar_xml(r4099_reabertura)
-                    except Exception as e:
-                        logger.warning(f"Falha ao assinar reabertura: {e}")
-
-                    lote0 = c.montar_lote([r4099_reabertura])
-                    resp0 = c.enviar_lote(lote0)
-                    relatorio["etapas"]["envio_reabertura"] = resp0
-                    if resp0.get("protocolo"):
-                        for _ in range(20):
-                            time.sleep(5)
-                            st0 = c.consultar_protocolo(resp0["protocolo"])
-                            if st0.get("status_codigo") and st0["status_codigo"] not in ("100", "200"):
-                                relatorio["etapas"]["consulta_reabertura"] = st0
-                                logger.info(f"Reabertura resultado: {st0.get('status_codigo')}")
-                                break
-                    # Reabertura pode falhar (período já aberto) — apenas logamos e seguimos
-
-                    sem_r4099 = [x for t, _, x in xmls_assinados if t != "R-4099"]
-                    so_r4099  = [x for t, _, x in xmls_assinados if t == "R-4099"]
-
-                    if sem_r4099:
-                        lote1 = c.montar_lote(sem_r4099)
-                        resp1 = c.enviar_lote(lote1)
-                        relatorio["etapas"]["envio_retif"] = resp1
-                        if resp1.get("protocolo"):
-                            for _ in range(20):
-                                time.sleep(5)
-                                st1 = c.consultar_protocolo(resp1["protocolo"])
-                                if st1.get("status_codigo") and st1["status_codigo"] not in ("100", "200"):
-                                    relatorio["etapas"]["consulta_retif"] = st1
-                                    _salvar_recibos_db(st1, competencia_ano, competencia_mes)
-                                    break
-
-                    if so_r4099:
-                        lote2 = c.montar_lote(so_r4099)
-                        resp2 = c.enviar_lote(lote2)
-                        relatorio["etapas"]["envio_fechamento"] = resp2
-                        if resp2.get("protocolo"):
-                            for _ in range(20):
-                                time.sleep(5)
-                                st2 = c.consultar_protocolo(resp2["protocolo"])
-                                if st2.get("status_codigo") and st2["status_codigo"] not in ("100", "200"):
-                                    relatorio["etapas"]["consulta_fechamento"] = st2
-                                    break
-                else:
-                    lote = c.montar_lote([x for _, _, x in xmls_assinados])
-                    resp = c.enviar_lote(lote)
-                    relatorio["etapas"]["envio"] = resp
-
-                    if resp.get("protocolo"):
-                        # polling do recibo
-                        for tentativa in range(20):
-                            time.sleep(5)
-                            st = c.consultar_protocolo(resp["protocolo"])
-                            if st.get("status_codigo") and st["status_codigo"] not in ("100", "200"):
-                                relatorio["etapas"]["consulta_protocolo"] = st
-                                _salvar_recibos_db(st, competencia_ano, competencia_mes)
-                                break
-        except Exception as e:
-            logger.exception("Falha no envio à Receita")
-            relatorio["etapas"]["envio"] = {"ok": False, "erro": str(e)}
-
-    # ===== 7. Gerar PDFs =====
-    out_pdfs = DATA_DIR / "output" / "pdfs" / f"{competencia_ano}"
+    # sem assinatura completa, persiste de novo (já assinado) no --resume
+    return {}, ({} if ctx.assinatura_completa else None)
+
+
+def _aguardar_lote(c: ReinfClient, resp: dict) -> dict | None:
+    """Consulta o protocolo até sair de 'em processamento' (100/200); None se não houve protocolo ou esgotou."""
+    if not resp.get("protocolo"):
+        return None
+    for _ in range(20):
+        time.sleep(5)
+        st = c.consultar_protocolo(resp["protocolo"])
+        if st.get("status_codigo") and st["status_codigo"] not in ("100", "200"):
+            return st
+    return None
+
+
+def _lote_aceito(st: dict | None, n_eventos: int) -> bool:
+    """Lote com status final e recibo (cdRetorno=0) para todos os eventos enviados."""
+    if not st or not st.get("ok") or not st.get("response_text"):
+        return False
+    try:
+        return len(extrair_recibos(st["response_text"])) >= n_eventos
+    except etree.XMLSyntaxError:
+        return False
+
+
+def _etapa_envio(ctx: _Contexto):
+    """Só vira checkpoint se todos os lotes obrigatórios foram aceitos pela Receita."""
+    competencia_ano, competencia_mes = ctx.competencia_ano, ctx.competencia_mes
+    xmls_assinados = ctx.xmls_assinados
+    if not ctx.assinatura_completa:
+        logger.error("Envio cancelado: há XMLs não assinados")
+        return {"envio": {"ok": False, "motivo": "XMLs não assinados"}}, None
+    etapas: dict = {}
+    aceito = True
+    try:
+        with ReinfClient() as c:
+            if ctx.retificar:
+                # Retificação (3 lotes sequenciais):
+                # Lote 0: reabertura (R-4099 fechRet=0) — abre período se fechado
+                # Lote 1: eventos ALT (R-1000 + R-1050 + R-4010/R-4020)
+                # Lote 2: fechamento (R-4099 fechRet=1)
+                r4099_reabertura = gerar_r4099(
+                    competencia_ano, competencia_mes, sequencial=999, fechar=False,
+                )
+                try:
+                    r4099_reabertura = assinar_xml(r4099_reabertura)
+                except Exception as e:
+                    logger.warning(f"Falha ao assinar reabertura: {e}")
+
+                lote0 = c.montar_lote([r4099_reabertura])
+                resp0 = c.enviar_lote(lote0)
+                etapas["envio_reabertura"] = resp0
+                st0 = _aguardar_lote(c, resp0)
+                if st0:
+                    etapas["consulta_reabertura"] = st0
+                    logger.info(f"Reabertura resultado: {st0.get('status_codigo')}")
+                # Reabertura pode falhar (período já aberto) — apenas logamos e seguimos
+
+                sem_r4099 = [x for t, _, x in xmls_assinados if t != "R-4099"]
+                so_r4099  = [x for t, _, x in xmls_assinados if t == "R-4099"]
+
+                if sem_r4099:
+                    lote1 = c.montar_lote(sem_r4099)
+                    resp1 = c.enviar_lote(lote1)
+                    etapas["envio_retif"] = resp1
+                    st1 = _aguardar_lote(c, resp1)
+                    if st1:
+                        etapas["consulta_retif"] = st1
+                        _salvar_recibos_db(st1, competencia_ano, competencia_mes)
+                    aceito &= _lote_aceito(st1, len(sem_r4099))
+
+                if so_r4099:
+                    lote2 = c.montar_lote(so_r4099)
+                    resp2 = c.enviar_lote(lote2)
+                    etapas["envio_fechamento"] = resp2
+                    st2 = _aguardar_lote(c, resp2)
+                    if st2:
+                        etapas["consulta_fechamento"] = st2
+                    aceito &= _lote_aceito(st2, len(so_r4099))
+            else:
+                lote = c.montar_lote([x for _, _, x in xmls_assinados])
+                resp = c.enviar_lote(lote)
+                etapas["envio"] = resp
+
+                # polling do recibo
+                st = _aguardar_lote(c, resp)
+                if st:
+                    etapas["consulta_protocolo"] = st
+                    _salvar_recibos_db(st, competencia_ano, competencia_mes)
+                aceito = _lote_aceito(st, len(xmls_assinados))
+    except Exception as e:
+        logger.exception("Falha no envio à Receita")
+        etapas["envio"] = {"ok": False, "erro": str(e)}
+        return etapas, None
+    if not aceito:
+        # sem protocolo, sem status final ou lote rejeitado: --resume reenvia
+        logger.warning("Envio não confirmado pela Receita; etapa não marcada como concluída")
+        return etapas, None
+    return etapas, {}
+
+
+def _etapa_pdfs(ctx: _Contexto):
+    out_pdfs = DATA_DIR / "output" / "pdfs" / f"{ctx.competencia_ano}"
     out_pdfs.mkdir(parents=True, exist_ok=True)
     pdfs_gerados = []
-    for p in pagamentos:
+    for p in ctx.pagamentos:
         if p.tipo == TipoBenef.PF:
             pdf = gerar_pdf_informe(p, out_pdfs)
             pdfs_gerados.append((p, pdf))
-    relatorio["etapas"]["pdfs"] = {"gerados": len(pdfs_gerados)}
+    ctx.pdfs_gerados = pdfs_gerados
+    return (
+        {"pdfs": {"gerados": len(pdfs_gerados)}},
+        {"pdfs": [[p.cpf_cnpj, str(pdf)] for p, pdf in pdfs_gerados]},
+    )
+
+
+def _restaurar_pdfs(ctx: _Contexto, dados: dict) -> None:
+    por_doc = {p.cpf_cnpj: p for p in ctx.pagamentos}
+    ctx.pdfs_gerados = [(por_doc[doc], Path(pdf)) for doc, pdf in dados["pdfs"] if doc in por_doc]
+
+
+def _etapa_distribuicao(ctx: _Contexto):
+    dist_stats = {"email_ok": 0, "email_erro": 0, "wpp_ok": 0, "wpp_erro": 0}
+    with get_session() as s:
+        for p, pdf in ctx.pdfs_gerados:
+            bdb = s.get(BenefDB, p.cpf_cnpj)
+            if bdb and bdb.email:
+                r = enviar_email_informe(bdb.email, p.nome, pdf, p.ano_cal)
+                s.add(Distribuicao(
+                    cpf_cnpj_benef=p.cpf_cnpj, canal="email", pdf_path=str(pdf),
+                    status="ok" if r["ok"] else "erro", erro=r["erro"],
+                ))
+                dist_stats["email_ok" if r["ok"] else "email_erro"] += 1
+            if bdb and bdb.telefone_whatsapp:
+                r = enviar_pdf_whatsapp(bdb.telefone_whatsapp, p.nome, pdf, p.ano_cal)
+                s.add(Distribuicao(
+                    cpf_cnpj_benef=p.cpf_cnpj, canal="whatsapp", pdf_path=str(pdf),
+                    status="ok" if r["ok"] else "erro", erro=r["erro"],
+                ))
+                dist_stats["wpp_ok" if r["ok"] else "wpp_erro"] += 1
+        s.commit()
+    return {"distribuicao": dist_stats}, {}
+
+
+def _sem_restauracao(ctx: _Contexto, dados: dict) -> None:
+    pass
+
+
+def _rodar_etapa(ctx: _Contexto, nome: str, executar, restaurar, resume: bool) -> bool:
+    """Executa (ou restaura do checkpoint) uma etapa. Devolve True se concluída."""
+    if resume:
+        cp = checkpoints.carregar(ctx.per_apur, ctx.chave, nome)
+        if cp is not None:
+            restaurar(ctx, cp["dados"])
+            ctx.relatorio["etapas"].update(cp["relatorio"])
+            ctx.relatorio["retomadas"].append(nome)
+            logger.info(f"Etapa '{nome}' retomada do checkpoint")
+            return True
+    etapas, dados = executar(ctx)
+    ctx.relatorio["etapas"].update(etapas)
+    if dados is None:
+        return False
+    checkpoints.salvar(ctx.per_apur, ctx.chave, nome, etapas, dados)
+    return True
+
+
+def executar_pipeline(
+    planilha: Path | str,
+    competencia_ano: int,
+    competencia_mes: int = 12,
+    enviar_para_receita: bool = False,
+    distribuir: bool = False,
+    force: bool = False,
+    retificar: bool = False,
+    resume: bool = False,
+) -> dict:
+    """Executa o pipeline completo.
+
+    Cada etapa concluída grava um checkpoint por competência + hash da
+    planilha; envio à Receita e geração de PDFs rodam em paralelo.
+
+    Args:
+        retificar: Usa operacao=ALT (indRetif=2) para eventos já enviados anteriormente.
+                   Útil para corrigir dados já registrados na Receita Federal.
+        resume: Restaura dos checkpoints as etapas já concluídas para esta
+                competência e planilha, executando só as que faltam.
+    """
+    init_db()
+    ctx = _Contexto(
+        planilha=Path(planilha),
+        competencia_ano=competencia_ano,
+        competencia_mes=competencia_mes,
+        enviar_para_receita=enviar_para_receita,
+        distribuir=distribuir,
+        force=force,
+        retificar=retificar,
+        relatorio={
+            "inicio": datetime.now().isoformat(),
+            "etapas": {},
+            "retomadas": [],
+        },
+    )
+    ctx.chave = checkpoints.hash_entrada(ctx.planilha, retificar=retificar, force=force)
+    relatorio = ctx.relatorio
+
+    # ===== 1. Ler planilha =====
+    if not _rodar_etapa(ctx, "leitura", _etapa_leitura, _restaurar_leitura, resume):
+        relatorio["status"] = "erro_validacao"
+        return relatorio
+
+    # ===== 2. Persistir beneficiários =====
+    _rodar_etapa(ctx, "beneficiarios", _etapa_beneficiarios, _sem_restauracao, resume)
+
+    # ===== 3. Gerar XMLs =====
+    _rodar_etapa(ctx, "geracao_xml", _etapa_geracao_xml, _restaurar_geracao_xml, resume)
+
+    # ===== 4. Assinar =====
+    _rodar_etapa(ctx, "assinatura", _etapa_assinatura, _restaurar_assinatura, resume)
+
+    # ===== 5. Persistir eventos no DB =====
+    _rodar_etapa(ctx, "persistencia", _etapa_persistencia, _sem_restauracao, resume)
+
+    # ===== 6 + 7. Enviar à Receita || Gerar PDFs (independentes) =====
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futuros = [pool.submit(_rodar_etapa, ctx, "pdfs", _etapa_pdfs, _restaurar_pdfs, resume)]
+        if enviar_para_receita:
+            futuros.append(pool.submit(_rodar_etapa, ctx, "envio", _etapa_envio, _sem_restauracao, resume))
+        for f in futuros:
+            f.result()
 
     # ===== 8. Distribuir =====
     if distribuir:
-        dist_stats = {"email_ok": 0, "email_erro": 0, "wpp_ok": 0, "wpp_erro": 0}
-        with get_session() as s:
-            for p, pdf in pdfs_gerados:
-                bdb = s.get(BenefDB, p.cpf_cnpj)
-                if bdb and bdb.email:
-                    r = enviar_email_informe(bdb.email, p.nome, pdf, p.ano_cal)
-                    s.add(Distribuicao(
-                        cpf_cnpj_benef=p.cpf_cnpj, canal="email", pdf_path=str(pdf),
-                        status="ok" if r["ok"] else "erro", erro=r["erro"],
-                    ))
-                    dist_stats["email_ok" if r["ok"] else "email_erro"] += 1
-                if bdb and bdb.telefone_whatsapp:
-                    r = enviar_pdf_whatsapp(bdb.telefone_whatsapp, p.nome, pdf, p.ano_cal)
-                    s.add(Distribuicao(
-                        cpf_cnpj_benef=p.cpf_cnpj, canal="whatsapp", pdf_path=str(pdf),
-                        status="ok" if r["ok"] else "erro", erro=r["erro"],
-                    ))
-                    dist_stats["wpp_ok" if r["ok"] else "wpp_erro"] += 1
-            s.commit()
-        relatorio["etapas"]["distribuicao"] = dist_stats
+        _rodar_etapa(ctx, "distribuicao", _etapa_distribuicao, _sem_restauracao, resume)
 
     relatorio["fim"] = datetime.now().isoformat()
     relatorio["status"] = "ok"
@@ -5,24 +5,92 @@ Endpoints (API atual economia.gov.br):
 - GET  {base}/consulta/lotes/{id} → consulta status do protocolo
 
 A autenticação é feita via mTLS com o certificado digital A1.
+
+`ReinfClient` é síncrono; `AsyncReinfClient` expõe as mesmas operações como
+corrotinas sobre HTTP/2 com keep-alive, para vários lotes/consultas em paralelo.
+O PFX é lido uma única vez por certificado; cada cliente monta o seu próprio
+`ssl.SSLContext` (o httpcore reescreve o ALPN do contexto a cada conexão).
 """
+import asyncio
 import base64
+import os
+import secrets
+import ssl
 import tempfile
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable
 
+import certifi
 import httpx
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.serialization import pkcs12
 from loguru import logger
 
 from irb_reinf.config import settings
-from irb_reinf.signer.xml_signer import carregar_pfx
 
 
-class ReinfClient:
-    """Cliente HTTP autenticado por certificado A1 para EFD-Reinf."""
+HEADERS = {
+    "Accept": "application/xml",
+    "Content-Type": "application/xml",
+    "User-Agent": "irb-reinf/1.0",
+}
+
+
+@lru_cache(maxsize=4)
+def _identidade_pfx(pfx_path: Path, senha_pfx: bytes) -> tuple[bytes, bytes, bytes]:
+    """Lê o PFX uma vez: (cadeia PEM, chave PEM cifrada, senha efêmera da chave)."""
+    private_key, certificate, extras = pkcs12.load_key_and_certificates(
+        pfx_path.read_bytes(), senha_pfx,
+    )
+    if private_key is None or certificate is None:
+        raise ValueError("PFX não contém chave privada ou certificado válidos")
+
+    senha_efemera = secrets.token_bytes(32)
+    pem_key = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.BestAvailableEncryption(senha_efemera),
+    )
+    pem_chain = certificate.public_bytes(serialization.Encoding.PEM) + b"".join(
+        c.public_bytes(serialization.Encoding.PEM) for c in (extras or [])
+    )
+    return pem_chain, pem_key, senha_efemera
+
+
+def criar_ssl_context(pfx_path: Path | str | None = None,
+                      senha: str | None = None,
+                      http2: bool = False) -> ssl.SSLContext:
+    """Monta um SSLContext mTLS novo a partir do PFX (lido uma vez por certificado).
+
+    Um contexto por cliente: o httpcore reescreve o ALPN do contexto a cada
+    conexão, então clientes HTTP/1.1 e HTTP/2 não podem compartilhá-lo. A
+    confiança vem do bundle do certifi, como no httpx padrão.
+
+    O módulo `ssl` só carrega chaves de arquivo; a chave é gravada já
+    cifrada com uma senha aleatória de uso único, num diretório temporário
+    removido logo após o `load_cert_chain` — nunca em texto claro.
+    """
+    pfx_path = Path(pfx_path or settings.cert_a1_path)
+    senha_pfx = (senha if senha is not None else settings.cert_a1_senha).encode()
+    if not pfx_path.exists():
+        raise FileNotFoundError(f"Certificado não encontrado: {pfx_path}")
+    pem_chain, pem_key, senha_efemera = _identidade_pfx(pfx_path.resolve(), senha_pfx)
+
+    ctx = ssl.create_default_context(cafile=certifi.where())
+    ctx.set_alpn_protocols(["h2", "http/1.1"] if http2 else ["http/1.1"])
+    with tempfile.TemporaryDirectory(prefix="irb-reinf-") as tmp:
+        cert_path, key_path = Path(tmp) / "cert.pem", Path(tmp) / "key.pem"
+        cert_path.write_bytes(pem_chain)
+        key_path.write_bytes(pem_key)
+        os.chmod(key_path, 0o600)
+        ctx.load_cert_chain(cert_path, key_path, password=senha_efemera)
+    return ctx
+
+
+class _ReinfBase:
+    """Montagem de lote e parsing de respostas, comuns aos clientes sync/async."""
 
     def __init__(self,
                  pfx_path: Path | str | None = None,
@@ -31,34 +99,6 @@ class ReinfClient:
         self.base_url = (base_url or settings.reinf_base_url).rstrip("/")
         self._pfx_path = pfx_path
         self._senha = senha
-        self._client: httpx.Client | None = None
-
-    def __enter__(self):
-        # mTLS exige cert + key em arquivos temporários PEM
-        pem_key, pem_cert = carregar_pfx(self._pfx_path, self._senha)
-        cert_file = tempfile.NamedTemporaryFile("wb", suffix=".pem", delete=False)
-        key_file = tempfile.NamedTemporaryFile("wb", suffix=".pem", delete=False)
-        cert_file.write(pem_cert); cert_file.close()
-        key_file.write(pem_key); key_file.close()
-        self._cert_files = (cert_file.name, key_file.name)
-        self._client = httpx.Client(
-            base_url=self.base_url,
-            cert=self._cert_files,
-            timeout=60.0,
-            headers={
-                "Accept": "application/xml",
-                "Content-Type": "application/xml",
-                "User-Agent": "irb-reinf/1.0",
-            },
-        )
-        return self
-
-    def __exit__(self, exc_type, exc, tb):
-        if self._client:
-            self._client.close()
-        for f in getattr(self, "_cert_files", []):
-            try: Path(f).unlink(missing_ok=True)
-            except Exception: pass
 
     # ------------------------------------------------------------------ envio
     def montar_lote(self, eventos_xml: Iterable[str]) -> str:
@@ -84,29 +124,6 @@ class ReinfClient:
         envelope += '</Reinf>\n'
         return envelope
 
-    def enviar_lote(self, lote_xml: str) -> dict:
-        """POST do lote via /recepcao/lotes. Retorna dict com {protocolo, status, response_text}."""
-        if not self._client:
-            raise RuntimeError("Use 'with ReinfClient(...) as c:'")
-        url = f"{self.base_url}/recepcao/lotes"
-        logger.info(f"POST {url}  size={len(lote_xml)}")
-        r = self._client.post("/recepcao/lotes", content=lote_xml.encode("utf-8"))
-        return self._parse_resposta_envio(r)
-
-    def consultar_protocolo(self, protocolo: str) -> dict:
-        if not self._client:
-            raise RuntimeError("Use 'with ReinfClient(...) as c:'")
-        url = f"{self.base_url}/consulta/lotes/{protocolo}"
-        logger.info(f"GET {url}")
-        r = self._client.get(f"/consulta/lotes/{protocolo}")
-        return self._parse_resposta_consulta(r)
-
-    def consultar_recibo(self, evento_id: str) -> dict:
-        if not self._client:
-            raise RuntimeError("Use 'with ReinfClient(...) as c:'")
-        r = self._client.get(f"/consulta/eventos/{evento_id}")
-        return self._parse_resposta_consulta(r)
-
     # ----------------------------------------------------------------- parsers
     def _parse_resposta_envio(self, r: httpx.Response) -> dict:
         result = {
@@ -137,3 +154,120 @@ class ReinfClient:
 
     def _parse_resposta_consulta(self, r: httpx.Response) -> dict:
         return self._parse_resposta_envio(r)
+
+
+class ReinfClient(_ReinfBase):
+    """Cliente HTTP autenticado por certificado A1 para EFD-Reinf."""
+
+    def __init__(self,
+                 pfx_path: Path | str | None = None,
+                 senha: str | None = None,
+                 base_url: str | None = None):
+        super().__init__(pfx_path, senha, base_url)
+        self._client: httpx.Client | None = None
+
+    def __enter__(self):
+        self._client = httpx.Client(
+            base_url=self.base_url,
+            verify=criar_ssl_context(self._pfx_path, self._senha),
+            timeout=60.0,
+            headers=HEADERS,
+        )
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._client:
+            self._client.close()
+
+    def enviar_lote(self, lote_xml: str) -> dict:
+        """POST do lote via /recepcao/lotes. Retorna dict com {protocolo, status, response_text}."""
+        if not self._client:
+            raise RuntimeError("Use 'with ReinfClient(...) as c:'")
+        url = f"{self.base_url}/recepcao/lotes"
+        logger.info(f"POST {url}  size={len(lote_xml)}")
+        r = self._client.post("/recepcao/lotes", content=lote_xml.encode("utf-8"))
+        return self._parse_resposta_envio(r)
+
+    def consultar_protocolo(self, protocolo: str) -> dict:
+        if not self._client:
+            raise RuntimeError("Use 'with ReinfClient(...) as c:'")
+        url = f"{self.base_url}/consulta/lotes/{protocolo}"
+        logger.info(f"GET {url}")
+        r = self._client.get(f"/consulta/lotes/{protocolo}")
+        return self._parse_resposta_consulta(r)
+
+    def consultar_recibo(self, evento_id: str) -> dict:
+        if not self._client:
+            raise RuntimeError("Use 'with ReinfClient(...) as c:'")
+        r = self._client.get(f"/consulta/eventos/{evento_id}")
+        return self._parse_resposta_consulta(r)
+
+
+class AsyncReinfClient(_ReinfBase):
+    """Versão assíncrona do `ReinfClient` (HTTP/2, conexões reaproveitadas).
+
+    Uso:
+        async with AsyncReinfClient() as c:
+            resps = await asyncio.gather(*(c.enviar_lote(l) for l in lotes))
+    """
+
+    def __init__(self,
+                 pfx_path: Path | str | None = None,
+                 senha: str | None = None,
+                 base_url: str | None = None,
+                 max_conexoes: int = 10):
+        super().__init__(pfx_path, senha, base_url)
+        self._max_conexoes = max_conexoes
+        self._client: httpx.AsyncClient | None = None
+
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            verify=criar_ssl_context(self._pfx_path, self._senha, http2=True),
+            http2=True,
+            timeout=60.0,
+            limits=httpx.Limits(
+                max_connections=self._max_conexoes,
+                max_keepalive_connections=self._max_conexoes,
+                keepalive_expiry=60.0,
+            ),
+            headers=HEADERS,
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._client:
+            await self._client.aclose()
+
+    def _exige_client(self) -> httpx.AsyncClient:
+        if not self._client:
+            raise RuntimeError("Use 'async with AsyncReinfClient(...) as c:'")
+        return self._client
+
+    async def enviar_lote(self, lote_xml: str) -> dict:
+        """POST do lote via /recepcao/lotes. Retorna dict com {protocolo, status, response_text}."""
+        client = self._exige_client()
+        logger.info(f"POST {self.base_url}/recepcao/lotes  size={len(lote_xml)}")
+        r = await client.post("/recepcao/lotes", content=lote_xml.encode("utf-8"))
+        return self._parse_resposta_envio(r)
+
+    async def consultar_protocolo(self, protocolo: str) -> dict:
+        client = self._exige_client()
+        logger.info(f"GET {self.base_url}/consulta/lotes/{protocolo}")
+        r = await client.get(f"/consulta/lotes/{protocolo}")
+        return self._parse_resposta_consulta(r)
+
+    async def consultar_recibo(self, evento_id: str) -> dict:
+        client = self._exige_client()
+        r = await client.get(f"/consulta/eventos/{evento_id}")
+        return self._parse_resposta_consulta(r)
+
+    async def aguardar_protocolo(self, protocolo: str,
+                                 tentativas: int = 20, intervalo: float = 5.0) -> dict | None:
+        """Consulta o protocolo até sair de 'em processamento' (100/200)."""
+        for _ in range(tentativas):
+            await asyncio.sleep(intervalo)
+            st = await self.consultar_protocolo(protocolo)
+            if st.get("status_codigo") and st["status_codigo"] not in ("100", "200"):
+                return st
+        return None
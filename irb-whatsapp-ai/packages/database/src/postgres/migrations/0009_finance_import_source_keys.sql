@@ -0,0 +1,82 @@
+-- Idempotent finance import (scripts/import_financeiro_folder.py)
+-- Each imported row carries the spreadsheet it came from (import_source =
+-- "arquivo|aba") and a deterministic key (SHA-256 of source + row content),
+-- so re-imports upsert with ON CONFLICT (import_source_key) instead of
+-- deleting every tagged row with notes LIKE '[IMPORT_FINANCEIRO]%'.
+
+ALTER TABLE accounts_payable
+  ADD COLUMN IF NOT EXISTS import_source VARCHAR(255),
+  ADD COLUMN IF NOT EXISTS import_source_key VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS accounts_payable_import_source_key_idx ON accounts_payable(import_source_key);
+CREATE INDEX IF NOT EXISTS accounts_payable_import_source_idx ON accounts_payable(import_source);
+
+ALTER TABLE payment_approvals
+  ADD COLUMN IF NOT EXISTS import_source VARCHAR(255),
+  ADD COLUMN IF NOT EXISTS import_source_key VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS payment_approvals_import_source_key_idx ON payment_approvals(import_source_key);
+CREATE INDEX IF NOT EXISTS payment_approvals_import_source_idx ON payment_approvals(import_source);
+
+ALTER TABLE credit_card_purchases
+  ADD COLUMN IF NOT EXISTS import_source VARCHAR(255),
+  ADD COLUMN IF NOT EXISTS import_source_key VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS credit_card_purchases_import_source_key_idx ON credit_card_purchases(import_source_key);
+CREATE INDEX IF NOT EXISTS credit_card_purchases_import_source_idx ON credit_card_purchases(import_source);
+
+ALTER TABLE accounts_receivable
+  ADD COLUMN IF NOT EXISTS import_source VARCHAR(255),
+  ADD COLUMN IF NOT EXISTS import_source_key VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS accounts_receivable_import_source_key_idx ON accounts_receivable(import_source_key);
+CREATE INDEX IF NOT EXISTS accounts_receivable_import_source_idx ON accounts_receivable(import_source);
+
+ALTER TABLE reimbursement_requests
+  ADD COLUMN IF NOT EXISTS import_source VARCHAR(255),
+  ADD COLUMN IF NOT EXISTS import_source_key VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS reimbursement_requests_import_source_key_idx ON reimbursement_requests(import_source_key);
+CREATE INDEX IF NOT EXISTS reimbursement_requests_import_source_idx ON reimbursement_requests(import_source);
+
+ALTER TABLE reimbursement_items
+  ADD COLUMN IF NOT EXISTS import_source VARCHAR(255),
+  ADD COLUMN IF NOT EXISTS import_source_key VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS reimbursement_items_import_source_key_idx ON reimbursement_items(import_source_key);
+CREATE INDEX IF NOT EXISTS reimbursement_items_import_source_idx ON reimbursement_items(import_source);
+
+ALTER TABLE transport_vouchers
+  ADD COLUMN IF NOT EXISTS import_source VARCHAR(255),
+  ADD COLUMN IF NOT EXISTS import_source_key VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS transport_vouchers_import_source_key_idx ON transport_vouchers(import_source_key);
+CREATE INDEX IF NOT EXISTS transport_vouchers_import_source_idx ON transport_vouchers(import_source);
+
+ALTER TABLE cash_flow_snapshots
+  ADD COLUMN IF NOT EXISTS import_source VARCHAR(255),
+  ADD COLUMN IF NOT EXISTS import_source_key VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS cash_flow_snapshots_import_source_key_idx ON cash_flow_snapshots(import_source_key);
+CREATE INDEX IF NOT EXISTS cash_flow_snapshots_import_source_idx ON cash_flow_snapshots(import_source);
+
+-- One-time removal of rows from the old delete-and-reinsert importer (no
+-- source key). The next import recreates them with keys.
+DELETE FROM bank_transactions
+WHERE account_payable_id IN (
+  SELECT id FROM accounts_payable
+  WHERE import_source_key IS NULL AND (notes LIKE '[IMPORT_FINANCEIRO]%' OR notes LIKE '[SEED_FINANCEIRO]%')
+)
+OR account_receivable_id IN (
+  SELECT id FROM accounts_receivable
+  WHERE import_source_key IS NULL AND (notes LIKE '[IMPORT_FINANCEIRO]%' OR notes LIKE '[SEED_FINANCEIRO]%')
+)
+OR external_ref LIKE '[IMPORT_FINANCEIRO]%' OR external_ref LIKE '[SEED_FINANCEIRO]%';
+DELETE FROM payment_approvals WHERE import_source_key IS NULL AND (notes LIKE '[IMPORT_FINANCEIRO]%' OR notes LIKE '[SEED_FINANCEIRO]%');
+DELETE FROM receivable_payments WHERE notes LIKE '[IMPORT_FINANCEIRO]%' OR notes LIKE '[SEED_FINANCEIRO]%';
+DELETE FROM receivable_installments WHERE account_receivable_id IN (
+  SELECT id FROM accounts_receivable
+  WHERE import_source_key IS NULL AND (notes LIKE '[IMPORT_FINANCEIRO]%' OR notes LIKE '[SEED_FINANCEIRO]%')
+);
+DELETE FROM accounts_receivable WHERE import_source_key IS NULL AND (notes LIKE '[IMPORT_FINANCEIRO]%' OR notes LIKE '[SEED_FINANCEIRO]%');
+DELETE FROM reimbursement_items WHERE reimbursement_request_id IN (
+  SELECT id FROM reimbursement_requests
+  WHERE import_source_key IS NULL AND (notes LIKE '[IMPORT_FINANCEIRO]%' OR notes LIKE '[SEED_FINANCEIRO]%')
+);
+DELETE FROM reimbursement_requests WHERE import_source_key IS NULL AND (notes LIKE '[IMPORT_FINANCEIRO]%' OR notes LIKE '[SEED_FINANCEIRO]%');
+DELETE FROM transport_vouchers WHERE import_source_key IS NULL AND (notes LIKE '[IMPORT_FINANCEIRO]%' OR notes LIKE '[SEED_FINANCEIRO]%');
+DELETE FROM cash_flow_snapshots WHERE import_source_key IS NULL AND (notes LIKE '[IMPORT_FINANCEIRO]%' OR notes LIKE '[SEED_FINANCEIRO]%');
+DELETE FROM credit_card_purchases WHERE import_source_key IS NULL AND (description LIKE '[IMPORT_FINANCEIRO]%' OR description LIKE '[SEED_FINANCEIRO]%');
+DELETE FROM accounts_payable WHERE import_source_key IS NULL AND (notes LIKE '[IMPORT_FINANCEIRO]%' OR notes LIKE '[SEED_FINANCEIRO]%');
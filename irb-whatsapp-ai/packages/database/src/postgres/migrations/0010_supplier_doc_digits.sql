@@ -0,0 +1,11 @@
+-- Supplier document lookup by digits (scripts/import_financeiro_folder.py)
+-- CNPJ/CPF are stored formatted ("12.345.678/0001-90") while spreadsheets
+-- bring them in any format. Resolving by digits used to be
+-- regexp_replace(coalesce(cnpj, cpf, ''), '\D', '', 'g') = $1, a full scan per
+-- unknown document; the normalized value is now a stored generated column
+-- with its own index.
+
+ALTER TABLE suppliers
+  ADD COLUMN IF NOT EXISTS doc_digits VARCHAR(18)
+  GENERATED ALWAYS AS (NULLIF(regexp_replace(coalesce(cnpj, cpf, ''), '\D', '', 'g'), '')) STORED;
+CREATE INDEX IF NOT EXISTS suppliers_doc_digits_idx ON suppliers(doc_digits);
@@ -0,0 +1,14 @@
+-- Stable finance import keys (scripts/import_financeiro_folder.py)
+-- import_source_key used to hash the whole row content, so editing a cell
+-- produced a delete + insert with a new id. The key is now source + row
+-- identity (document number or line) and the content hash lives in its own
+-- column, compared by the upsert to skip unchanged rows.
+
+ALTER TABLE accounts_payable ADD COLUMN IF NOT EXISTS import_source_hash VARCHAR(64);
+ALTER TABLE payment_approvals ADD COLUMN IF NOT EXISTS import_source_hash VARCHAR(64);
+ALTER TABLE credit_card_purchases ADD COLUMN IF NOT EXISTS import_source_hash VARCHAR(64);
+ALTER TABLE accounts_receivable ADD COLUMN IF NOT EXISTS import_source_hash VARCHAR(64);
+ALTER TABLE reimbursement_requests ADD COLUMN IF NOT EXISTS import_source_hash VARCHAR(64);
+ALTER TABLE reimbursement_items ADD COLUMN IF NOT EXISTS import_source_hash VARCHAR(64);
+ALTER TABLE transport_vouchers ADD COLUMN IF NOT EXISTS import_source_hash VARCHAR(64);
+ALTER TABLE cash_flow_snapshots ADD COLUMN IF NOT EXISTS import_source_hash VARCHAR(64);
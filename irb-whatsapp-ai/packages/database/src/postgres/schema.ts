@@ -1,3 +1,4 @@
+import { sql } from 'drizzle-orm';
 import { pgTable, uuid, varchar, text, integer, boolean, date, time, timestamp, jsonb, serial, index, uniqueIndex, customType } from 'drizzle-orm/pg-core';
 
 const vector = customType<{ data: number[]; dpiData: unknown }>({
@@ -634,6 +635,9 @@ export const suppliers = pgTable('suppliers', {
    id: uuid('id').primaryKey().defaultRandom(),
    cnpj: varchar('cnpj', { length: 18 }).unique(),
    cpf: varchar('cpf', { length: 14 }),
+   docDigits: varchar('doc_digits', { length: 18 }).generatedAlwaysAs(
+      sql`nullif(regexp_replace(coalesce(cnpj, cpf, ''), '\\D', '', 'g'), '')`,
+   ), // só dígitos do CNPJ/CPF (busca do import_financeiro_folder.py)
    legalName: varchar('legal_name', { length: 255 }).notNull(), // Razão Social
    tradeName: varchar('trade_name', { length: 255 }), // Nome Fantasia
    email: varchar('email', { length: 255 }),
@@ -654,6 +658,7 @@ export const suppliers = pgTable('suppliers', {
    updatedAt: timestamp('updated_at', { withTimezone: true }).defaultNow(),
 }, (table) => ({
    cnpjIdx: uniqueIndex('suppliers_cnpj_idx').on(table.cnpj),
+   docDigitsIdx: index('suppliers_doc_digits_idx').on(table.docDigits),
    legalNameIdx: index('suppliers_legal_name_idx').on(table.legalName),
    klingoDoctorIdx: index('suppliers_klingo_doctor_id_idx').on(table.klingoDoctorId),
 }));
@@ -714,6 +719,9 @@ export const accountsPayable = pgTable('accounts_payable', {
    createdBy: uuid('created_by').references(() => users.id),
    createdAt: timestamp('created_at', { withTimezone: true }).defaultNow(),
    updatedAt: timestamp('updated_at', { withTimezone: true }).defaultNow(),
+   importSource: varchar('import_source', { length: 255 }), // "arquivo|aba" (import_financeiro_folder.py)
+   importSourceKey: varchar('import_source_key', { length: 64 }), // SHA-256 origem + identidade da linha (documento ou nº da linha)
+   importSourceHash: varchar('import_source_hash', { length: 64 }), // SHA-256 dos valores gravados (detecção de alteração)
 }, (table) => ({
    supplierIdx: index('accounts_payable_supplier_id_idx').on(table.supplierId),
    costCenterIdx: index('accounts_payable_cost_center_id_idx').on(table.costCenterId),
@@ -721,6 +729,8 @@ export const accountsPayable = pgTable('accounts_payable', {
    statusIdx: index('accounts_payable_status_idx').on(table.status),
    dueDateIdx: index('accounts_payable_due_date_idx').on(table.dueDate),
    paymentDateIdx: index('accounts_payable_payment_date_idx').on(table.paymentDate),
+   importSourceKeyIdx: uniqueIndex('accounts_payable_import_source_key_idx').on(table.importSourceKey),
+   importSourceIdx: index('accounts_payable_import_source_idx').on(table.importSource),
 }));
 
 // Payment Approvals (Aprovações de pagamento - workflow)
@@ -736,9 +746,14 @@ export const paymentApprovals = pgTable('payment_approvals', {
    notes: text('notes'),
    notifiedViaWhatsapp: boolean('notified_via_whatsapp').default(false),
    whatsappNotifiedAt: timestamp('whatsapp_notified_at', { withTimezone: true }),
+   importSource: varchar('import_source', { length: 255 }), // "arquivo|aba" (import_financeiro_folder.py)
+   importSourceKey: varchar('import_source_key', { length: 64 }), // SHA-256 origem + identidade da linha (documento ou nº da linha)
+   importSourceHash: varchar('import_source_hash', { length: 64 }), // SHA-256 dos valores gravados (detecção de alteração)
 }, (table) => ({
    accountPayableIdx: index('payment_approvals_account_payable_id_idx').on(table.accountPayableId),
    statusIdx: index('payment_approvals_status_idx').on(table.status),
+   importSourceKeyIdx: uniqueIndex('payment_approvals_import_source_key_idx').on(table.importSourceKey),
+   importSourceIdx: index('payment_approvals_import_source_idx').on(table.importSource),
 }));
 
 // Credit Card Purchases (Compras no cartão corporativo)
@@ -758,10 +773,15 @@ export const creditCardPurchases = pgTable('credit_card_purchases', {
    status: varchar('status', { length: 20 }).default('active').notNull(), // active, paid, cancelled
    createdAt: timestamp('created_at', { withTimezone: true }).defaultNow(),
    updatedAt: timestamp('updated_at', { withTimezone: true }).defaultNow(),
+   importSource: varchar('import_source', { length: 255 }), // "arquivo|aba" (import_financeiro_folder.py)
+   importSourceKey: varchar('import_source_key', { length: 64 }), // SHA-256 origem + identidade da linha (documento ou nº da linha)
+   importSourceHash: varchar('import_source_hash', { length: 64 }), // SHA-256 dos valores gravados (detecção de alteração)
 }, (table) => ({
    purchaseDateIdx: index('credit_card_purchases_purchase_date_idx').on(table.purchaseDate),
    statusIdx: index('credit_card_purchases_status_idx').on(table.status),
    costCenterIdx: index('credit_card_purchases_cost_center_id_idx').on(table.costCenterId),
+   importSourceKeyIdx: uniqueIndex('credit_card_purchases_import_source_key_idx').on(table.importSourceKey),
+   importSourceIdx: index('credit_card_purchases_import_source_idx').on(table.importSource),
 }));
 
 // Bank Transactions (Movimentações bancárias para conciliação)
@@ -840,6 +860,9 @@ export const accountsReceivable = pgTable('accounts_receivable', {
    createdBy: uuid('created_by').references(() => users.id),
    createdAt: timestamp('created_at', { withTimezone: true }).defaultNow(),
    updatedAt: timestamp('updated_at', { withTimezone: true }).defaultNow(),
+   importSource: varchar('import_source', { length: 255 }), // "arquivo|aba" (import_financeiro_folder.py)
+   importSourceKey: varchar('import_source_key', { length: 64 }), // SHA-256 origem + identidade da linha (documento ou nº da linha)
+   importSourceHash: varchar('import_source_hash', { length: 64 }), // SHA-256 dos valores gravados (detecção de alteração)
 }, (table) => ({
    patientIdx: index('accounts_receivable_patient_id_idx').on(table.patientId),
    doctorIdx: index('accounts_receivable_doctor_id_idx').on(table.doctorId),
@@ -848,6 +871,8 @@ export const accountsReceivable = pgTable('accounts_receivable', {
    dueDateIdx: index('accounts_receivable_due_date_idx').on(table.dueDate),
    serviceDateIdx: index('accounts_receivable_service_date_idx').on(table.serviceDate),
    klingoIdx: index('accounts_receivable_klingo_voucher_id_idx').on(table.klingoVoucherId),
+   importSourceKeyIdx: uniqueIndex('accounts_receivable_import_source_key_idx').on(table.importSourceKey),
+   importSourceIdx: index('accounts_receivable_import_source_idx').on(table.importSource),
 }));
 
 // Receivable Installments (Parcelas a receber)
@@ -921,10 +946,15 @@ export const reimbursementRequests = pgTable('reimbursement_requests', {
    notes: text('notes'),
    createdAt: timestamp('created_at', { withTimezone: true }).defaultNow(),
    updatedAt: timestamp('updated_at', { withTimezone: true }).defaultNow(),
+   importSource: varchar('import_source', { length: 255 }), // "arquivo|aba" (import_financeiro_folder.py)
+   importSourceKey: varchar('import_source_key', { length: 64 }), // SHA-256 origem + identidade da linha (documento ou nº da linha)
+   importSourceHash: varchar('import_source_hash', { length: 64 }), // SHA-256 dos valores gravados (detecção de alteração)
 }, (table) => ({
    requestNumberIdx: uniqueIndex('reimbursement_requests_request_number_idx').on(table.requestNumber),
    statusIdx: index('reimbursement_requests_status_idx').on(table.status),
    employeeIdx: index('reimbursement_requests_employee_name_idx').on(table.employeeName),
+   importSourceKeyIdx: uniqueIndex('reimbursement_requests_import_source_key_idx').on(table.importSourceKey),
+   importSourceIdx: index('reimbursement_requests_import_source_idx').on(table.importSource),
 }));
 
 // Reimbursement Items (Itens do reembolso)
@@ -940,9 +970,14 @@ export const reimbursementItems = pgTable('reimbursement_items', {
    approved: boolean('approved'),
    approvedAmount: integer('approved_amount'), // centavos (pode ser diferente do solicitado)
    createdAt: timestamp('created_at', { withTimezone: true }).defaultNow(),
+   importSource: varchar('import_source', { length: 255 }), // "arquivo|aba" (import_financeiro_folder.py)
+   importSourceKey: varchar('import_source_key', { length: 64 }), // SHA-256 origem + identidade da linha (documento ou nº da linha)
+   importSourceHash: varchar('import_source_hash', { length: 64 }), // SHA-256 dos valores gravados (detecção de alteração)
 }, (table) => ({
    reimbursementRequestIdx: index('reimbursement_items_reimbursement_request_id_idx').on(table.reimbursementRequestId),
    expenseDateIdx: index('reimbursement_items_expense_date_idx').on(table.expenseDate),
+   importSourceKeyIdx: uniqueIndex('reimbursement_items_import_source_key_idx').on(table.importSourceKey),
+   importSourceIdx: index('reimbursement_items_import_source_idx').on(table.importSource),
 }));
 
 // Transport Vouchers (Vale-transporte CLTs)
@@ -964,11 +999,16 @@ export const transportVouchers = pgTable('transport_vouchers', {
    notes: text('notes'),
    createdAt: timestamp('created_at', { withTimezone: true }).defaultNow(),
    updatedAt: timestamp('updated_at', { withTimezone: true }).defaultNow(),
+   importSource: varchar('import_source', { length: 255 }), // "arquivo|aba" (import_financeiro_folder.py)
+   importSourceKey: varchar('import_source_key', { length: 64 }), // SHA-256 origem + identidade da linha (documento ou nº da linha)
+   importSourceHash: varchar('import_source_hash', { length: 64 }), // SHA-256 dos valores gravados (detecção de alteração)
 }, (table) => ({
    employeeIdx: index('transport_vouchers_employee_name_idx').on(table.employeeName),
    referenceMonthIdx: index('transport_vouchers_reference_month_idx').on(table.referenceMonth),
    statusIdx: index('transport_vouchers_status_idx').on(table.status),
    costCenterIdx: index('transport_vouchers_cost_center_id_idx').on(table.costCenterId),
+   importSourceKeyIdx: uniqueIndex('transport_vouchers_import_source_key_idx').on(table.importSourceKey),
+   importSourceIdx: index('transport_vouchers_import_source_idx').on(table.importSource),
 }));
 
 // ============================================
@@ -993,10 +1033,15 @@ export const cashFlowSnapshots = pgTable('cash_flow_snapshots', {
    notes: text('notes'),
    generatedBy: uuid('generated_by').references(() => users.id),
    createdAt: timestamp('created_at', { withTimezone: true }).defaultNow(),
+   importSource: varchar('import_source', { length: 255 }), // "arquivo|aba" (import_financeiro_folder.py)
+   importSourceKey: varchar('import_source_key', { length: 64 }), // SHA-256 origem + identidade da linha (documento ou nº da linha)
+   importSourceHash: varchar('import_source_hash', { length: 64 }), // SHA-256 dos valores gravados (detecção de alteração)
 }, (table) => ({
    snapshotDateIdx: index('cash_flow_snapshots_snapshot_date_idx').on(table.snapshotDate),
    costCenterIdx: index('cash_flow_snapshots_cost_center_id_idx').on(table.costCenterId),
    dateAndCenterIdx: uniqueIndex('cash_flow_snapshots_date_center_idx').on(table.snapshotDate, table.costCenterId),
+   importSourceKeyIdx: uniqueIndex('cash_flow_snapshots_import_source_key_idx').on(table.importSourceKey),
+   importSourceIdx: index('cash_flow_snapshots_import_source_idx').on(table.importSource),
 }));
 
 // ============================================
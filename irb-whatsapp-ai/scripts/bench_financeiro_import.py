@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Benchmark do import_financeiro_folder.py contra um Postgres local.
+
+Gera planilhas sinteticas (generate_financeiro_fixtures.py) ou usa uma pasta
+existente e mede, por etapa, linhas por segundo:
+
+- parse:<aba>    leitura + conversao de cada aba (em processo, sequencial);
+- parse:pool     etapa de leitura inteira no pool de processos (wall time);
+- write:<aba>    resolucao de referencias + enfileiramento no BatchWriter;
+- write:flush    COPY/upsert de todas as tabelas;
+- reimport:*     segunda importacao identica (upsert sem mudancas) + flush.
+
+Tudo roda numa transacao desfeita no final (a menos que --commit), entao
+pode ser repetido no mesmo banco. Requer o schema com as migrations
+aplicadas. Com --baseline, sai com codigo 1 se alguma etapa ficar mais lenta
+que a tolerancia.
+
+Uso:
+    DATABASE_URL=postgres://localhost/irb python scripts/bench_financeiro_import.py --rows 20000 \\
+        [--json bench.json] [--baseline bench.json --tolerance 0.25]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import psycopg
+from openpyxl import load_workbook
+
+from generate_financeiro_fixtures import generate
+from import_financeiro_folder import CASH_FLOW_CSV, WORKBOOKS, Importer, ParsedSheet, parse_cash_flow, parse_workbook
+
+
+class Stages:
+    def __init__(self) -> None:
+        self.results: dict[str, dict[str, float]] = {}
+
+    def record(self, name: str, rows: int, seconds: float) -> None:
+        self.results[name] = {
+            "rows": rows,
+            "seconds": round(seconds, 4),
+            "rows_per_second": round(rows / seconds, 1) if seconds > 0 else 0.0,
+        }
+
+    def print(self) -> None:
+        print(f"{'etapa':<28} {'linhas':>9} {'segundos':>10} {'linhas/s':>12}")
+        for name, result in self.results.items():
+            print(f"{name:<28} {result['rows']:>9} {result['seconds']:>10.3f} {result['rows_per_second']:>12.1f}")
+
+
+def parse_stage(folder: Path, stages: Stages, workers: int) -> list[ParsedSheet]:
+    parsed_sheets: list[ParsedSheet] = []
+    for name, sheets in WORKBOOKS:
+        started = time.perf_counter()
+        wb = load_workbook(folder / name, data_only=True, read_only=True)
+        stages.record(f"parse:open:{Path(name).stem[:16]}", 0, time.perf_counter() - started)
+        try:
+            for sheet, parser in sheets:
+                started = time.perf_counter()
+                parsed = parser(wb[sheet or wb.sheetnames[0]], name)
+                stages.record(f"parse:{parsed.kind}", len(parsed.records), time.perf_counter() - started)
+                parsed_sheets.append(parsed)
+        finally:
+            wb.close()
+    started = time.perf_counter()
+    parsed_sheets.extend(parse_cash_flow(folder / CASH_FLOW_CSV))
+    stages.record("parse:cash_flow", len(parsed_sheets[-1].records), time.perf_counter() - started)
+
+    total = sum(len(parsed.records) for parsed in parsed_sheets)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(parse_workbook, folder / name, sheets) for name, sheets in WORKBOOKS]
+        futures.append(pool.submit(parse_cash_flow, folder / CASH_FLOW_CSV))
+        for future in futures:
+            future.result()
+    stages.record("parse:pool", total, time.perf_counter() - started)
+    return parsed_sheets
+
+
+def write_stage(conn: psycopg.Connection, parsed_sheets: list[ParsedSheet], stages: Stages, prefix: str) -> None:
+    importer = Importer(conn)
+    importer.writer.batch_size = sys.maxsize  # flush medido a parte
+    for parsed in parsed_sheets:
+        started = time.perf_counter()
+        rows = importer.write(parsed)
+        stages.record(f"{prefix}:{parsed.kind}", rows, time.perf_counter() - started)
+    queued = sum(len(rows) for rows in importer.writer.buffers.values())
+    started = time.perf_counter()
+    importer.writer.prune()
+    importer.writer.flush()
+    stages.record(f"{prefix}:flush", queued, time.perf_counter() - started)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or not before.get("rows_per_second") or not result["rows"]:
+            continue
+        ratio = result["rows_per_second"] / before["rows_per_second"]
+        if ratio < 1 - tolerance:
+            regressions.append(f"{name}: {before['rows_per_second']:.1f} -> {result['rows_per_second']:.1f} linhas/s ({ratio:.0%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do importador financeiro")
+    parser.add_argument("--folder", type=Path, help="pasta com planilhas (padrao: gera sinteticas)")
+    parser.add_argument("--rows", type=int, default=5000, help="tamanho das planilhas sinteticas")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=min(len(WORKBOOKS) + 1, os.cpu_count() or 1))
+    parser.add_argument("--commit", action="store_true", help="mantem as linhas gravadas")
+    parser.add_argument("--json", type=Path, help="grava o resultado em JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON de uma execucao anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="queda maxima aceita em linhas/s")
+    args = parser.parse_args()
+
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL nao definido")
+
+    stages = Stages()
+    with tempfile.TemporaryDirectory(prefix="financeiro-bench-") as tmp:
+        folder = args.folder
+        if folder is None:
+            folder = Path(tmp)
+            started = time.perf_counter()
+            generate(folder, args.rows, args.seed)
+            print(f"planilhas sinteticas ({args.rows} linhas) geradas em {time.perf_counter() - started:.1f}s")
+        parsed_sheets = parse_stage(folder, stages, args.workers)
+
+    with psycopg.connect(database_url) as conn:
+        write_stage(conn, parsed_sheets, stages, "write")
+        write_stage(conn, parsed_sheets, stages, "reimport")
+        if args.commit:
+            conn.commit()
+        else:
+            conn.rollback()
+
+    stages.print()
+    if args.json:
+        args.json.write_text(json.dumps({"rows": args.rows, "stages": stages.results}, indent=2), encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(stages.results, baseline["stages"], args.tolerance)
+        if regressions:
+            print("Regressoes de desempenho:")
+            for line in regressions:
+                print(f"- {line}")
+            raise SystemExit(1)
+        print(f"Sem regressoes acima de {args.tolerance:.0%} em relacao a {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Gera planilhas financeiras sinteticas no layout lido por import_financeiro_folder.py.
+
+Mesmos nomes de arquivo, abas e colunas das planilhas reais (Contas a
+Receber, FLUXO DE PAGAMENTOS, aprovacoes diarias, cartao, reembolso, VT e o
+CSV de fluxo de caixa), com dados ficticios e tamanho configuravel. Serve
+para medir o importador sem os arquivos sensiveis da pasta Financeiro.
+
+Uso:
+    python scripts/generate_financeiro_fixtures.py /tmp/financeiro --rows 20000 [--seed 1]
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+from openpyxl import Workbook
+
+from import_financeiro_folder import (
+    CASH_FLOW_CSV,
+    WORKBOOKS,
+    parse_accounts_receivable,
+    parse_payables,
+    parse_reimbursement,
+    parse_transport_vouchers,
+)
+
+
+COST_CENTERS = ["CLINICA", "PROJETOS", "ADM", "DIRETORIA", "TI", "FINANCEIRO", "FATURAMENTO", "SAMU MG", "NARDINI"]
+CHART_ACCOUNTS = ["VIAGEM", "TAXAS / LICENÇAS", "PRESTADORES DE SERVIÇOS", "TELEFONE E INTERNET", "JUROS", "TARIFA", "INSUMOS"]
+BANKS = ["BRADESCO", "BRADESCO PIX", "UNICRED", "SAFRA", "BB", "BOLETO BRADESCO", "TED SAFRA"]
+STATUSES = ["PAGO", "APROVADO", "PENDENTE", "", "CANCELADO"]
+CONVENIOS = ["UNIMED", "BRADESCO SAUDE", "SULAMERICA", "AMIL", "CASSI", "PORTO SEGURO SAUDE", "GEAP"]
+PROCEDURES = ["CONSULTA", "RETORNO", "LIMPEZA", "RESTAURACAO", "EXAME", "ECG", "CANAL"]
+FIRST_NAMES = ["JOSÉ", "MARIA", "ANA", "JOÃO", "PAULO", "LUCIA", "CARLOS", "FERNANDA", "MARCOS", "JULIANA"]
+LAST_NAMES = ["SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "LIMA", "PEREIRA", "COSTA", "RODRIGUES", "ALMEIDA"]
+
+
+class FakeData:
+    def __init__(self, seed: int, suppliers: int):
+        self.rng = random.Random(seed)
+        self.start = date(2026, 1, 1)
+        self.suppliers = [self._supplier(i) for i in range(suppliers)]
+
+    def _supplier(self, index: int) -> tuple[str, str]:
+        name = f"{self.rng.choice(LAST_NAMES)} {self.rng.choice(['SERVICOS', 'COMERCIO', 'MEDICA', 'TECNOLOGIA'])} {index} LTDA"
+        if index % 3 == 0:
+            digits = f"{self.rng.randrange(10**10):011d}"
+            return name, f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+        digits = f"{self.rng.randrange(10**13):014d}"
+        return name, f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:]}"
+
+    def person(self) -> str:
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def day(self, span: int = 120) -> date:
+        return self.start + timedelta(days=self.rng.randrange(span))
+
+    def amount(self, low: float = 20, high: float = 25000) -> float:
+        return round(self.rng.uniform(low, high), 2)
+
+    def br_amount(self, value: float) -> str:
+        # parte dos valores vem como texto "R$ 1.234,56", como nas planilhas reais
+        return "R$ " + f"{value:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+    def maybe_text_date(self, value: date) -> date | str:
+        return value.strftime("%d/%m/%Y") if self.rng.random() < 0.3 else value
+
+
+def write_contas_receber(path: Path, fake: FakeData, rows: int) -> None:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Cadastro Convenios")
+    ws.append(["CONVENIO", "PRAZO"])
+    for name in CONVENIOS:
+        ws.append([name, 30])
+
+    ws = wb.create_sheet("Contas a Receber")
+    ws.append(["CONTAS A RECEBER - IRB"])
+    ws.append([])
+    ws.append(["ID", "PACIENTE", "UNIDADE", "TIPO ATENDIMENTO", "PAGAMENTO", "CONVENIO", "GUIA", "PROCEDIMENTO",
+               "PROFISSIONAL", "DATA ATENDIMENTO", "VALOR", "RECEBIDO", "SALDO", "DATA RECEBIMENTO", "VENCIMENTO"])
+    for i in range(rows):
+        insurance = fake.rng.random() < 0.6
+        total = fake.amount(80, 3000)
+        received = total if fake.rng.random() < 0.5 else 0
+        service = fake.day()
+        ws.append([
+            i + 1, fake.person(), "MATRIZ",
+            fake.rng.choice(["MEDICO", "ODONTO"]),
+            "CONVENIO" if insurance else "PARTICULAR",
+            fake.rng.choice(CONVENIOS) if insurance else None,
+            f"G{fake.rng.randrange(10**8):08d}" if insurance else None,
+            fake.rng.choice(PROCEDURES), fake.person(),
+            fake.maybe_text_date(service), total, received or None, round(total - received, 2),
+            service + timedelta(days=30) if received else None,
+            service + timedelta(days=30),
+        ])
+    wb.save(path)
+
+
+def write_fluxo_pagamento(path: Path, fake: FakeData, rows: int) -> None:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("FLUXO DE PAGAMENTOS")
+    ws.append(["ID", "CENTRO DE CUSTO", "PLANO DE CONTAS", "FORNECEDOR", "CNPJ/CPF", "DOCUMENTO", "EMISSAO",
+               "VENCIMENTO", "PAGAMENTO", "MES", "VALOR", "BANCO", "STATUS", "DESCRICAO", "TIPO",
+               "INSS", "IRPJ", "CSLL", "COFINS", "PIS", "ISS", "TARIFA", "JUROS"])
+    for i in range(rows):
+        supplier, document = fake.rng.choice(fake.suppliers)
+        issue = fake.day()
+        status = fake.rng.choice(STATUSES)
+        amount = fake.amount()
+        taxed = fake.rng.random() < 0.2
+        ws.append([
+            i + 1, fake.rng.choice(COST_CENTERS), fake.rng.choice(CHART_ACCOUNTS), supplier, document,
+            fake.rng.choice(["NF", "BOLETO", "RECIBO"]),
+            fake.maybe_text_date(issue), issue + timedelta(days=15),
+            issue + timedelta(days=15) if status == "PAGO" else None,
+            issue.strftime("%m/%Y"),
+            fake.br_amount(amount) if fake.rng.random() < 0.3 else amount,
+            fake.rng.choice(BANKS), status, f"Servico {i}", fake.rng.choice(["FIXO", "VARIAVEL", "PIX", "BOLETO"]),
+            *([round(amount * r, 2) for r in (0.011, 0.015, 0.01, 0.03, 0.0065, 0.02)] if taxed else [0] * 6),
+            0, 0,
+        ])
+
+    ws = wb.create_sheet("PAGAMENTO DIARIO (2)")
+    ws.append(["PAGAMENTOS DO DIA"])
+    ws.append([])
+    ws.append(["#", "FORNECEDOR/PRESTADOR", "CENTRO DE CUSTO", "DOCUMENTO", "EMISSAO", "VENCIMENTO", "BANCO",
+               "VALOR", "STATUS", "DESCRICAO", "OBS"])
+    for i in range(max(1, rows // 10)):
+        supplier, _ = fake.rng.choice(fake.suppliers)
+        issue = fake.day()
+        ws.append([
+            i + 1, supplier, fake.rng.choice(COST_CENTERS), "NF", issue, issue + timedelta(days=3),
+            fake.rng.choice(BANKS), fake.amount(), fake.rng.choice(["APROVADO", "PENDENTE"]), f"Pagamento {i}", "PIX",
+        ])
+
+    ws = wb.create_sheet("COMPRAS CARTÃO DE CRÉDITO")
+    ws.append(["#", "CENTRO DE CUSTO", "PLANO DE CONTAS", "ESTABELECIMENTO", "CARTAO", "TITULAR", "DATA",
+               "PARCELA", "PARCELAS", "VALOR TOTAL", "VALOR", "STATUS", "DESCRICAO"])
+    for i in range(max(1, rows // 10)):
+        ws.append([
+            i + 1, fake.rng.choice(COST_CENTERS + [None]), fake.rng.choice(CHART_ACCOUNTS + [None]),
+            f"LOJA {fake.rng.randrange(500)}", "3646", "IRB", fake.day(), 1, fake.rng.choice([1, 2, 3, "6x"]),
+            None, fake.amount(10, 5000), fake.rng.choice(["PAGO", "ABERTO"]), f"Compra {i}",
+        ])
+    wb.save(path)
+
+
+def write_reembolso(path: Path, fake: FakeData) -> None:
+    # workbook normal (nao write_only) para gravar a dimensao da aba: o leitor
+    # read_only completa as linhas curtas ate a ultima coluna, como no Excel
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "REEMBOLSO"
+    header = [
+        "FORMULARIO DE REEMBOLSO",
+        "NOME DO PROFISSIONAL: " + fake.person().title(),
+        "CNPJ/CNPJ: 123.456.789-00",
+        "DEPARTAMENTO / CENTRO DE CUSTO: TI",
+        "BANCO: Bradesco",
+        "AGENCIA: 2700",
+        "CONTA CORRENTE: 13532",
+        "CHAVE PIX: 123.456.789-00",
+        "FINALIDADE E/OU ITINERARIO: Viagem corporativa",
+        "DATA DE INICIO: 02/03/2026",
+    ]
+    for idx in range(1, 26):
+        row = [None] * 11
+        if idx <= len(header):
+            row[0] = header[idx - 1]
+        if idx == 12:
+            row[7] = "DATA DE TERMINO: 05/03/2026"
+        if idx in (24, 25):
+            row[0] = date(2026, 3, idx - 22)
+            row[1] = "ALIMENTACAO" if idx == 24 else "TRANSPORTE"
+            row[2] = f"NF{idx}"
+            row[3] = f"Despesa {idx}"
+            row[10] = fake.amount(20, 300)
+        ws.append(row)
+    wb.save(path)
+
+
+def write_vt(path: Path, fake: FakeData, rows: int) -> None:
+    # workbook normal (nao write_only) para gravar a dimensao da aba: o leitor
+    # read_only completa as linhas curtas ate a ultima coluna, como no Excel
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "VT"
+    for _ in range(14):
+        ws.append(["ORDEM DE PAGAMENTO - VALE TRANSPORTE"])
+    for _ in range(rows):
+        ws.append([fake.person(), None, None, None, None, None, 22, fake.amount(100, 600)])
+    wb.save(path)
+
+
+def write_fluxo_caixa(path: Path, fake: FakeData, days: int = 20, filler_rows: int = 102) -> None:
+    dates = [(date(2026, 2, 2) + timedelta(days=i)).strftime("%d/%m/%Y") for i in range(days)]
+    balance = 250000.0
+    opening, closing = [], []
+    for _ in dates:
+        opening.append(fake.br_amount(balance).replace("R$ ", ""))
+        balance += fake.rng.uniform(-20000, 20000)
+        closing.append(fake.br_amount(balance).replace("R$ ", ""))
+    with path.open("w", encoding="latin1", newline="") as fp:
+        writer = csv.writer(fp, delimiter=";")
+        writer.writerow(["FLUXO DE CAIXA", *dates])
+        writer.writerow([])
+        writer.writerow(["SALDO INICIAL", *opening])
+        for i in range(filler_rows):
+            writer.writerow([f"LANCAMENTO {i}", *[""] * days])
+        writer.writerow(["SALDO FINAL", *closing])
+
+
+def generate(folder: Path, rows: int, seed: int = 1) -> dict[str, Path]:
+    """Grava o conjunto completo em `folder` e devolve nome -> caminho."""
+    folder.mkdir(parents=True, exist_ok=True)
+    fake = FakeData(seed, suppliers=max(10, rows // 20))
+    # nomes de arquivo vindos do proprio importador, achados pelo parser de cada um
+    file_for = {parser: name for name, sheets in WORKBOOKS for _, parser in sheets}
+    writers = {
+        file_for[parse_accounts_receivable]: lambda p: write_contas_receber(p, fake, rows),
+        file_for[parse_payables]: lambda p: write_fluxo_pagamento(p, fake, rows),
+        file_for[parse_reimbursement]: lambda p: write_reembolso(p, fake),
+        file_for[parse_transport_vouchers]: lambda p: write_vt(p, fake, max(1, rows // 20)),
+        CASH_FLOW_CSV: lambda p: write_fluxo_caixa(p, fake),
+    }
+    paths = {}
+    for name, write in writers.items():
+        paths[name] = folder / name
+        write(paths[name])
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gera planilhas financeiras sinteticas")
+    parser.add_argument("folder", type=Path)
+    parser.add_argument("--rows", type=int, default=5000, help="linhas de contas a pagar / a receber")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    for name, path in generate(args.folder, args.rows, args.seed).items():
+        print(f"- {name}: {path.stat().st_size / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
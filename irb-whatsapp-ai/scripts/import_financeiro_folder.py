@@ -2,13 +2,18 @@
 from __future__ import annotations
 
 import csv
+import hashlib
 import os
 import re
 import unicodedata
-from dataclasses import dataclass
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import date, datetime
+from decimal import ROUND_HALF_EVEN, Decimal
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 import psycopg
 from openpyxl import load_workbook
@@ -18,16 +23,30 @@ ROOT = Path(__file__).resolve().parents[1]
 FINANCEIRO_DIR = ROOT / "Financeiro"
 IMPORT_TAG = "[IMPORT_FINANCEIRO]"
 SEED_TAG = "[SEED_FINANCEIRO]"
+SOURCE_KEY_NAMESPACE = uuid.UUID("6f1c3a52-6e0b-4f43-9a43-3c3c2a0e5b8d")
+
+
+# Os helpers abaixo rodam varias vezes por celula, quase sempre com os mesmos
+# textos (fornecedor, banco, centro de custo, datas): a parte em string e
+# memoizada (LRU limitado) e valores ja tipados pulam direto para o resultado.
+CACHE_SIZE = 65536
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _normalize_str(text: str) -> str:
+    text = text.strip()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = WHITESPACE_RE.sub(" ", text)
+    return text.upper()
 
 
 def normalize_text(value: Any) -> str:
     if value is None:
         return ""
-    text = str(value).strip()
-    text = unicodedata.normalize("NFKD", text)
-    text = "".join(ch for ch in text if not unicodedata.combining(ch))
-    text = re.sub(r"\s+", " ", text)
-    return text.upper()
+    return _normalize_str(value if isinstance(value, str) else str(value))
 
 
 def slug_code(value: str, prefix: str, existing: set[str], limit: int = 20) -> str:
@@ -47,15 +66,16 @@ def slug_code(value: str, prefix: str, existing: set[str], limit: int = 20) -> s
       index += 1
 
 
-def parse_amount(value: Any) -> int | None:
-    if value is None or value == "":
-        return None
-    if isinstance(value, (int, float)):
-        return int(round(float(value) * 100))
-    text = str(value).strip()
+AMOUNT_JUNK_RE = re.compile(r"[^0-9,.\-]")
+NON_DIGIT_RE = re.compile(r"[^0-9]")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_amount_str(text: str) -> int | None:
+    text = text.strip()
     if not text or text in {"-", "N/A"}:
         return None
-    text = re.sub(r"[^0-9,.\-]", "", text)
+    text = AMOUNT_JUNK_RE.sub("", text)
     if "," in text and "." in text:
         if text.rfind(",") > text.rfind("."):
             text = text.replace(".", "").replace(",", ".")
@@ -71,7 +91,7 @@ def parse_amount(value: Any) -> int | None:
     try:
         return int(round(float(text) * 100))
     except ValueError:
-        digits = re.sub(r"[^0-9]", "", text)
+        digits = NON_DIGIT_RE.sub("", text)
         if not digits:
             return None
         if len(digits) == 1:
@@ -83,6 +103,16 @@ def parse_amount(value: Any) -> int | None:
         return int(round(float(normalized) * 100))
 
 
+def parse_amount(value: Any) -> int | None:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(round(float(value) * 100))
+    if isinstance(value, Decimal):
+        return int((value * 100).to_integral_value(ROUND_HALF_EVEN))
+    return _parse_amount_str(str(value))
+
+
 def parse_int(value: Any) -> int | None:
     if value is None or value == "":
         return None
@@ -94,6 +124,36 @@ def parse_int(value: Any) -> int | None:
     return int(match.group(1)) if match else None
 
 
+# um unico regex para os formatos aceitos (antes: ate 4 strptime por celula):
+# dd/mm/aaaa, dd-mm-aaaa, dd/mm/aa, aaaa-mm-dd
+DATE_RE = re.compile(
+    r"(\d{1,2})([/-])(\d{1,2})\2(\d{4})"
+    r"|(\d{1,2})/(\d{1,2})/(\d{2})"
+    r"|(\d{4})-(\d{1,2})-(\d{1,2})"
+)
+DATE_PLACEHOLDERS = {"PREVISAO", "REFINANCIADO", "N/A", "12X", "6X"}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_date_str(text: str) -> date | None:
+    text = text.strip()
+    if not text or normalize_text(text) in DATE_PLACEHOLDERS:
+        return None
+    match = DATE_RE.fullmatch(text)
+    if not match:
+        return None
+    d1, _, m1, y1, d2, m2, y2, y3, m3, d3 = match.groups()
+    try:
+        if y1:
+            return date(int(y1), int(m1), int(d1))
+        if y2:
+            year = int(y2)
+            return date(year + (1900 if year >= 69 else 2000), int(m2), int(d2))
+        return date(int(y3), int(m3), int(d3))
+    except ValueError:
+        return None
+
+
 def parse_date(value: Any) -> date | None:
     if value is None or value == "":
         return None
@@ -101,15 +161,7 @@ def parse_date(value: Any) -> date | None:
         return value.date()
     if isinstance(value, date):
         return value
-    text = str(value).strip()
-    if not text or normalize_text(text) in {"PREVISAO", "REFINANCIADO", "N/A", "12X", "6X"}:
-        return None
-    for fmt in ("%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%Y-%m-%d"):
-        try:
-            return datetime.strptime(text, fmt).date()
-        except ValueError:
-            continue
-    return None
+    return _parse_date_str(str(value))
 
 
 def sql_today() -> date:
@@ -146,35 +198,783 @@ def infer_payment_method(*values: Any) -> str | None:
     return None
 
 
-def find_header_row(ws, marker: str) -> int | None:
-    for idx, row in enumerate(ws.iter_rows(values_only=True), 1):
+def find_header_row(ws, marker: str, max_rows: int | None = None) -> int | None:
+    for idx, row in enumerate(ws.iter_rows(max_row=max_rows, values_only=True), 1):
         values = [normalize_text(v) for v in row if v not in (None, "")]
         if marker in values:
             return idx
     return None
 
 
+def doc_digits(value: Any) -> str:
+    return re.sub(r"\D", "", str(value or ""))
+
+
+def warn_similar(kind: str, name: Any, similar: str | None) -> None:
+    """Avisa que um cadastro novo tem nome parecido com um existente (nunca mescla)."""
+    if similar:
+        print(f"aviso: {kind} novo '{str(name).strip()}' parecido com '{similar}' (revisar se e o mesmo)")
+
+
+class NameIndex:
+    """Indice de nomes normalizados -> id.
+
+    - busca exata por dict (O(1)), a unica usada para decidir reaproveitar;
+    - `suggest`: nome existente mais parecido por trigramas (coeficiente de
+      Dice sobre um indice invertido trigrama -> nomes, sem varrer todos),
+      so para aviso: "CENTRO 2" x "CENTRO 1" sao entidades diferentes;
+    - `contained_in`: a chave mais longa que aparece dentro de um texto,
+      testando so as janelas do texto com os comprimentos de chave existentes.
+    """
+
+    def __init__(self, min_similarity: float = 0.85):
+        self.min_similarity = min_similarity
+        self.exact: dict[str, str] = {}
+        self.grams: dict[str, set[str]] = {}
+        self.lengths: dict[int, int] = {}
+
+    @staticmethod
+    def trigrams(text: str) -> set[str]:
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.exact
+
+    def __getitem__(self, name: str) -> str:
+        return self.exact[name]
+
+    def __setitem__(self, name: str, row_id: str) -> None:
+        if not name:
+            return
+        if name not in self.exact:
+            for gram in self.trigrams(name):
+                self.grams.setdefault(gram, set()).add(name)
+            self.lengths[len(name)] = self.lengths.get(len(name), 0) + 1
+        self.exact[name] = row_id
+
+    def get(self, name: str, default: str | None = None) -> str | None:
+        return self.exact.get(name, default)
+
+    def suggest(self, name: str) -> str | None:
+        if not name or name in self.exact:
+            return None
+        grams = self.trigrams(name)
+        shared: dict[str, int] = {}
+        for gram in grams:
+            for candidate in self.grams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        best, best_score = None, self.min_similarity
+        for candidate, count in shared.items():
+            score = 2 * count / (len(grams) + len(self.trigrams(candidate)))
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def contained_in(self, text: str) -> str | None:
+        for length in sorted(self.lengths, reverse=True):
+            for start in range(len(text) - length + 1):
+                row_id = self.exact.get(text[start:start + length])
+                if row_id:
+                    return row_id
+        return None
+
+
 @dataclass
 class LookupMaps:
-    cost_centers: dict[str, str]
-    chart_accounts: dict[str, str]
+    cost_centers: NameIndex
+    chart_accounts: NameIndex
     suppliers_by_doc: dict[str, str]
-    suppliers_by_name: dict[str, str]
-    bank_accounts: dict[str, str]
+    suppliers_by_name: NameIndex
+    bank_accounts: NameIndex
     insurance_providers: dict[str, str]
     users: list[str]
     cost_codes: set[str]
     chart_codes: set[str]
 
 
+class BatchWriter:
+    """Acumula linhas por tabela e grava cada tabela com um unico COPY.
+
+    Os ids (UUID) sao gerados no cliente, entao `add` devolve o id na hora e
+    linhas dependentes (ex.: payment_approvals -> accounts_payable) podem ser
+    enfileiradas sem round trip. As tabelas sao gravadas na ordem em que
+    apareceram pela primeira vez, o que mantem pais antes de filhos.
+
+    Linhas com `key` (chave de origem deterministica: origem + identidade da
+    linha) sao gravadas por upsert: COPY numa tabela temporaria e `insert ...
+    on conflict (import_source_key) do update ... where import_source_hash is
+    distinct from`, com o hash dos valores gravados, de modo que linhas
+    inalteradas nao geram escrita. O id vem da propria chave (uuid5), entao
+    continua o mesmo entre importacoes, inclusive quando a linha e editada. `prune` remove as linhas de cada origem que nao
+    apareceram nesta importacao.
+
+    Tabelas com unicidade alem da chave de origem (e seus filhos) ficam fora
+    do flush automatico e so sao gravadas no flush final, depois do `prune`:
+    senao a versao nova de uma linha editada esbarraria na antiga.
+    """
+
+    # colunas gravadas so no insert (nao sao comparadas nem atualizadas)
+    INSERT_ONLY = {"id", "import_source", "import_source_key", "requested_at"}
+    # fora do hash (valor do momento da importacao); o update so preenche se
+    # ainda estiver vazio: guarda a primeira aprovacao e registra uma nova
+    KEEP_FIRST = {"approved_at"}
+    # tabelas com updated_at, atualizado quando a linha muda
+    TOUCH_UPDATED_AT = {
+        "accounts_receivable", "accounts_payable", "credit_card_purchases",
+        "reimbursement_requests", "transport_vouchers",
+    }
+    # filhos apagados junto com um pai que saiu da planilha
+    DEPENDENTS = {
+        "accounts_payable": [("bank_transactions", "account_payable_id"), ("payment_approvals", "account_payable_id")],
+        "accounts_receivable": [
+            ("bank_transactions", "account_receivable_id"),
+            ("receivable_payments", "account_receivable_id"),
+            ("receivable_installments", "account_receivable_id"),
+        ],
+        "reimbursement_requests": [("reimbursement_items", "reimbursement_request_id")],
+    }
+    # request_number (reembolso) e data + centro de custo (fluxo de caixa)
+    HOLD_UNTIL_PRUNE = {"reimbursement_requests", "reimbursement_items", "cash_flow_snapshots"}
+    # ordem de limpeza: filhos antes dos pais
+    PRUNE_ORDER = [
+        "payment_approvals", "reimbursement_items", "accounts_payable", "accounts_receivable",
+        "credit_card_purchases", "reimbursement_requests", "transport_vouchers", "cash_flow_snapshots",
+    ]
+
+    def __init__(self, cur: psycopg.Cursor, batch_size: int = 5000):
+        self.cur = cur
+        self.batch_size = batch_size
+        self.buffers: dict[str, list[tuple]] = {}
+        self.columns: dict[str, tuple[str, ...]] = {}
+        self.keyed: set[str] = set()
+        self.seen: dict[tuple[str, str], set[str]] = {}
+        self.written: dict[str, int] = {}
+        self.pending = 0
+
+    def track(self, table: str, source: str) -> None:
+        """Marca `source` como importada nesta execucao (mesmo que sem linhas)."""
+        self.seen.setdefault((table, source), set())
+
+    def add(self, table: str, row: dict[str, Any], source: str | None = None, key: str | None = None) -> str:
+        if key:
+            content = repr(tuple(v for c, v in row.items() if c not in self.INSERT_ONLY | self.KEEP_FIRST))
+            row = {
+                "id": str(uuid.uuid5(SOURCE_KEY_NAMESPACE, key)),
+                **row,
+                "import_source": source,
+                "import_source_key": key,
+                "import_source_hash": hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            }
+            self.keyed.add(table)
+            self.seen.setdefault((table, source), set()).add(key)
+        else:
+            row = {"id": row.get("id") or str(uuid.uuid4()), **row}
+        cols = self.columns.setdefault(table, tuple(row))
+        if tuple(row) != cols:
+            raise ValueError(f"colunas inconsistentes para {table}: {tuple(row)} != {cols}")
+        self.buffers.setdefault(table, []).append(tuple(row.values()))
+        if table not in self.HOLD_UNTIL_PRUNE:
+            self.pending += 1
+            if self.pending >= self.batch_size:
+                self.flush(hold=self.HOLD_UNTIL_PRUNE)
+        return row["id"]
+
+    def flush(self, hold: set[str] = frozenset()) -> None:
+        """Grava os buffers; tabelas em `hold` continuam enfileiradas."""
+        for table, rows in self.buffers.items():
+            if not rows or table in hold:
+                continue
+            cols = self.columns[table]
+            col_list = ", ".join(cols)
+            if table not in self.keyed:
+                with self.cur.copy(f"copy {table} ({col_list}) from stdin") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                self.written[table] = self.written.get(table, 0) + len(rows)
+                rows.clear()
+                continue
+
+            stage = f"_stage_{table}"
+            self.cur.execute(f"create temp table if not exists {stage} (like {table} including defaults) on commit drop")
+            self.cur.execute(f"truncate {stage}")
+            with self.cur.copy(f"copy {stage} ({col_list}) from stdin") as copy:
+                for row in rows:
+                    copy.write_row(row)
+            assignments = [
+                f"{c} = coalesce({table}.{c}, excluded.{c})" if c in self.KEEP_FIRST else f"{c} = excluded.{c}"
+                for c in cols if c not in self.INSERT_ONLY
+            ]
+            if table in self.TOUCH_UPDATED_AT and "updated_at" not in cols:
+                assignments.append("updated_at = now()")
+            self.cur.execute(
+                f"""
+                insert into {table} ({col_list})
+                select {col_list} from {stage}
+                on conflict (import_source_key) do update set
+                  {", ".join(assignments)}
+                where {table}.import_source_hash is distinct from excluded.import_source_hash
+                """
+            )
+            self.written[table] = self.written.get(table, 0) + max(self.cur.rowcount, 0)
+            rows.clear()
+        self.pending = 0
+
+    def prune(self) -> dict[str, int]:
+        """Apaga linhas importadas antes cuja chave nao apareceu nesta execucao."""
+        removed: dict[str, int] = {}
+        order = {name: i for i, name in enumerate(self.PRUNE_ORDER)}
+        for table, source in sorted(self.seen, key=lambda ts: order.get(ts[0], len(order))):
+            keys = list(self.seen[(table, source)])
+            stale = f"select id from {table} where import_source = %s and import_source_key <> all(%s::text[])"
+            for child, fk in self.DEPENDENTS.get(table, []):
+                self.cur.execute(f"delete from {child} where {fk} in ({stale})", (source, keys))
+            self.cur.execute(
+                f"delete from {table} where import_source = %s and import_source_key <> all(%s::text[])",
+                (source, keys),
+            )
+            removed[table] = removed.get(table, 0) + max(self.cur.rowcount, 0)
+        return removed
+
+
+class SourceKeys:
+    """Chaves deterministicas de uma origem (arquivo|aba).
+
+    Cada chave e o hash da origem + identidade estavel da linha (numero do
+    documento, colaborador, dia ou numero da linha), nunca do conteudo:
+    editar uma celula atualiza a mesma linha no banco. Identidades repetidas
+    na mesma aba recebem um contador de ocorrencia para nao colidirem. A
+    deteccao de alteracao fica no hash de conteudo do BatchWriter.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.occurrences: dict[str, int] = {}
+
+    def __call__(self, *identity: Any) -> str:
+        ident = repr(identity)
+        occurrence = self.occurrences.get(ident, 0) + 1
+        self.occurrences[ident] = occurrence
+        return hashlib.sha256(f"{self.source}|{ident}|{occurrence}".encode("utf-8")).hexdigest()
+
+
+def child_key(parent_key: str, kind: str) -> str:
+    return hashlib.sha256(f"{parent_key}|{kind}".encode("utf-8")).hexdigest()
+
+
+# Registros tipados produzidos pela etapa de leitura. Guardam os valores ja
+# convertidos (centavos, datas, status) e os textos crus que o escritor ainda
+# precisa resolver no banco (centro de custo, conta, fornecedor, banco).
+
+@dataclass(frozen=True)
+class ConvenioRecord:
+    name: str
+
+
+@dataclass(frozen=True)
+class ReceivableRecord:
+    key: str
+    patient: str
+    procedure: str
+    guide_number: str | None
+    service_type: str
+    payment_type: str
+    insurance_name: Any
+    total_amount: int
+    received_amount: int
+    service_date: date | None
+    due_date: date | None
+    received_date: date | None
+    status: str
+    notes: str
+
+
+@dataclass(frozen=True)
+class PayableRecord:
+    key: str
+    document_number: str
+    document_type: str
+    supplier_name: Any
+    supplier_document: Any
+    cost_center: Any
+    chart_account: Any
+    bank: Any
+    description: str
+    gross_amount: int
+    net_amount: int
+    inss: int
+    irpj: int
+    csll: int
+    cofins: int
+    pis: int
+    iss: int
+    issue_date: date | None
+    due_date: date
+    payment_date: date | None
+    status: str
+    payment_method: str | None
+    notes: str
+
+
+@dataclass(frozen=True)
+class DailyApprovalRecord:
+    key: str
+    line: int
+    supplier_name: Any
+    cost_center: Any
+    document_type: str
+    description: str
+    amount: int
+    issue_date: date | None
+    due_date: date
+    status: str
+    payment_method: str | None
+    notes: str
+
+
+@dataclass(frozen=True)
+class CreditCardRecord:
+    key: str
+    merchant: str
+    purchase_date: date
+    amount: int
+    installments: int
+    cost_center: Any
+    chart_account: Any
+    description: str
+    status: str
+
+
+@dataclass(frozen=True)
+class ReimbursementItem:
+    expense_date: date
+    expense_type: str
+    description: str | None
+    receipt: str | None
+    amount: int
+
+
+@dataclass(frozen=True)
+class ReimbursementRecord:
+    key: str
+    request_number: str
+    employee_name: str
+    trip_origin: str | None
+    trip_destination: str | None
+    trip_start_date: date
+    trip_end_date: date
+    total_amount: int
+    data: dict[str, str]
+    items: list[ReimbursementItem]
+    notes: str
+
+
+@dataclass(frozen=True)
+class TransportVoucherRecord:
+    key: str
+    employee: str
+    amount: int
+    reference_month: str
+    notes: str
+
+
+@dataclass(frozen=True)
+class CashFlowRecord:
+    key: str
+    snapshot_date: date | None
+    opening_balance: int
+    closing_balance: int
+    notes: str
+
+
+@dataclass
+class ParsedSheet:
+    kind: str
+    source: str
+    records: list[Any] = field(default_factory=list)
+
+
+def parse_convenios(ws, file_name: str) -> ParsedSheet:
+    parsed = ParsedSheet("convenios", f"{file_name}|{ws.title}")
+    for row in ws.iter_rows(min_row=2, values_only=True):
+        if row[0]:
+            parsed.records.append(ConvenioRecord(row[0]))
+    return parsed
+
+
+def parse_accounts_receivable(ws, file_name: str) -> ParsedSheet:
+    parsed = ParsedSheet("accounts_receivable", f"{file_name}|{ws.title}")
+    row_key = SourceKeys(parsed.source)
+    header_row = find_header_row(ws, "PACIENTE")
+    if not header_row:
+        return parsed
+    for idx, row in enumerate(ws.iter_rows(min_row=header_row + 1, values_only=True), header_row + 1):
+        patient = row[1]
+        procedure = row[7]
+        total_amount = parse_amount(row[10])
+        if not patient or not procedure or not total_amount:
+            continue
+        received_amount = parse_amount(row[11]) or 0
+        balance = parse_amount(row[12]) or max(total_amount - received_amount, 0)
+        due_date = parse_date(row[14])
+        parsed.records.append(ReceivableRecord(
+            key=row_key("linha", idx),
+            patient=str(patient),
+            procedure=str(procedure).strip(),
+            guide_number=str(row[6]).strip() if row[6] else None,
+            service_type="medical" if "MEDICO" in normalize_text(row[3]) else "dental",
+            payment_type="insurance" if "CONVENIO" in normalize_text(row[4]) else "particular",
+            insurance_name=row[5],
+            total_amount=total_amount,
+            received_amount=received_amount,
+            service_date=parse_date(row[9]),
+            due_date=due_date,
+            received_date=parse_date(row[13]) if received_amount else None,
+            status="received" if balance <= 0 else ("overdue" if (due_date and due_date < sql_today()) else "pending"),
+            notes=f"{IMPORT_TAG} arquivo={file_name} linha={idx} paciente={patient}",
+        ))
+    return parsed
+
+
+def parse_payables(ws, file_name: str) -> ParsedSheet:
+    parsed = ParsedSheet("payables", f"{file_name}|{ws.title}")
+    row_key = SourceKeys(parsed.source)
+    for idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), 2):
+        supplier_name = row[3]
+        amount = parse_amount(row[10])
+        if not supplier_name or amount is None or amount <= 0:
+            continue
+        description = str(row[13] or supplier_name).strip()
+        issue_date = parse_date(row[6])
+        due_date = parse_date(row[7]) or issue_date or sql_today()
+        payment_date = parse_date(row[8])
+        status = map_status(row[12], due_date, payment_date)
+        if status == "cancelled":
+            continue
+        taxes = (tuple(row[15:23]) + (None,) * 8)[:8]
+        inss, irpj, csll, cofins, pis, iss, tarifa, juros = (parse_amount(v) or 0 for v in taxes)
+        net_amount = amount + tarifa + juros
+        parsed.records.append(PayableRecord(
+            key=row_key("documento", row[0]) if row[0] is not None else row_key("linha", idx),
+            document_number=f"IMP-{row[0]}" if row[0] is not None else f"FLUXO-{idx}",
+            document_type=str(row[5]).strip() if row[5] else "N/A",
+            supplier_name=supplier_name,
+            supplier_document=row[4],
+            cost_center=row[1],
+            chart_account=row[2],
+            bank=row[11],
+            description=description,
+            gross_amount=net_amount + inss + irpj + csll + cofins + pis + iss,
+            net_amount=net_amount,
+            inss=inss,
+            irpj=irpj,
+            csll=csll,
+            cofins=cofins,
+            pis=pis,
+            iss=iss,
+            issue_date=issue_date,
+            due_date=due_date,
+            payment_date=payment_date,
+            status=status,
+            payment_method=infer_payment_method(row[11], description, row[4], row[14]),
+            notes=f"{IMPORT_TAG} arquivo={file_name} aba={ws.title} linha={idx} mes={row[9]} tipo={row[14]}",
+        ))
+    return parsed
+
+
+def parse_daily_approvals(ws, file_name: str) -> ParsedSheet:
+    parsed = ParsedSheet("daily_approvals", f"{file_name}|{ws.title}")
+    row_key = SourceKeys(parsed.source)
+    header_row = find_header_row(ws, "FORNECEDOR/PRESTADOR")
+    if not header_row:
+        return parsed
+    for idx, row in enumerate(ws.iter_rows(min_row=header_row + 1, values_only=True), header_row + 1):
+        supplier_name = row[1]
+        amount = parse_amount(row[7])
+        if not supplier_name or amount is None or amount <= 0:
+            continue
+        issue_date = parse_date(row[4])
+        due_date = parse_date(row[5]) or issue_date or sql_today()
+        parsed.records.append(DailyApprovalRecord(
+            key=row_key("linha", idx),
+            line=idx,
+            supplier_name=supplier_name,
+            cost_center=row[2],
+            document_type=str(row[3]).strip() if row[3] else "N/A",
+            description=str(row[9] or supplier_name).strip(),
+            amount=amount,
+            issue_date=issue_date,
+            due_date=due_date,
+            status=map_status(row[8], due_date, None),
+            payment_method=infer_payment_method(row[9], row[10]),
+            notes=f"{IMPORT_TAG} arquivo={file_name} aba={ws.title} linha={idx}",
+        ))
+    return parsed
+
+
+def parse_credit_card(ws, file_name: str) -> ParsedSheet:
+    parsed = ParsedSheet("credit_card", f"{file_name}|{ws.title}")
+    row_key = SourceKeys(parsed.source)
+    for idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), 2):
+        merchant = row[3]
+        amount = parse_amount(row[10])
+        if not merchant or amount is None or amount <= 0:
+            continue
+        parsed.records.append(CreditCardRecord(
+            key=row_key("linha", idx),
+            merchant=str(merchant).strip(),
+            purchase_date=parse_date(row[6]) or sql_today(),
+            amount=amount,
+            installments=parse_int(row[8]) or 1,
+            cost_center=row[1] or "CLINICA",
+            chart_account=row[2] or "Cartão de crédito",
+            description=f"{str(row[12] or '').strip()} {IMPORT_TAG} arquivo={file_name} aba={ws.title} linha={idx}".strip(),
+            status="paid" if "PAGO" in normalize_text(row[11]) else "active",
+        ))
+    return parsed
+
+
+# Valores conferidos a mao dos dois formularios originais da pasta, que nao
+# trazem esses campos na planilha. Formularios novos precisam trazer os
+# campos obrigatorios; sem eles o parser falha (e o watcher poe o arquivo em
+# quarentena) em vez de gravar valores inventados.
+KNOWN_FORMS: dict[str, dict[str, Any]] = {
+    "FORMULÁRIO DE REEMBOLSO - Viagem 02032026 a 05032026.xlsx": {
+        "request_number": "REEMB-2026-03-05-FRANDIS",
+        "employee_name": "Frandis Rafael Rodrigues Vasconcelos",
+        "trip_origin": "Araraquara",
+        "trip_destination": "Sao Paulo",
+        "trip_start_date": date(2026, 3, 2),
+        "trip_end_date": date(2026, 3, 5),
+        "total_amount": 32948,
+        "DEPARTAMENTO / CENTRO DE CUSTO": "TI",
+        "FINALIDADE E/OU ITINERARIO": "Viagem corporativa",
+        "BANCO": "Bradesco",
+        "AGENCIA": "2700",
+        "CONTA CORRENTE": "13532",
+    },
+    "ORDEM DE PAGAMENTO VT.xlsx": {"reference_month": "2026-03"},
+}
+REFERENCE_LABELS = ("REFERENCIA", "COMPETENCIA", "MES")
+MONTH_RE = re.compile(r"\b(\d{1,2})[/\-.](\d{4})\b")
+
+
+def parse_reference_month(value: Any) -> str | None:
+    """YYYY-MM de uma data ou de um texto "MM/AAAA"."""
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m")
+    match = MONTH_RE.search(str(value or ""))
+    if match and 1 <= int(match.group(1)) <= 12:
+        return f"{match.group(2)}-{int(match.group(1)):02d}"
+    parsed = parse_date(value)
+    return parsed.strftime("%Y-%m") if parsed else None
+
+
+def parse_reimbursement(ws, file_name: str) -> ParsedSheet:
+    parsed = ParsedSheet("reimbursement", f"{file_name}|{ws.title}")
+    data = {}
+    items = []
+    for idx, row in enumerate(ws.iter_rows(values_only=True), 1):
+        first = row[0]
+        if isinstance(first, str) and ":" in first:
+            key, value = first.split(":", 1)
+            data[normalize_text(key)] = value.strip()
+        if idx == 12 and row[7]:
+            text = str(row[7])
+            if ":" in text:
+                _, value = text.split(":", 1)
+                data["DATA DE TERMINO"] = value.strip()
+        if idx in (24, 25):
+            expense_date = parse_date(row[0])
+            expense_type = str(row[1]).strip() if row[1] else "OUTRO"
+            description = str(row[3]).strip() if row[3] else None
+            amount = parse_amount(row[10])
+            receipt = str(row[2]).strip() if row[2] else None
+            if expense_date and amount:
+                items.append((expense_date, expense_type, description, receipt, amount))
+
+    known = KNOWN_FORMS.get(file_name, {})
+    data = {**{k: v for k, v in known.items() if k.isupper()}, **{k: v for k, v in data.items() if v}}
+    employee_name = data.get("NOME DO PROFISSIONAL") or known.get("employee_name")
+    start = parse_date(data.get("DATA DE INICIO")) or known.get("trip_start_date")
+    end = parse_date(data.get("DATA DE TERMINO")) or known.get("trip_end_date") or start
+    missing = [label for label, value in (("NOME DO PROFISSIONAL", employee_name), ("DATA DE INICIO", start)) if not value]
+    if missing:
+        raise ValueError(f"{file_name}: formulario de reembolso sem {', '.join(missing)}")
+
+    # um formulario por aba: a propria origem identifica o pedido
+    key = SourceKeys(parsed.source)("formulario")
+    parsed.records.append(ReimbursementRecord(
+        key=key,
+        request_number=known.get("request_number") or f"REEMB-{start:%Y%m%d}-{key[:8].upper()}",
+        employee_name=str(employee_name).strip(),
+        trip_origin=data.get("ORIGEM") or known.get("trip_origin"),
+        trip_destination=data.get("DESTINO") or known.get("trip_destination"),
+        trip_start_date=start,
+        trip_end_date=end,
+        # o legado so vale sem itens lidos da planilha
+        total_amount=sum(item[4] for item in items) if items else known.get("total_amount", 0),
+        data=data,
+        items=[ReimbursementItem(*item) for item in items],
+        notes=f"{IMPORT_TAG} arquivo={file_name}",
+    ))
+    return parsed
+
+
+def parse_transport_vouchers(ws, file_name: str) -> ParsedSheet:
+    parsed = ParsedSheet("transport_vouchers", f"{file_name}|{ws.title}")
+    row_key = SourceKeys(parsed.source)
+    rows = list(ws.iter_rows(values_only=True))
+    # mes de referencia: celula rotulada no cabecalho (REFERENCIA: 03/2026),
+    # o valor ao lado do rotulo, o nome do arquivo ou os formularios conhecidos
+    reference_month = None
+    for row in rows[:14]:
+        for col, value in enumerate(row):
+            label = normalize_text(value)
+            if reference_month is None and label.startswith(REFERENCE_LABELS):
+                reference_month = parse_reference_month(label.split(":", 1)[-1]) or next(
+                    (m for m in map(parse_reference_month, row[col + 1:]) if m), None)
+    reference_month = (reference_month or parse_reference_month(Path(file_name).stem)
+                       or KNOWN_FORMS.get(file_name, {}).get("reference_month"))
+    for idx, row in enumerate(rows, 1):
+        employee = row[0]
+        amount = parse_amount(row[7])
+        if idx < 15 or not employee or amount is None or amount <= 0:
+            continue
+        if reference_month is None:
+            raise ValueError(f"{file_name}: ordem de pagamento VT sem mes de referencia no cabecalho")
+        parsed.records.append(TransportVoucherRecord(
+            key=row_key("colaborador", normalize_text(employee)),
+            employee=str(employee).strip(),
+            amount=amount,
+            reference_month=reference_month,
+            notes=f"{IMPORT_TAG} arquivo={file_name} linha={idx}",
+        ))
+    return parsed
+
+
+def parse_workbook(path: Path, sheets: list[tuple[str | None, Callable[[Any, str], ParsedSheet]]]) -> list[ParsedSheet]:
+    """Abre a planilha uma unica vez e roda o parser de cada aba (None = primeira aba)."""
+    wb = load_workbook(path, data_only=True, read_only=True)
+    try:
+        return [parser(wb[name or wb.sheetnames[0]], path.name) for name, parser in sheets]
+    finally:
+        wb.close()
+
+
+def parse_cash_flow(path: Path) -> list[ParsedSheet]:
+    with path.open(encoding="latin1", newline="") as fp:
+        rows = list(csv.reader(fp, delimiter=";"))
+
+    parsed = ParsedSheet("cash_flow", f"{path.name}|Fluxo de caixa")
+    row_key = SourceKeys(parsed.source)
+    # saldos localizados pelo rotulo da primeira coluna; sem rotulo, cai nas
+    # linhas fixas do layout original (3 e 106)
+    labels = [normalize_text(row[0]) if row else "" for row in rows]
+    opening_row = next((i for i, label in enumerate(labels) if label.startswith("SALDO INICIAL")), 2)
+    closing_row = next((i for i, label in enumerate(labels) if label.startswith("SALDO FINAL")), 105)
+    headers = rows[0][1:21]
+    opening = rows[opening_row][1:21]
+    closing = rows[closing_row][1:21]
+    for idx, day in enumerate(headers):
+        if not day:
+            continue
+        opening_balance = parse_amount(opening[idx]) or 0
+        parsed.records.append(CashFlowRecord(
+            key=row_key("dia", day),
+            snapshot_date=parse_date(day),
+            opening_balance=opening_balance,
+            closing_balance=parse_amount(closing[idx]) or opening_balance,
+            notes=f"{IMPORT_TAG} arquivo={path.name}",
+        ))
+    return [parsed]
+
+
+# planilha -> abas lidas dela (na ordem em que sao gravadas)
+WORKBOOKS: list[tuple[str, list[tuple[str | None, Callable[[Any, str], ParsedSheet]]]]] = [
+    ("Contas a Receber IRB.xlsx", [
+        ("Cadastro Convenios", parse_convenios),
+        ("Contas a Receber", parse_accounts_receivable),
+    ]),
+    ("FLUXO DE PAGAMENTO- 2026.xlsx", [
+        ("FLUXO DE PAGAMENTOS", parse_payables),
+        ("PAGAMENTO DIARIO (2)", parse_daily_approvals),
+        ("COMPRAS CARTÃO DE CRÉDITO", parse_credit_card),
+    ]),
+    ("FORMULÁRIO DE REEMBOLSO - Viagem 02032026 a 05032026.xlsx", [(None, parse_reimbursement)]),
+    ("ORDEM DE PAGAMENTO VT.xlsx", [(None, parse_transport_vouchers)]),
+]
+CASH_FLOW_CSV = "Fluxo de Caixa (1)(Fluxo de caixa - Fevereiro-26).csv"
+
+# roteamento de abas de planilhas quaisquer (watch_financeiro_folder.py):
+# pelo nome conhecido da aba, senao pela assinatura do cabecalho; formularios
+# de uma aba so sao reconhecidos pelo nome do arquivo
+SHEET_TITLES = {normalize_text(name): parser for _, sheets in WORKBOOKS for name, parser in sheets if name}
+HEADER_SIGNATURES: list[tuple[str, Callable[[Any, str], ParsedSheet]]] = [
+    ("FORNECEDOR/PRESTADOR", parse_daily_approvals),
+    ("PACIENTE", parse_accounts_receivable),
+]
+FIRST_SHEET_FILES: dict[str, Callable[[Any, str], ParsedSheet]] = {
+    "FORMULARIO DE REEMBOLSO": parse_reimbursement,
+    "ORDEM DE PAGAMENTO VT": parse_transport_vouchers,
+}
+CASH_FLOW_PREFIX = "FLUXO DE CAIXA"
+
+
+def route_sheet(ws, header_rows: int = 30) -> Callable[[Any, str], ParsedSheet] | None:
+    parser = SHEET_TITLES.get(normalize_text(ws.title))
+    if parser:
+        return parser
+    for marker, parser in HEADER_SIGNATURES:
+        if find_header_row(ws, marker, header_rows):
+            return parser
+    return None
+
+
+def parse_routed_file(path: Path) -> list[ParsedSheet]:
+    """Le um arquivo qualquer da pasta, roteando cada aba para o parser certo."""
+    name = normalize_text(path.stem)
+    if path.suffix.lower() == ".csv":
+        return parse_cash_flow(path) if name.startswith(CASH_FLOW_PREFIX) else []
+    wb = load_workbook(path, data_only=True, read_only=True)
+    try:
+        for prefix, parser in FIRST_SHEET_FILES.items():
+            if name.startswith(prefix):
+                return [parser(wb[wb.sheetnames[0]], path.name)]
+        parsed = []
+        for ws in wb.worksheets:
+            parser = route_sheet(ws)
+            if parser:
+                parsed.append(parser(ws, path.name))
+        return parsed
+    finally:
+        wb.close()
+
+
+# tipo de aba -> rotulo do resumo final
+RESULT_LABELS = {
+    "convenios": "convenios",
+    "accounts_receivable": "contas_receber",
+    "payables": "contas_pagar",
+    "daily_approvals": "aprovacoes_diarias",
+    "credit_card": "cartao_credito",
+    "reimbursement": "reembolsos",
+    "transport_vouchers": "vale_transporte",
+    "cash_flow": "fluxo_caixa",
+}
+
+
 class Importer:
+    """Escritor unico: resolve referencias no banco e enfileira as linhas no BatchWriter."""
+
     def __init__(self, conn: psycopg.Connection):
         self.conn = conn
         self.cur = conn.cursor()
+        self.writer = BatchWriter(self.cur)
         self.lookups = self.load_lookups()
 
     def load_lookups(self) -> LookupMaps:
-        cost_centers = {}
+        cost_centers = NameIndex()
         cost_codes = set()
         self.cur.execute("select id, code, name from cost_centers")
         for row_id, code, name in self.cur.fetchall():
@@ -182,7 +982,7 @@ class Importer:
             cost_centers[normalize_text(code)] = str(row_id)
             cost_codes.add(code)
 
-        chart_accounts = {}
+        chart_accounts = NameIndex()
         chart_codes = set()
         self.cur.execute("select id, code, name from chart_of_accounts")
         for row_id, code, name in self.cur.fetchall():
@@ -190,15 +990,17 @@ class Importer:
             chart_accounts[normalize_text(code)] = str(row_id)
             chart_codes.add(code)
 
+        # documentos indexados so pelos digitos (coluna gerada doc_digits),
+        # entao CNPJ/CPF em qualquer formato da planilha resolvem sem ir ao banco
         suppliers_by_doc = {}
-        suppliers_by_name = {}
-        self.cur.execute("select id, coalesce(cnpj, cpf), legal_name from suppliers")
-        for row_id, doc, name in self.cur.fetchall():
-            if doc:
-                suppliers_by_doc[normalize_text(doc)] = str(row_id)
+        suppliers_by_name = NameIndex(min_similarity=0.9)
+        self.cur.execute("select id, doc_digits, legal_name from suppliers")
+        for row_id, digits, name in self.cur.fetchall():
+            if digits:
+                suppliers_by_doc.setdefault(digits, str(row_id))
             suppliers_by_name[normalize_text(name)] = str(row_id)
 
-        bank_accounts = {}
+        bank_accounts = NameIndex()
         self.cur.execute("select id, bank_name, nickname from bank_accounts")
         for row_id, bank_name, nickname in self.cur.fetchall():
             if bank_name:
@@ -232,36 +1034,6 @@ class Importer:
     def default_user_id(self) -> str | None:
         return self.lookups.users[0] if self.lookups.users else None
 
-    def cleanup_previous_imports(self) -> None:
-        statements = [
-            """
-            delete from bank_transactions
-            where account_payable_id in (
-              select id from accounts_payable where notes like %s or notes like %s
-            )
-            or account_receivable_id in (
-              select id from accounts_receivable where notes like %s or notes like %s
-            )
-            """,
-            "delete from payment_approvals where notes like %s or notes like %s",
-            "delete from bank_transactions where external_ref like %s or external_ref like %s",
-            "delete from receivable_payments where notes like %s or notes like %s",
-            "delete from receivable_installments where account_receivable_id in (select id from accounts_receivable where notes like %s or notes like %s)",
-            "delete from accounts_receivable where notes like %s or notes like %s",
-            "delete from reimbursement_items where reimbursement_request_id in (select id from reimbursement_requests where notes like %s or notes like %s)",
-            "delete from reimbursement_requests where notes like %s or notes like %s",
-            "delete from transport_vouchers where notes like %s or notes like %s",
-            "delete from cash_flow_snapshots where notes like %s or notes like %s",
-            "delete from credit_card_purchases where description like %s or description like %s",
-            "delete from accounts_payable where notes like %s or notes like %s",
-        ]
-        for statement in statements:
-            placeholder_count = statement.count("%s")
-            params = []
-            for _ in range(placeholder_count // 2):
-                params.extend((f"{IMPORT_TAG}%", f"{SEED_TAG}%"))
-            self.cur.execute(statement, tuple(params))
-
     def ensure_cost_center(self, raw_name: Any) -> str | None:
         if raw_name is None or str(raw_name).strip() == "":
             return None
@@ -286,6 +1058,7 @@ class Importer:
         existing = self.lookups.cost_centers.get(normalized)
         if existing:
             return existing
+        warn_similar("centro de custo", raw_name, self.lookups.cost_centers.suggest(normalized))
         code = slug_code(normalized, "CC", self.lookups.cost_codes)
         self.cur.execute(
             """
@@ -321,6 +1094,7 @@ class Importer:
         existing = self.lookups.chart_accounts.get(normalized)
         if existing:
             return existing
+        warn_similar("conta", raw_name, self.lookups.chart_accounts.suggest(normalized))
         code = slug_code(normalized, "CH", self.lookups.chart_codes)
         self.cur.execute(
             """
@@ -338,29 +1112,12 @@ class Importer:
         if name is None or str(name).strip() == "":
             return None
         normalized_name = normalize_text(name)
-        normalized_doc = normalize_text(document) if document else ""
-        doc_digits = re.sub(r"\D", "", str(document or ""))
-        if normalized_doc and normalized_doc in self.lookups.suppliers_by_doc:
-            return self.lookups.suppliers_by_doc[normalized_doc]
-        if doc_digits:
-            self.cur.execute(
-                """
-                select id, coalesce(cnpj, cpf), legal_name
-                from suppliers
-                where regexp_replace(coalesce(cnpj, cpf, ''), '\\D', '', 'g') = %s
-                limit 1
-                """,
-                (doc_digits,),
-            )
-            row = self.cur.fetchone()
-            if row:
-                row_id = str(row[0])
-                if normalized_doc:
-                    self.lookups.suppliers_by_doc[normalized_doc] = row_id
-                self.lookups.suppliers_by_name[normalized_name] = row_id
-                return row_id
+        digits = doc_digits(document)
+        if digits and digits in self.lookups.suppliers_by_doc:
+            return self.lookups.suppliers_by_doc[digits]
         if normalized_name in self.lookups.suppliers_by_name:
             return self.lookups.suppliers_by_name[normalized_name]
+        warn_similar("fornecedor", name, self.lookups.suppliers_by_name.suggest(normalized_name))
 
         cnpj = None
         cpf = None
@@ -369,32 +1126,28 @@ class Importer:
             cnpj = re.search(r"\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}", doc_text).group(0)
         elif re.search(r"\d{3}\.\d{3}\.\d{3}-\d{2}", doc_text):
             cpf = re.search(r"\d{3}\.\d{3}\.\d{3}-\d{2}", doc_text).group(0)
-        elif re.fullmatch(r"\d{11}", re.sub(r"\D", "", doc_text or "")):
-            digits = re.sub(r"\D", "", doc_text)
+        elif re.fullmatch(r"\d{11}", digits):
             cpf = f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
 
         self.cur.execute(
             """
             insert into suppliers (cnpj, cpf, legal_name, trade_name, notes, is_active)
             values (%s, %s, %s, %s, %s, true)
-            returning id
+            returning id, doc_digits
             """,
             (cnpj, cpf, str(name).strip(), str(name).strip(), notes),
         )
-        row_id = str(self.cur.fetchone()[0])
-        if normalized_doc:
-            self.lookups.suppliers_by_doc[normalized_doc] = row_id
+        row_id, stored_digits = self.cur.fetchone()
+        row_id = str(row_id)
+        if stored_digits:
+            self.lookups.suppliers_by_doc[stored_digits] = row_id
         self.lookups.suppliers_by_name[normalized_name] = row_id
         return row_id
 
     def bank_account_for(self, raw_bank: Any) -> str | None:
         if raw_bank is None:
             return None
-        text = normalize_text(raw_bank)
-        for key, row_id in self.lookups.bank_accounts.items():
-            if key and key in text:
-                return row_id
-        return None
+        return self.lookups.bank_accounts.contained_in(normalize_text(raw_bank))
 
     def ensure_insurance_provider(self, name: Any) -> str | None:
         if name is None or str(name).strip() == "":
@@ -417,406 +1170,214 @@ class Importer:
         self.lookups.insurance_providers[normalize_text(code)] = row_id
         return row_id
 
-    def import_convenios(self) -> int:
-        path = FINANCEIRO_DIR / "Contas a Receber IRB.xlsx"
-        wb = load_workbook(path, data_only=True, read_only=True)
-        ws = wb["Cadastro Convenios"]
+    def write(self, parsed: ParsedSheet) -> int:
+        return getattr(self, f"write_{parsed.kind}")(parsed)
+
+    def write_convenios(self, parsed: ParsedSheet) -> int:
         imported = 0
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            name = row[0]
-            if not name:
-                continue
-            before = self.lookups.insurance_providers.get(normalize_text(name))
-            self.ensure_insurance_provider(name)
+        for record in parsed.records:
+            before = self.lookups.insurance_providers.get(normalize_text(record.name))
+            self.ensure_insurance_provider(record.name)
             if before is None:
                 imported += 1
         return imported
 
-    def import_accounts_receivable(self) -> int:
-        path = FINANCEIRO_DIR / "Contas a Receber IRB.xlsx"
-        wb = load_workbook(path, data_only=True, read_only=True)
-        ws = wb["Contas a Receber"]
-        header_row = find_header_row(ws, "PACIENTE")
-        if not header_row:
-            return 0
-        imported = 0
-        for idx, row in enumerate(ws.iter_rows(min_row=header_row + 1, values_only=True), header_row + 1):
-            patient = row[1]
-            procedure = row[7]
-            total_amount = parse_amount(row[10])
-            if not patient or not procedure or not total_amount:
-                continue
-            received_amount = parse_amount(row[11]) or 0
-            balance = parse_amount(row[12]) or max(total_amount - received_amount, 0)
-            payment_type = "insurance" if "CONVENIO" in normalize_text(row[4]) else "particular"
-            insurance_id = self.ensure_insurance_provider(row[5]) if payment_type == "insurance" else None
-            cost_center_id = self.ensure_cost_center("FATURAMENTO" if payment_type == "insurance" else "CLINICA")
-            status = "received" if balance <= 0 else ("overdue" if (parse_date(row[14]) and parse_date(row[14]) < sql_today()) else "pending")
-            self.cur.execute(
-                """
-                insert into accounts_receivable (
-                  patient_id, insurance_provider_id, cost_center_id, service_type, procedure_description,
-                  guide_number, total_amount, received_amount, service_date, due_date, received_date,
-                  status, payment_type, notes, created_by
-                ) values (
-                  null, %s, %s, %s, %s,
-                  %s, %s, %s, %s, %s, %s,
-                  %s, %s, %s, %s
-                )
-                """,
-                (
-                    insurance_id,
-                    cost_center_id,
-                    "medical" if "MEDICO" in normalize_text(row[3]) else "dental",
-                    str(procedure).strip(),
-                    str(row[6]).strip() if row[6] else None,
-                    total_amount,
-                    received_amount,
-                    parse_date(row[9]),
-                    parse_date(row[14]),
-                    parse_date(row[13]) if received_amount else None,
-                    status,
-                    payment_type,
-                    f"{IMPORT_TAG} arquivo=Contas a Receber IRB.xlsx linha={idx} paciente={patient}",
-                    self.default_user_id,
-                ),
-            )
-            imported += 1
-        return imported
-
-    def import_payables_sheet(self) -> int:
-        path = FINANCEIRO_DIR / "FLUXO DE PAGAMENTO- 2026.xlsx"
-        wb = load_workbook(path, data_only=True, read_only=True)
-        ws = wb["FLUXO DE PAGAMENTOS"]
-        imported = 0
-        for idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), 2):
-            supplier_name = row[3]
-            amount = parse_amount(row[10])
-            if not supplier_name or amount is None or amount <= 0:
-                continue
-            description = str(row[13] or supplier_name).strip()
-            issue_date = parse_date(row[6])
-            due_date = parse_date(row[7]) or issue_date or sql_today()
-            payment_date = parse_date(row[8])
-            status = map_status(row[12], due_date, payment_date)
-            if status == "cancelled":
-                continue
-            cost_center_id = self.ensure_cost_center(row[1])
-            chart_id = self.ensure_chart_account(row[2], "expense")
-            supplier_id = self.ensure_supplier(supplier_name, row[4], f"{IMPORT_TAG} fornecedor planilha fluxo")
-            bank_id = self.bank_account_for(row[11])
-            inss = parse_amount(row[15]) or 0
-            irpj = parse_amount(row[16]) or 0
-            csll = parse_amount(row[17]) or 0
-            cofins = parse_amount(row[18]) or 0
-            pis = parse_amount(row[19]) or 0
-            iss = parse_amount(row[20]) or 0
-            tarifa = parse_amount(row[21]) or 0
-            juros = parse_amount(row[22]) or 0
-            net_amount = amount + tarifa + juros
-            gross_amount = net_amount + inss + irpj + csll + cofins + pis + iss
-            self.cur.execute(
-                """
-                insert into accounts_payable (
-                  document_number, document_type, supplier_id, cost_center_id, chart_account_id, bank_account_id,
-                  description, gross_amount, net_amount, inss_retention, irpj_retention, csll_retention,
-                  cofins_retention, pis_retention, iss_retention, issue_date, due_date, payment_date,
-                  competence_date, status, payment_method, notes, created_by, approved_by, approved_at, paid_by
-                ) values (
-                  %s, %s, %s, %s, %s, %s,
-                  %s, %s, %s, %s, %s, %s,
-                  %s, %s, %s, %s, %s, %s,
-                  %s, %s, %s, %s, %s, %s, %s, %s
-                )
-                returning id
-                """,
-                (
-                    f"IMP-{row[0]}" if row[0] is not None else f"FLUXO-{idx}",
-                    str(row[5]).strip() if row[5] else "N/A",
-                    supplier_id,
-                    cost_center_id,
-                    chart_id,
-                    bank_id,
-                    description,
-                    gross_amount,
-                    net_amount,
-                    inss,
-                    irpj,
-                    csll,
-                    cofins,
-                    pis,
-                    iss,
-                    issue_date,
-                    due_date,
-                    payment_date,
-                    issue_date,
-                    status,
-                    infer_payment_method(row[11], description, row[4], row[14]),
-                    f"{IMPORT_TAG} arquivo=FLUXO DE PAGAMENTO- 2026.xlsx aba=FLUXO DE PAGAMENTOS linha={idx} mes={row[9]} tipo={row[14]}",
-                    self.default_user_id,
-                    self.default_user_id if status in {"approved", "paid"} else None,
-                    datetime.now() if status in {"approved", "paid"} else None,
-                    self.default_user_id if status == "paid" else None,
-                ),
-            )
-            imported += 1
-        return imported
+    def write_accounts_receivable(self, parsed: ParsedSheet) -> int:
+        self.writer.track("accounts_receivable", parsed.source)
+        for record in parsed.records:
+            insurance = record.payment_type == "insurance"
+            self.writer.add("accounts_receivable", {
+                "patient_id": None,
+                "insurance_provider_id": self.ensure_insurance_provider(record.insurance_name) if insurance else None,
+                "cost_center_id": self.ensure_cost_center("FATURAMENTO" if insurance else "CLINICA"),
+                "service_type": record.service_type,
+                "procedure_description": record.procedure,
+                "guide_number": record.guide_number,
+                "total_amount": record.total_amount,
+                "received_amount": record.received_amount,
+                "service_date": record.service_date,
+                "due_date": record.due_date,
+                "received_date": record.received_date,
+                "status": record.status,
+                "payment_type": record.payment_type,
+                "notes": record.notes,
+                "created_by": self.default_user_id,
+            }, parsed.source, record.key)
+        return len(parsed.records)
 
-    def import_daily_approvals(self) -> int:
-        path = FINANCEIRO_DIR / "FLUXO DE PAGAMENTO- 2026.xlsx"
-        wb = load_workbook(path, data_only=True, read_only=True)
-        ws = wb["PAGAMENTO DIARIO (2)"]
-        header_row = find_header_row(ws, "FORNECEDOR/PRESTADOR")
-        if not header_row:
-            return 0
-        imported = 0
-        for idx, row in enumerate(ws.iter_rows(min_row=header_row + 1, values_only=True), header_row + 1):
-            supplier_name = row[1]
-            amount = parse_amount(row[7])
-            if not supplier_name or amount is None or amount <= 0:
-                continue
-            issue_date = parse_date(row[4])
-            due_date = parse_date(row[5]) or issue_date or sql_today()
-            supplier_id = self.ensure_supplier(supplier_name, None, f"{IMPORT_TAG} fornecedor aprovacao diaria")
-            cost_center_id = self.ensure_cost_center(row[2])
-            chart_id = self.ensure_chart_account("Aprovação diária", "expense")
-            status = map_status(row[8], due_date, None)
-            self.cur.execute(
-                """
-                insert into accounts_payable (
-                  document_number, document_type, supplier_id, cost_center_id, chart_account_id,
-                  description, gross_amount, net_amount, issue_date, due_date, status,
-                  payment_method, notes, created_by
-                ) values (
-                  %s, %s, %s, %s, %s,
-                  %s, %s, %s, %s, %s, %s,
-                  %s, %s, %s
-                )
-                returning id
-                """,
-                (
-                    f"APD-{idx}",
-                    str(row[3]).strip() if row[3] else "N/A",
-                    supplier_id,
-                    cost_center_id,
-                    chart_id,
-                    str(row[9] or supplier_name).strip(),
-                    amount,
-                    amount,
-                    issue_date,
-                    due_date,
-                    status,
-                    infer_payment_method(row[9], row[10]),
-                    f"{IMPORT_TAG} arquivo=FLUXO DE PAGAMENTO- 2026.xlsx aba=PAGAMENTO DIARIO (2) linha={idx}",
-                    self.default_user_id,
-                ),
-            )
-            payable_id = str(self.cur.fetchone()[0])
-            self.cur.execute(
-                """
-                insert into payment_approvals (
-                  account_payable_id, requested_by, requested_at, status, notes
-                ) values (%s, %s, now(), %s, %s)
-                """,
-                (
-                    payable_id,
-                    self.default_user_id,
-                    "approved" if status == "approved" else "pending",
-                    f"{IMPORT_TAG} aprovação diária linha={idx}",
+    def write_payables(self, parsed: ParsedSheet) -> int:
+        self.writer.track("accounts_payable", parsed.source)
+        for record in parsed.records:
+            approved = record.status in {"approved", "paid"}
+            self.writer.add("accounts_payable", {
+                "document_number": record.document_number,
+                "document_type": record.document_type,
+                "supplier_id": self.ensure_supplier(
+                    record.supplier_name, record.supplier_document, f"{IMPORT_TAG} fornecedor planilha fluxo"
                 ),
-            )
-            imported += 1
-        return imported
+                "cost_center_id": self.ensure_cost_center(record.cost_center),
+                "chart_account_id": self.ensure_chart_account(record.chart_account, "expense"),
+                "bank_account_id": self.bank_account_for(record.bank),
+                "description": record.description,
+                "gross_amount": record.gross_amount,
+                "net_amount": record.net_amount,
+                "inss_retention": record.inss,
+                "irpj_retention": record.irpj,
+                "csll_retention": record.csll,
+                "cofins_retention": record.cofins,
+                "pis_retention": record.pis,
+                "iss_retention": record.iss,
+                "issue_date": record.issue_date,
+                "due_date": record.due_date,
+                "payment_date": record.payment_date,
+                "competence_date": record.issue_date,
+                "status": record.status,
+                "payment_method": record.payment_method,
+                "notes": record.notes,
+                "created_by": self.default_user_id,
+                "approved_by": self.default_user_id if approved else None,
+                "approved_at": datetime.now() if approved else None,
+                "paid_by": self.default_user_id if record.status == "paid" else None,
+            }, parsed.source, record.key)
+        return len(parsed.records)
 
-    def import_credit_card(self) -> int:
-        path = FINANCEIRO_DIR / "FLUXO DE PAGAMENTO- 2026.xlsx"
-        wb = load_workbook(path, data_only=True, read_only=True)
-        ws = wb["COMPRAS CARTÃO DE CRÉDITO"]
-        imported = 0
-        for idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), 2):
-            merchant = row[3]
-            amount = parse_amount(row[10])
-            if not merchant or amount is None or amount <= 0:
-                continue
-            installments = parse_int(row[8]) or 1
-            self.cur.execute(
-                """
-                insert into credit_card_purchases (
-                  card_last_digits, card_holder, merchant_name, purchase_date, total_amount,
-                  installments, installment_amount, current_installment, cost_center_id,
-                  chart_account_id, description, status
-                ) values (
-                  %s, %s, %s, %s, %s,
-                  %s, %s, %s, %s,
-                  %s, %s, %s
-                )
-                """,
-                (
-                    "3646",
-                    "IRB",
-                    str(merchant).strip(),
-                    parse_date(row[6]) or sql_today(),
-                    amount,
-                    installments,
-                    amount,
-                    1,
-                    self.ensure_cost_center(row[1] or "CLINICA"),
-                    self.ensure_chart_account(row[2] or "Cartão de crédito", "expense"),
-                    f"{str(row[12] or '').strip()} {IMPORT_TAG} arquivo=FLUXO DE PAGAMENTO- 2026.xlsx aba=COMPRAS CARTÃO DE CRÉDITO linha={idx}".strip(),
-                    "paid" if "PAGO" in normalize_text(row[11]) else "active",
+    def write_daily_approvals(self, parsed: ParsedSheet) -> int:
+        self.writer.track("accounts_payable", parsed.source)
+        self.writer.track("payment_approvals", parsed.source)
+        for record in parsed.records:
+            # accounts_payable das aprovacoes diarias tem menos colunas que o
+            # fluxo; os ausentes vao explicitos para manter um unico COPY
+            payable_id = self.writer.add("accounts_payable", {
+                "document_number": f"APD-{record.line}",
+                "document_type": record.document_type,
+                "supplier_id": self.ensure_supplier(
+                    record.supplier_name, None, f"{IMPORT_TAG} fornecedor aprovacao diaria"
                 ),
-            )
-            imported += 1
-        return imported
+                "cost_center_id": self.ensure_cost_center(record.cost_center),
+                "chart_account_id": self.ensure_chart_account("Aprovação diária", "expense"),
+                "bank_account_id": None,
+                "description": record.description,
+                "gross_amount": record.amount,
+                "net_amount": record.amount,
+                "inss_retention": 0,
+                "irpj_retention": 0,
+                "csll_retention": 0,
+                "cofins_retention": 0,
+                "pis_retention": 0,
+                "iss_retention": 0,
+                "issue_date": record.issue_date,
+                "due_date": record.due_date,
+                "payment_date": None,
+                "competence_date": None,
+                "status": record.status,
+                "payment_method": record.payment_method,
+                "notes": record.notes,
+                "created_by": self.default_user_id,
+                "approved_by": None,
+                "approved_at": None,
+                "paid_by": None,
+            }, parsed.source, record.key)
+            self.writer.add("payment_approvals", {
+                "account_payable_id": payable_id,
+                "requested_by": self.default_user_id,
+                "requested_at": datetime.now(),
+                "status": "approved" if record.status == "approved" else "pending",
+                "notes": f"{IMPORT_TAG} aprovação diária linha={record.line}",
+            }, parsed.source, child_key(record.key, "approval"))
+        return len(parsed.records)
 
-    def import_reimbursement(self) -> int:
-        path = FINANCEIRO_DIR / "FORMULÁRIO DE REEMBOLSO - Viagem 02032026 a 05032026.xlsx"
-        wb = load_workbook(path, data_only=True, read_only=True)
-        ws = wb[wb.sheetnames[0]]
-
-        data = {}
-        items = []
-        for idx, row in enumerate(ws.iter_rows(values_only=True), 1):
-            first = row[0]
-            if isinstance(first, str) and ":" in first:
-                key, value = first.split(":", 1)
-                data[normalize_text(key)] = value.strip()
-            if idx == 12 and row[7]:
-                text = str(row[7])
-                if ":" in text:
-                    _, value = text.split(":", 1)
-                    data["DATA DE TERMINO"] = value.strip()
-            if idx in (24, 25):
-                expense_date = parse_date(row[0])
-                expense_type = str(row[1]).strip() if row[1] else "OUTRO"
-                description = str(row[3]).strip() if row[3] else None
-                amount = parse_amount(row[10])
-                receipt = str(row[2]).strip() if row[2] else None
-                if expense_date and amount:
-                    items.append((expense_date, expense_type, description, receipt, amount))
-
-        total_amount = parse_amount(329.48) if items else 0
-        employee_doc = data.get("CNPJ/CNPJ")
-        employee_cpf = employee_doc if employee_doc and len(str(employee_doc).strip()) <= 14 else None
-        self.cur.execute(
-            """
-            insert into reimbursement_requests (
-              request_number, employee_name, employee_department, employee_cpf,
-              trip_origin, trip_destination, trip_start_date, trip_end_date, trip_purpose,
-              bank_name, bank_agency, bank_account, bank_account_type, pix_key,
-              total_amount, approved_amount, status, requested_by, notes
-            ) values (
-              %s, %s, %s, %s,
-              %s, %s, %s, %s, %s,
-              %s, %s, %s, %s, %s,
-              %s, %s, %s, %s, %s
-            )
-            returning id
-            """,
-            (
-                "REEMB-2026-03-05-FRANDIS",
-                data.get("NOME DO PROFISSIONAL") or "Frandis Rafael Rodrigues Vasconcelos",
-                (data.get("DEPARTAMENTO / CENTRO DE CUSTO") or "TI").strip(),
-                employee_cpf,
-                "Araraquara",
-                "Sao Paulo",
-                parse_date(data.get("DATA DE INICIO")) or date(2026, 3, 2),
-                parse_date(data.get("DATA DE TERMINO")) or date(2026, 3, 5),
-                data.get("FINALIDADE E/OU ITINERARIO") or "Viagem corporativa",
-                data.get("BANCO") or "Bradesco",
-                data.get("AGENCIA") or "2700",
-                data.get("CONTA CORRENTE") or "13532",
-                "corrente",
-                data.get("CHAVE PIX") or data.get("CNPJ/CNPJ"),
-                total_amount,
-                total_amount,
-                "approved",
-                self.default_user_id,
-                f"{IMPORT_TAG} arquivo={path.name}",
-            ),
-        )
-        request_id = str(self.cur.fetchone()[0])
-        for expense_date, expense_type, description, receipt, amount in items:
-            self.cur.execute(
-                """
-                insert into reimbursement_items (
-                  reimbursement_request_id, expense_date, expense_type, description,
-                  receipt_number, amount, approved, approved_amount
-                ) values (%s, %s, %s, %s, %s, %s, true, %s)
-                """,
-                (request_id, expense_date, expense_type.lower(), description, receipt, amount, amount),
-            )
-        return 1
+    def write_credit_card(self, parsed: ParsedSheet) -> int:
+        self.writer.track("credit_card_purchases", parsed.source)
+        for record in parsed.records:
+            self.writer.add("credit_card_purchases", {
+                "card_last_digits": "3646",
+                "card_holder": "IRB",
+                "merchant_name": record.merchant,
+                "purchase_date": record.purchase_date,
+                "total_amount": record.amount,
+                "installments": record.installments,
+                "installment_amount": record.amount,
+                "current_installment": 1,
+                "cost_center_id": self.ensure_cost_center(record.cost_center),
+                "chart_account_id": self.ensure_chart_account(record.chart_account, "expense"),
+                "description": record.description,
+                "status": record.status,
+            }, parsed.source, record.key)
+        return len(parsed.records)
 
-    def import_transport_vouchers(self) -> int:
-        path = FINANCEIRO_DIR / "ORDEM DE PAGAMENTO VT.xlsx"
-        wb = load_workbook(path, data_only=True, read_only=True)
-        ws = wb[wb.sheetnames[0]]
-        imported = 0
-        reference_date = date(2026, 3, 5)
-        for idx, row in enumerate(ws.iter_rows(values_only=True), 1):
-            employee = row[0]
-            amount = parse_amount(row[7])
-            if idx < 15 or not employee or amount is None or amount <= 0:
-                continue
-            self.cur.execute(
-                """
-                insert into transport_vouchers (
-                  employee_name, employee_role, contract_type, cost_center_id,
-                  monthly_amount, reference_month, status, notes
-                ) values (%s, %s, %s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    str(employee).strip(),
-                    "Colaborador CLT",
-                    "clt",
-                    self.ensure_cost_center("RH"),
-                    amount,
-                    reference_date.strftime("%Y-%m"),
-                    "pending",
-                    f"{IMPORT_TAG} arquivo={path.name} linha={idx}",
-                ),
-            )
-            imported += 1
-        return imported
+    def write_reimbursement(self, parsed: ParsedSheet) -> int:
+        self.writer.track("reimbursement_requests", parsed.source)
+        self.writer.track("reimbursement_items", parsed.source)
+        for record in parsed.records:
+            data = record.data
+            total_amount = record.total_amount if record.items else 0
+            employee_doc = data.get("CNPJ/CNPJ")
+            employee_cpf = employee_doc if employee_doc and len(str(employee_doc).strip()) <= 14 else None
+            request_id = self.writer.add("reimbursement_requests", {
+                "request_number": record.request_number,
+                "employee_name": record.employee_name,
+                "employee_department": (data.get("DEPARTAMENTO / CENTRO DE CUSTO") or "").strip() or None,
+                "employee_cpf": employee_cpf,
+                "trip_origin": record.trip_origin,
+                "trip_destination": record.trip_destination,
+                "trip_start_date": record.trip_start_date,
+                "trip_end_date": record.trip_end_date,
+                "trip_purpose": data.get("FINALIDADE E/OU ITINERARIO"),
+                "bank_name": data.get("BANCO"),
+                "bank_agency": data.get("AGENCIA"),
+                "bank_account": data.get("CONTA CORRENTE"),
+                "bank_account_type": "corrente" if data.get("CONTA CORRENTE") else None,
+                "pix_key": data.get("CHAVE PIX") or data.get("CNPJ/CNPJ"),
+                "total_amount": total_amount,
+                "approved_amount": total_amount,
+                "status": "approved",
+                "requested_by": self.default_user_id,
+                "notes": record.notes,
+            }, parsed.source, record.key)
+            for item_number, item in enumerate(record.items, 1):
+                self.writer.add("reimbursement_items", {
+                    "reimbursement_request_id": request_id,
+                    "expense_date": item.expense_date,
+                    "expense_type": item.expense_type.lower(),
+                    "description": item.description,
+                    "receipt_number": item.receipt,
+                    "amount": item.amount,
+                    "approved": True,
+                    "approved_amount": item.amount,
+                }, parsed.source, child_key(record.key, f"item{item_number}"))
+        return len(parsed.records)
 
-    def import_cash_flow_snapshots(self) -> int:
-        path = FINANCEIRO_DIR / "Fluxo de Caixa (1)(Fluxo de caixa - Fevereiro-26).csv"
-        with path.open(encoding="latin1", newline="") as fp:
-            rows = list(csv.reader(fp, delimiter=";"))
+    def write_transport_vouchers(self, parsed: ParsedSheet) -> int:
+        self.writer.track("transport_vouchers", parsed.source)
+        for record in parsed.records:
+            self.writer.add("transport_vouchers", {
+                "employee_name": record.employee,
+                "employee_role": "Colaborador CLT",
+                "contract_type": "clt",
+                "cost_center_id": self.ensure_cost_center("RH"),
+                "monthly_amount": record.amount,
+                "reference_month": record.reference_month,
+                "status": "pending",
+                "notes": record.notes,
+            }, parsed.source, record.key)
+        return len(parsed.records)
 
-        headers = rows[0][1:21]
-        opening = rows[2][1:21]
-        closing = rows[105][1:21]
-        imported = 0
-        for idx, day in enumerate(headers):
-            if not day:
-                continue
-            snapshot_date = parse_date(day)
-            opening_balance = parse_amount(opening[idx]) or 0
-            closing_balance = parse_amount(closing[idx]) or opening_balance
-            delta = closing_balance - opening_balance
-            credits = delta if delta > 0 else 0
-            debits = -delta if delta < 0 else 0
-            self.cur.execute(
-                """
-                insert into cash_flow_snapshots (
-                  snapshot_date, cost_center_id, opening_balance, total_credits,
-                  total_debits, closing_balance, is_projected, notes, generated_by
-                ) values (%s, null, %s, %s, %s, %s, false, %s, %s)
-                """,
-                (
-                    snapshot_date,
-                    opening_balance,
-                    credits,
-                    debits,
-                    closing_balance,
-                    f"{IMPORT_TAG} arquivo={path.name}",
-                    self.default_user_id,
-                ),
-            )
-            imported += 1
-        return imported
+    def write_cash_flow(self, parsed: ParsedSheet) -> int:
+        self.writer.track("cash_flow_snapshots", parsed.source)
+        for record in parsed.records:
+            delta = record.closing_balance - record.opening_balance
+            self.writer.add("cash_flow_snapshots", {
+                "snapshot_date": record.snapshot_date,
+                "cost_center_id": None,
+                "opening_balance": record.opening_balance,
+                "total_credits": delta if delta > 0 else 0,
+                "total_debits": -delta if delta < 0 else 0,
+                "closing_balance": record.closing_balance,
+                "is_projected": False,
+                "notes": record.notes,
+                "generated_by": self.default_user_id,
+            }, parsed.source, record.key)
+        return len(parsed.records)
 
 
 def main() -> None:
@@ -826,24 +1387,34 @@ def main() -> None:
     if not FINANCEIRO_DIR.exists():
         raise SystemExit(f"Pasta nao encontrada: {FINANCEIRO_DIR}")
 
-    with psycopg.connect(database_url) as conn:
+    # etapa de leitura: cada planilha e aberta uma vez, em paralelo, num pool
+    # de processos; o escritor (unico, com a conexao) grava cada arquivo assim
+    # que ele fica pronto, sobrepondo o parse das demais com o I/O do banco
+    workers = int(os.environ.get("IMPORT_PARSE_WORKERS") or min(len(WORKBOOKS) + 1, os.cpu_count() or 1))
+    results = {label: 0 for label in RESULT_LABELS.values()}
+    with ProcessPoolExecutor(max_workers=workers) as pool, psycopg.connect(database_url) as conn:
+        futures = [pool.submit(parse_workbook, FINANCEIRO_DIR / name, sheets) for name, sheets in WORKBOOKS]
+        futures.append(pool.submit(parse_cash_flow, FINANCEIRO_DIR / CASH_FLOW_CSV))
         importer = Importer(conn)
-        importer.cleanup_previous_imports()
-        results = {
-            "convenios": importer.import_convenios(),
-            "contas_receber": importer.import_accounts_receivable(),
-            "contas_pagar": importer.import_payables_sheet(),
-            "aprovacoes_diarias": importer.import_daily_approvals(),
-            "cartao_credito": importer.import_credit_card(),
-            "reembolsos": importer.import_reimbursement(),
-            "vale_transporte": importer.import_transport_vouchers(),
-            "fluxo_caixa": importer.import_cash_flow_snapshots(),
-        }
+        for future in as_completed(futures):
+            for parsed in future.result():
+                results[RESULT_LABELS[parsed.kind]] = importer.write(parsed)
+        # remove primeiro as linhas que sairam da planilha, para que versoes
+        # novas nao esbarrem em unicidades (ex.: request_number do reembolso)
+        removed = importer.writer.prune()
+        importer.writer.flush()
         conn.commit()
 
     print("Importacao concluida:")
     for key, value in results.items():
         print(f"- {key}: {value}")
+    print("Linhas inseridas/alteradas por tabela:")
+    for table, count in importer.writer.written.items():
+        print(f"- {table}: {count}")
+    if any(removed.values()):
+        print("Linhas removidas (sairam da planilha):")
+        for table, count in removed.items():
+            print(f"- {table}: {count}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Ingestao continua da pasta Financeiro.
+
+Olha a pasta por polling (sem dependencias alem das do importador) e, assim
+que uma planilha nova ou alterada para de mudar, importa so o que mudou:
+
+- arquivo: sha256 do conteudo; salvar de novo sem alterar nao reimporta;
+- aba: cada aba e roteada pelo nome ou pela assinatura do cabecalho
+  (`route_sheet`) e so e gravada se o conjunto de linhas mudou;
+- linha: o upsert por import_source_key so escreve linhas novas/alteradas e
+  o prune remove apenas as que sairam daquela aba.
+
+Cada arquivo e gravado e commitado sozinho. Um arquivo que falha (planilha
+ilegivel, formulario sem campos obrigatorios, erro de dados no banco) vai
+para a quarentena do estado com o erro e so e tentado de novo quando o
+conteudo mudar; os demais arquivos seguem. Queda de conexao nao e
+quarentena: o arquivo e tentado de novo na proxima varredura.
+
+Arquivos removidos da pasta nao apagam nada do banco. O estado (hash por
+arquivo e por aba, quarentena) fica em FINANCEIRO_DIR/.import_state.json.
+
+Uso:
+    DATABASE_URL=... python scripts/watch_financeiro_folder.py [--interval 2] [--once]
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import psycopg
+
+from import_financeiro_folder import (
+    FINANCEIRO_DIR, RESULT_LABELS, BatchWriter, Importer, ParsedSheet, parse_routed_file,
+)
+
+
+WATCHED_SUFFIXES = {".xlsx", ".csv"}
+
+
+def log(message: str) -> None:
+    print(f"[{datetime.now():%H:%M:%S}] {message}", flush=True)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sheet_digest(parsed: ParsedSheet) -> str:
+    """Hash do conteudo da aba: repr dos registros tipados (chave + valores)."""
+    digest = hashlib.sha256()
+    for record in parsed.records:
+        digest.update(repr(record).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class FolderWatcher:
+    def __init__(self, folder: Path, state_path: Path):
+        self.folder = folder
+        self.state_path = state_path
+        self.state = {"files": {}, "sheets": {}, "quarantine": {}}
+        if state_path.exists():
+            self.state.update(json.loads(state_path.read_text(encoding="utf-8")))
+        # (mtime_ns, tamanho) da ultima varredura e do ultimo hash calculado
+        self.stats: dict[str, tuple[int, int]] = {}
+        self.checked: dict[str, tuple[int, int]] = {}
+
+    def changed_files(self, settle: bool = True) -> list[tuple[Path, str]]:
+        """Arquivos cujo conteudo mudou desde a ultima importacao.
+
+        Com `settle`, so considera arquivos com mtime/tamanho iguais em duas
+        varreduras seguidas (copia ou salvamento ainda em andamento).
+        """
+        changed = []
+        current = {}
+        for path in sorted(self.folder.iterdir()):
+            if not path.is_file() or path.suffix.lower() not in WATCHED_SUFFIXES:
+                continue
+            if path.name.startswith(("~$", ".")):
+                continue
+            stat = path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+            current[path.name] = signature
+            if settle and self.stats.get(path.name) != signature:
+                continue
+            if self.checked.get(path.name) == signature:
+                continue
+            self.checked[path.name] = signature
+            digest = file_sha256(path)
+            quarantined = self.state["quarantine"].get(path.name, {}).get("digest")
+            if digest != self.state["files"].get(path.name) and digest != quarantined:
+                changed.append((path, digest))
+        self.stats = current
+        return changed
+
+    def forget(self, files: list[tuple[Path, str]]) -> None:
+        """Faz os arquivos serem reavaliados na proxima varredura."""
+        for path, _ in files:
+            self.checked.pop(path.name, None)
+
+    def quarantine(self, path: Path, digest: str, error: str) -> None:
+        """Guarda o erro do arquivo; ele so volta a ser importado quando mudar."""
+        self.state["quarantine"][path.name] = {
+            "digest": digest, "error": error, "at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.save()
+        log(f"{path.name}: em quarentena ate mudar ({error})")
+
+    def save(self) -> None:
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+
+def import_file(conn: psycopg.Connection, importer: Importer, watcher: FolderWatcher,
+                parsed_sheets: list[ParsedSheet]) -> tuple[dict[str, int], dict[str, str], dict[str, int]]:
+    """Grava as abas alteradas de um arquivo numa transacao propria."""
+    importer.writer = BatchWriter(importer.cur)
+    results: dict[str, int] = {}
+    sheets: dict[str, str] = {}
+    for parsed in parsed_sheets:
+        digest_sheet = sheet_digest(parsed)
+        if watcher.state["sheets"].get(parsed.source) == digest_sheet:
+            continue
+        label = RESULT_LABELS[parsed.kind]
+        results[label] = results.get(label, 0) + importer.write(parsed)
+        sheets[parsed.source] = digest_sheet
+    removed = importer.writer.prune()
+    importer.writer.flush()
+    conn.commit()
+    return results, sheets, removed
+
+
+def ingest(conn: psycopg.Connection, pool: ProcessPoolExecutor, watcher: FolderWatcher, files: list[tuple[Path, str]]) -> None:
+    futures = {pool.submit(parse_routed_file, path): (path, digest) for path, digest in files}
+    importer = Importer(conn)
+    for future in as_completed(futures):
+        path, digest = futures[future]
+        try:
+            parsed_sheets = future.result()
+        except Exception as exc:  # planilha corrompida/incompleta ou formulario sem campos
+            watcher.quarantine(path, digest, f"erro ao ler: {exc}")
+            continue
+        if not parsed_sheets:
+            log(f"{path.name}: nenhuma aba reconhecida")
+        try:
+            results, sheets, removed = import_file(conn, importer, watcher, parsed_sheets)
+        except Exception as exc:
+            conn.rollback()
+            if isinstance(exc, psycopg.OperationalError) or conn.closed:
+                raise  # conexao/banco indisponivel: o laco principal tenta de novo
+            # cadastros criados na transacao desfeita sairam do banco
+            importer.lookups = importer.load_lookups()
+            watcher.quarantine(path, digest, f"erro ao gravar: {exc}")
+            continue
+
+        watcher.state["files"][path.name] = digest
+        watcher.state["quarantine"].pop(path.name, None)
+        watcher.state["sheets"].update(sheets)
+        watcher.save()
+
+        written = ", ".join(f"{table}={count}" for table, count in importer.writer.written.items() if count)
+        gone = ", ".join(f"{table}={count}" for table, count in removed.items() if count)
+        log(f"importado: {path.name}")
+        if results:
+            log("  linhas lidas: " + ", ".join(f"{label}={count}" for label, count in results.items()))
+        log(f"  gravadas: {written or 'nada mudou'}" + (f" | removidas: {gone}" if gone else ""))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Importa continuamente a pasta Financeiro")
+    parser.add_argument("--folder", type=Path, default=FINANCEIRO_DIR)
+    parser.add_argument("--interval", type=float, default=2.0, help="segundos entre varreduras")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--once", action="store_true", help="importa o que mudou e sai")
+    args = parser.parse_args()
+
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL nao definido")
+    if not args.folder.exists():
+        raise SystemExit(f"Pasta nao encontrada: {args.folder}")
+
+    watcher = FolderWatcher(args.folder, args.folder / ".import_state.json")
+    conn: psycopg.Connection | None = None
+    log(f"observando {args.folder}")
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        try:
+            while True:
+                files = watcher.changed_files(settle=not args.once)
+                if files:
+                    try:
+                        if conn is None or conn.closed:
+                            conn = psycopg.connect(database_url)
+                        ingest(conn, pool, watcher, files)
+                    except psycopg.Error as exc:
+                        log(f"banco indisponivel, nova tentativa na proxima varredura: {exc}")
+                        watcher.forget(files)
+                        if conn is not None:
+                            conn.close()
+                        conn = None
+                if args.once:
+                    break
+                time.sleep(args.interval)
+        except KeyboardInterrupt:
+            log("encerrado")
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,10 @@ Cria banco de dados SQLite com todos os dados extraídos da API Klingo.
 Extrai dados em tempo real e popula as tabelas.
 """
 import sqlite3
-import json
 from datetime import date
 from klingo_api import KlingoAPI
+from klingo_busca_local import construir_indices
+from klingo_schema import PROJECTIONS, Schema, project
 
 DB_PATH = "/Users/saraiva/Documents/IRB/klingo_irb.db"
 
@@ -19,6 +20,7 @@ cur = conn.cursor()
 
 api = KlingoAPI(domain="irb")
 api.login("FELLIPE.SARAIVA", "FELLIPE.SARAIVA1")
+metrics = api.enable_metrics()
 hoje = date.today().isoformat()
 
 
@@ -27,11 +29,7 @@ def fetch(name, id_alias="lista", parms=None):
     if parms is None:
         parms = {}
     try:
-        resp = api.session.post(
-            f"{api.BASE_URL}/aql?a={name}",
-            json={"q": [{"name": name, "id": id_alias, "parms": parms}]},
-        )
-        d = resp.json()
+        d = api.aql_full(name, parms, id_alias)
         result = d.get(id_alias, d)
         # Unwrap {status, data}
         if isinstance(result, dict) and "status" in result and "data" in result:
@@ -45,73 +43,53 @@ def fetch(name, id_alias="lista", parms=None):
         return None
 
 
-def create_and_insert(table_name, data, extra_sql=""):
-    """Cria tabela e insere dados automaticamente a partir da lista de dicts."""
+def create_and_insert(table_name, data, extra_sql="", projection=None):
+    """Cria tabela e insere dados automaticamente a partir da lista de dicts.
+
+    Tipos inferidos por `klingo_schema`; objetos aninhados viram texto JSON
+    (consultável com json_extract).
+    """
     if not data or not isinstance(data, list) or len(data) == 0:
         print(f"  ⚠️  {table_name}: sem dados")
         return 0
 
-    # Pegar todas as keys de todos os itens
-    all_keys = set()
-    for item in data:
-        if isinstance(item, dict):
-            all_keys.update(item.keys())
-    if not all_keys:
+    schema = Schema.infer(data)
+    if not schema:
         return 0
+    if projection is not None:
+        extra_sql += projection.constraints(table_name, schema)
 
-    cols = sorted(all_keys)
-
-    # Criar tabela
-    col_defs = []
-    for c in cols:
-        # Detectar tipo pela primeira ocorrência não-null
-        sample = None
-        for item in data:
-            if isinstance(item, dict) and item.get(c) is not None:
-                sample = item[c]
-                break
-        if isinstance(sample, bool):
-            col_defs.append(f'"{c}" BOOLEAN')
-        elif isinstance(sample, int):
-            col_defs.append(f'"{c}" INTEGER')
-        elif isinstance(sample, float):
-            col_defs.append(f'"{c}" REAL')
-        else:
-            col_defs.append(f'"{c}" TEXT')
-
-    sql = f'CREATE TABLE IF NOT EXISTS "{table_name}" ({", ".join(col_defs)}{extra_sql})'
     cur.execute(f'DROP TABLE IF EXISTS "{table_name}"')
-    cur.execute(sql)
-
-    # Inserir dados
-    placeholders = ", ".join(["?" for _ in cols])
-    col_names = ", ".join([f'"{c}"' for c in cols])
-    insert_sql = f'INSERT INTO "{table_name}" ({col_names}) VALUES ({placeholders})'
+    cur.execute(schema.create_table_sql(table_name, "sqlite", extra_sql))
 
-    count = 0
-    for item in data:
-        if not isinstance(item, dict):
-            continue
-        values = []
-        for c in cols:
-            v = item.get(c)
-            if isinstance(v, (dict, list)):
-                v = json.dumps(v, default=str, ensure_ascii=False)
-            elif isinstance(v, bool):
-                v = int(v)
-            values.append(v)
-        try:
-            cur.execute(insert_sql, values)
-            count += 1
-        except Exception as e:
-            print(f"    Insert error {table_name}: {e}")
-            break
+    before = conn.total_changes
+    try:
+        cur.executemany(schema.insert_sql(table_name, "sqlite"), schema.rows(data, "sqlite"))
+    except Exception as e:
+        print(f"    Insert error {table_name}: {e}")
+    count = conn.total_changes - before
+    if projection is not None:
+        for idx_sql in projection.index_sql(table_name, schema):
+            cur.execute(idx_sql)
 
     conn.commit()
     print(f"  ✅ {table_name}: {count} registros")
     return count
 
 
+def create_and_insert_projection(name, data):
+    """Grava a raiz e as tabelas filhas declaradas em PROJECTIONS[name]."""
+    projection = PROJECTIONS[name]
+    tables = project(projection, data)
+    # filhas antes dos pais: o DROP do pai falharia com FKs apontando para ele
+    for table_name in reversed(list(tables)):
+        cur.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+    count = 0
+    for table_name, rows in tables.items():
+        count += create_and_insert(table_name, rows, projection=projection)
+    return count
+
+
 # ============================================================
 # EXTRAÇÃO E CRIAÇÃO DAS TABELAS
 # ============================================================
@@ -146,7 +124,10 @@ tables = {
 for tbl, (endpoint, parms) in tables.items():
     data = fetch(endpoint, "lista", parms)
     if isinstance(data, list):
-        total += create_and_insert(tbl, data)
+        if tbl in PROJECTIONS:
+            total += create_and_insert_projection(tbl, data)
+        else:
+            total += create_and_insert(tbl, data)
     else:
         print(f"  ⚠️  {tbl}: resposta não é lista ({type(data).__name__})")
 
@@ -177,6 +158,7 @@ aux_tables = {
     "resultados": ("resultados.index", {}),
     "procedimento_grupos": ("procedimento_grupos.index", {}),
     "tipo_logradouros": ("tipo_logradouros.index", {}),
+    "cids": ("cids.index", {"search": ""}),
 }
 
 for tbl, (endpoint, parms) in aux_tables.items():
@@ -254,17 +236,7 @@ for fila_id, fila_nome in filas_ids.items():
                 print(f"  Fila {fila_nome} (id={fila_id}): {len(items)} itens")
 
 if all_enfermagem:
-    # Flatten nested objects for DB
-    flat_items = []
-    for item in all_enfermagem:
-        flat = {}
-        for k, v in item.items():
-            if isinstance(v, (dict, list)):
-                flat[k] = json.dumps(v, default=str, ensure_ascii=False)
-            else:
-                flat[k] = v
-        flat_items.append(flat)
-    total += create_and_insert("enfermagem_fila", flat_items)
+    total += create_and_insert("enfermagem_fila", all_enfermagem)
 
 # --- ATENDIMENTOS DETALHADOS ---
 print("\n" + "=" * 60)
@@ -279,61 +251,23 @@ for item in all_enfermagem:
 
 print(f"  Extraindo {len(atend_ids)} atendimentos...")
 atendimentos = []
-atendimento_procedimentos = []
-anamneses = []
 
 for aid in sorted(atend_ids):
     try:
-        resp = api.session.post(
-            f"{api.BASE_URL}/aql?a=atendimentos.show",
-            json={"q": [{"name": "atendimentos.show", "id": "item", "parms": {"id": aid}}]},
-        )
-        d = resp.json()
+        d = api.aql_full("atendimentos.show", {"id": aid}, "item")
         item = d.get("item", {})
         if isinstance(item, dict) and "data" in item:
             item = item["data"]
 
-        # Atendimento base
-        atend_flat = {}
-        atp = None
-        for k, v in item.items():
-            if k == "atendimento_procedimento":
-                atp = v
-            elif isinstance(v, (dict, list)):
-                atend_flat[k] = json.dumps(v, default=str, ensure_ascii=False)
-            else:
-                atend_flat[k] = v
-        atendimentos.append(atend_flat)
-
-        # Atendimento procedimento
-        if atp and isinstance(atp, dict):
-            atp_flat = {}
-            anamnese_data = None
-            for k, v in atp.items():
-                if k == "anamnese":
-                    anamnese_data = v
-                elif isinstance(v, (dict, list)):
-                    atp_flat[k] = json.dumps(v, default=str, ensure_ascii=False)
-                else:
-                    atp_flat[k] = v
-            atendimento_procedimentos.append(atp_flat)
-
-            # Anamnese
-            if anamnese_data and isinstance(anamnese_data, dict):
-                ana_flat = {}
-                for k, v in anamnese_data.items():
-                    if isinstance(v, (dict, list)):
-                        ana_flat[k] = json.dumps(v, default=str, ensure_ascii=False)
-                    else:
-                        ana_flat[k] = v
-                anamneses.append(ana_flat)
+        # procedimento e anamnese vão para as tabelas filhas (PROJECTIONS)
+        if isinstance(item, dict):
+            item.setdefault("id_atendimento", aid)
+            atendimentos.append(item)
 
     except Exception as e:
         print(f"    Erro atendimento {aid}: {e}")
 
-total += create_and_insert("atendimentos", atendimentos)
-total += create_and_insert("atendimento_procedimentos", atendimento_procedimentos)
-total += create_and_insert("anamneses", anamneses)
+total += create_and_insert_projection("atendimentos", atendimentos)
 
 # --- MARCAÇÕES DE PACIENTES ---
 print("\n" + "=" * 60)
@@ -352,14 +286,7 @@ for pid in sorted(pac_ids):
     try:
         marcs = api.marcacoes.listar(pid)
         if isinstance(marcs, list):
-            for m in marcs:
-                m_flat = {}
-                for k, v in m.items():
-                    if isinstance(v, (dict, list)):
-                        m_flat[k] = json.dumps(v, default=str, ensure_ascii=False)
-                    else:
-                        m_flat[k] = v
-                all_marcacoes.append(m_flat)
+            all_marcacoes.extend(m for m in marcs if isinstance(m, dict))
     except:
         pass
 
@@ -375,17 +302,11 @@ for pid in sorted(pac_ids):
     try:
         pac = api.pacientes.detalhar(pid)
         if isinstance(pac, dict):
-            p_flat = {}
-            for k, v in pac.items():
-                if isinstance(v, (dict, list)):
-                    p_flat[k] = json.dumps(v, default=str, ensure_ascii=False)
-                else:
-                    p_flat[k] = v
-            all_pacientes.append(p_flat)
+            all_pacientes.append(pac)
     except:
         pass
 
-total += create_and_insert("pacientes", all_pacientes)
+total += create_and_insert_projection("pacientes", all_pacientes)
 
 # ============================================================
 # ÍNDICES
@@ -405,8 +326,6 @@ indices = [
     "CREATE INDEX IF NOT EXISTS idx_atendimentos_medico ON atendimentos(id_medico)",
     "CREATE INDEX IF NOT EXISTS idx_enfermagem_paciente ON enfermagem_fila(id_paciente)",
     "CREATE INDEX IF NOT EXISTS idx_enfermagem_medico ON enfermagem_fila(id_medico)",
-    "CREATE INDEX IF NOT EXISTS idx_anamneses_atp ON anamneses(id_atendimento_procedimento)",
-    "CREATE INDEX IF NOT EXISTS idx_atp_atendimento ON atendimento_procedimentos(id_atendimento)",
     "CREATE INDEX IF NOT EXISTS idx_orcamentos_titulo ON orcamentos(st_titulo)",
     "CREATE INDEX IF NOT EXISTS idx_estoque_items_nome ON estoque_items(st_item)",
 ]
@@ -420,6 +339,13 @@ for idx_sql in indices:
 conn.commit()
 print("  ✅ Índices criados")
 
+# Busca local (FTS5) sobre pacientes, procedimentos e CIDs
+try:
+    for fts, count in construir_indices(conn).items():
+        print(f"  ✅ {fts}: {count} registros")
+except sqlite3.OperationalError as e:
+    print(f"  ⚠️  FTS5 indisponível: {e}")
+
 # ============================================================
 # RESUMO
 # ============================================================
@@ -438,4 +364,7 @@ for (tbl,) in tables:
 print(f"\n  Total de registros: {total}")
 print(f"  Banco salvo em: {DB_PATH}")
 
+print("\n  Chamadas à API por endpoint:")
+metrics.print_summary()
+
 conn.close()
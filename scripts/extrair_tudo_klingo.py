@@ -3,10 +3,11 @@ Extração completa da Klingo: todos os pacientes, marcações e atendimentos.
 Estratégia: iterar agendas dia a dia para capturar todas as marcações,
 depois detalhar cada paciente e atendimento único.
 """
-import json
 import psycopg2
+from psycopg2.extras import execute_values
 from datetime import date, timedelta
 from klingo_api import KlingoAPI
+from klingo_schema import PROJECTIONS, Schema, project
 
 # ============================================================
 # CONFIG
@@ -22,15 +23,13 @@ DIAS_ATRAS = 365
 
 api = KlingoAPI(domain="irb")
 api.login("FELLIPE.SARAIVA", "FELLIPE.SARAIVA1")
+metrics = api.enable_metrics()
 
 
 def fetch_raw(name, id_alias, parms):
     """Fetch sem unwrap - retorna resposta bruta."""
-    resp = api.session.post(
-        f"{api.BASE_URL}/aql?a={name}",
-        json={"q": [{"name": name, "id": id_alias, "parms": parms}]},
-    )
-    return resp.json().get(id_alias, resp.json())
+    d = api.aql_full(name, parms, id_alias)
+    return d.get(id_alias, d)
 
 
 # ============================================================
@@ -51,30 +50,20 @@ dias_sem_dados = 0
 for i in range(DIAS_ATRAS):
     dt = (hoje - timedelta(days=i)).isoformat()
     try:
-        result = fetch_raw("agendas.index", "lista", {"data": dt})
-        if isinstance(result, dict) and "status" in result:
-            result = result.get("data", result)
-        if isinstance(result, dict):
-            agendas = result.get("agendas", [])
-            if not agendas:
-                dias_sem_dados += 1
-                continue
-
-            dias_com_dados += 1
-            for slot in agendas:
+        # slots lidos em streaming: o dia inteiro não fica em memória
+        slots = api.iter_aql("agendas.index", {"data": dt}, "lista",
+                             paths=("lista.agendas", "lista.data.agendas"))
+        n_slots = 0
+        for slot in slots:
+            n_slots += 1
+            if isinstance(slot, dict):
                 marc = slot.get("marcacao")
                 if not marc:
                     continue
 
                 id_marc = marc.get("id_marcacao")
                 if id_marc and id_marc not in all_marcacoes:
-                    # Flatten marcação
-                    flat = {}
-                    for k, v in marc.items():
-                        if isinstance(v, (dict, list)):
-                            flat[k] = json.dumps(v, default=str, ensure_ascii=False)
-                        else:
-                            flat[k] = v
+                    flat = dict(marc)
                     # Adicionar dados do slot
                     flat["_slot_hora"] = slot.get("hora")
                     flat["_slot_status"] = slot.get("status")
@@ -93,8 +82,13 @@ for i in range(DIAS_ATRAS):
                     if mid:
                         all_medico_ids.add(mid)
 
-            if i % 30 == 0:
-                print(f"  Dia {dt}: {len(agendas)} slots | Total acumulado: {len(all_marcacoes)} marcações, {len(all_paciente_ids)} pacientes")
+        if not n_slots:
+            dias_sem_dados += 1
+            continue
+        dias_com_dados += 1
+
+        if i % 30 == 0:
+            print(f"  Dia {dt}: {n_slots} slots | Total acumulado: {len(all_marcacoes)} marcações, {len(all_paciente_ids)} pacientes")
     except Exception as e:
         if i % 30 == 0:
             print(f"  Dia {dt}: ERRO - {e}")
@@ -152,13 +146,7 @@ for i, pid in enumerate(sorted(all_paciente_ids)):
     try:
         pac = api.pacientes.detalhar(pid)
         if isinstance(pac, dict):
-            flat = {}
-            for k, v in pac.items():
-                if isinstance(v, (dict, list)):
-                    flat[k] = json.dumps(v, default=str, ensure_ascii=False)
-                else:
-                    flat[k] = v
-            all_pacientes.append(flat)
+            all_pacientes.append(pac)
     except:
         erros += 1
 
@@ -183,8 +171,6 @@ for marc in all_marcacoes.values():
 print(f"  Atendimentos únicos: {len(atend_ids)}")
 
 all_atendimentos = []
-all_atp = []
-all_anamneses = []
 erros_atend = 0
 
 for i, aid in enumerate(sorted(atend_ids)):
@@ -193,37 +179,10 @@ for i, aid in enumerate(sorted(atend_ids)):
         if isinstance(result, dict) and "status" in result:
             result = result.get("data", result)
 
+        # procedimento e anamnese vão para as tabelas filhas (PROJECTIONS)
         if isinstance(result, dict):
-            atp = result.pop("atendimento_procedimento", None)
-
-            # Flatten atendimento
-            flat = {}
-            for k, v in result.items():
-                if isinstance(v, (dict, list)):
-                    flat[k] = json.dumps(v, default=str, ensure_ascii=False)
-                else:
-                    flat[k] = v
-            all_atendimentos.append(flat)
-
-            # Atendimento procedimento
-            if atp and isinstance(atp, dict):
-                anamnese = atp.pop("anamnese", None)
-                atp_flat = {}
-                for k, v in atp.items():
-                    if isinstance(v, (dict, list)):
-                        atp_flat[k] = json.dumps(v, default=str, ensure_ascii=False)
-                    else:
-                        atp_flat[k] = v
-                all_atp.append(atp_flat)
-
-                if anamnese and isinstance(anamnese, dict):
-                    ana_flat = {}
-                    for k, v in anamnese.items():
-                        if isinstance(v, (dict, list)):
-                            ana_flat[k] = json.dumps(v, default=str, ensure_ascii=False)
-                        else:
-                            ana_flat[k] = v
-                    all_anamneses.append(ana_flat)
+            result.setdefault("id_atendimento", aid)
+            all_atendimentos.append(result)
     except:
         erros_atend += 1
 
@@ -231,8 +190,6 @@ for i, aid in enumerate(sorted(atend_ids)):
         print(f"  {i+1}/{len(atend_ids)} atendimentos...")
 
 print(f"  Atendimentos: {len(all_atendimentos)}")
-print(f"  Procedimentos: {len(all_atp)}")
-print(f"  Anamneses: {len(all_anamneses)}")
 print(f"  Erros: {erros_atend}")
 
 # ============================================================
@@ -246,66 +203,54 @@ conn = psycopg2.connect(**PG_CONFIG)
 cur = conn.cursor()
 
 
-def ensure_table(table_name, data_list):
-    """Cria ou recria tabela com prefixo klingo_ e insere dados."""
+def ensure_table(table_name, data_list, projection=None):
+    """Cria ou recria tabela com prefixo klingo_ e insere dados.
+
+    Tipos inferidos por `klingo_schema`; objetos aninhados viram JSONB.
+    """
     full_name = f"klingo_{table_name}"
     if not data_list:
         print(f"  ⚠️  {full_name}: sem dados")
         return 0
 
-    all_keys = set()
-    for item in data_list:
-        all_keys.update(item.keys())
-    cols = sorted(all_keys)
-
-    cur.execute(f'DROP TABLE IF EXISTS "{full_name}"')
-
-    col_defs = []
-    for c in cols:
-        sample = None
-        for item in data_list:
-            if item.get(c) is not None:
-                sample = item[c]
-                break
-        if isinstance(sample, bool):
-            col_defs.append(f'"{c}" BOOLEAN')
-        elif isinstance(sample, int):
-            col_defs.append(f'"{c}" INTEGER')
-        elif isinstance(sample, float):
-            col_defs.append(f'"{c}" REAL')
-        else:
-            col_defs.append(f'"{c}" TEXT')
-
-    cur.execute(f'CREATE TABLE "{full_name}" ({", ".join(col_defs)})')
-
-    placeholders = ", ".join(["%s" for _ in cols])
-    col_names = ", ".join([f'"{c}"' for c in cols])
-    insert_sql = f'INSERT INTO "{full_name}" ({col_names}) VALUES ({placeholders})'
-
-    count = 0
-    for item in data_list:
-        values = []
-        for c in cols:
-            v = item.get(c)
-            if isinstance(v, bool):
-                v = v
-            elif isinstance(v, (dict, list)):
-                v = json.dumps(v, default=str, ensure_ascii=False)
-            values.append(v)
-        cur.execute(insert_sql, values)
-        count += 1
-
-    conn.commit()
-    print(f"  ✅ {full_name}: {count} registros ({len(cols)} colunas)")
+    try:
+        schema = Schema.infer(data_list)
+        extra_sql = projection.constraints(table_name, schema, "klingo_") if projection else ""
+
+        cur.execute(f'DROP TABLE IF EXISTS "{full_name}"')
+        cur.execute(schema.create_table_sql(full_name, "postgres", extra_sql))
+
+        rows = list(schema.rows(data_list, "postgres"))
+        execute_values(cur, f'INSERT INTO "{full_name}" ({schema.column_list()}) VALUES %s', rows, page_size=1000)
+        count = len(rows)
+        if projection is not None:
+            for idx_sql in projection.index_sql(table_name, schema, "klingo_"):
+                cur.execute(idx_sql)
+
+        conn.commit()
+    except Exception as e:
+        # uma tabela com problema não derruba o resto da extração
+        conn.rollback()
+        print(f"  ❌ {full_name}: {e}")
+        return 0
+    print(f"  ✅ {full_name}: {count} registros ({len(schema)} colunas)")
     return count
 
 
+def ensure_projection(name, data_list):
+    """Grava a raiz e as tabelas filhas declaradas em PROJECTIONS[name]."""
+    projection = PROJECTIONS[name]
+    tables = project(projection, data_list)
+    # filhas antes dos pais por causa das FKs
+    for table_name in reversed(list(tables)):
+        cur.execute(f'DROP TABLE IF EXISTS "klingo_{table_name}"')
+    return sum(ensure_table(table_name, rows, projection) for table_name, rows in tables.items())
+
+
 total = 0
-total += ensure_table("pacientes", all_pacientes)
+total += ensure_projection("pacientes", all_pacientes)
 total += ensure_table("marcacoes", list(all_marcacoes.values()))
-total += ensure_table("atendimentos", all_atendimentos)
-total += ensure_table("atendimento_procedimentos", all_atp)
-total += ensure_table("anamneses", all_anamneses)
+total += ensure_projection("atendimentos", all_atendimentos)
 
 # ============================================================
 # 6. ÍNDICES
@@ -313,14 +258,11 @@ total += ensure_table("anamneses", all_anamneses)
 print("\n  Criando índices...")
 indices = [
     'CREATE INDEX IF NOT EXISTS idx_kp_nome ON klingo_pacientes(st_nome)',
-    'CREATE INDEX IF NOT EXISTS idx_kp_cpf ON klingo_pacientes(st_cpf)',
     'CREATE INDEX IF NOT EXISTS idx_km_paciente ON klingo_marcacoes(id_paciente)',
     'CREATE INDEX IF NOT EXISTS idx_km_medico ON klingo_marcacoes(id_medico)',
     'CREATE INDEX IF NOT EXISTS idx_km_data ON klingo_marcacoes(dt_inicio)',
     'CREATE INDEX IF NOT EXISTS idx_ka_paciente ON klingo_atendimentos(id_paciente)',
     'CREATE INDEX IF NOT EXISTS idx_ka_medico ON klingo_atendimentos(id_medico)',
-    'CREATE INDEX IF NOT EXISTS idx_katp_atend ON klingo_atendimento_procedimentos(id_atendimento)',
-    'CREATE INDEX IF NOT EXISTS idx_kan_atp ON klingo_anamneses(id_atendimento_procedimento)',
 ]
 for idx in indices:
     try:
@@ -336,8 +278,9 @@ print("\n" + "=" * 60)
 print("RESUMO FINAL")
 print("=" * 60)
 
-for tbl in ["klingo_pacientes", "klingo_marcacoes", "klingo_atendimentos",
-            "klingo_atendimento_procedimentos", "klingo_anamneses"]:
+for tbl in ["klingo_pacientes", "klingo_paciente_cadastros", "klingo_paciente_unidades",
+            "klingo_marcacoes", "klingo_atendimentos", "klingo_atendimento_procedimentos",
+            "klingo_anamneses"]:
     try:
         cur.execute(f'SELECT COUNT(*) FROM "{tbl}"')
         cnt = cur.fetchone()[0]
@@ -349,3 +292,6 @@ print(f"\n  Total: {total} registros")
 cur.close()
 conn.close()
 print("  Extração concluída!")
+
+print("\n  Chamadas à API por endpoint:")
+metrics.print_summary()
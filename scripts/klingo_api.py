@@ -16,12 +16,85 @@ Uso básico:
 
     # Criar marcação
     api.agendas.agendar(id_paciente=123, id_medico=456, data="2026-02-20", hora="10:00")
+
+    # Próximos horários livres por especialidade, respondidos da memória
+    disp = DisponibilidadeIndex(api, dias=14)
+    disp.iniciar()
+    disp.proximos_horarios(especialidade=12, limite=5)
+
+    # Só as mudanças das agendas (insert/update/delete), sem refetch completo
+    feed = AgendasFeed(api, dias=2)
+    feed.on_change(print)
+    feed.iniciar(intervalo=30)
 """
 
+import base64
+import bisect
+import copy
+import hashlib
+import heapq
+import json
+import os
+import random
+import re
+import mimetypes
+import sqlite3
+import threading
+import time
+import uuid
+import warnings
 import requests
-from datetime import datetime, date
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, date, timedelta
+from itertools import islice
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
 from typing import Any, Optional, Union
 
+# Decodificadores opcionais: orjson (mais rápido), ijson (listas em streaming),
+# brotli (Accept-Encoding: br). Sem eles o cliente usa json/gzip da stdlib.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+try:
+    import ijson
+except ImportError:
+    ijson = None
+try:
+    import brotli  # noqa: F401 - habilita a decodificação br no urllib3
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+# Queries AQL somente leitura: podem ser repetidas com segurança
+READ_ONLY_SUFFIXES = (".index", ".show")
+# Status que indicam sobrecarga/indisponibilidade temporária
+RETRY_STATUS = {429, 502, 503, 504}
+
+# Consultas usadas em tempo real pelo bot: (segundos "fresco", segundos servível
+# como stale[, idade máxima servida com a Klingo fora do ar; padrão = stale]).
+# Ver StaleCache.
+SWR_TTLS = {
+    "medicos.index": (300, 86400),          # medicos.listar
+    "especialidades.index": (3600, 86400),  # especialidades.listar
+    "medicos.horarios": (30, 900),          # agendas.horarios_medico
+    "pacientes.index": (60, 3600),          # pacientes.buscar
+}
+# Escritas bem-sucedidas que tornam entradas do cache obsoletas
+SWR_INVALIDATES = {
+    "agendas.": ("medicos.horarios",),
+    "pacientes.": ("pacientes.index",),
+}
+
 
 class KlingoAPIError(Exception):
     """Exceção para erros da API Klingo."""
@@ -31,6 +104,611 @@ class KlingoAPIError(Exception):
         self.response = response
 
 
+class CircuitOpenError(KlingoAPIError):
+    """Circuito aberto para o endpoint: a chamada nem foi feita."""
+
+
+def _is_outage(exc: BaseException) -> bool:
+    """Falha de disponibilidade (conta para o circuito), não erro de negócio."""
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    return (isinstance(exc, KlingoAPIError) and not isinstance(exc, CircuitOpenError)
+            and isinstance(exc.status_code, int) and (exc.status_code == 429 or exc.status_code >= 500))
+
+
+class _TimeoutAdapter(HTTPAdapter):
+    """HTTPAdapter com timeout padrão para toda requisição da sessão.
+
+    Cobre também os scripts que chamam `api.session.post` diretamente.
+    """
+
+    def __init__(self, timeout, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class AdaptiveLimiter:
+    """Limite adaptativo de requisições simultâneas (AIMD + latência).
+
+    O limite cresce ~1 a cada `limit` respostas saudáveis e cai pela metade em
+    429/5xx/timeout, ou quando o p95 recente passa de `latency_tolerance` vezes
+    o melhor p95 já observado. Compartilhado por domínio/unidade dentro do
+    processo (`for_key`), então várias instâncias/threads somam no mesmo limite.
+    """
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 16,
+                 latency_tolerance: float = 2.0, window: int = 50):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.latency_tolerance = latency_tolerance
+        self.inflight = 0
+        self.baseline = None
+        self._latencies = deque(maxlen=window)
+        self._since_check = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    @classmethod
+    def for_key(cls, domain: str, unidade, **kwargs) -> "AdaptiveLimiter":
+        """Limiter do processo para o par domínio/unidade."""
+        key = (domain, str(unidade))
+        with cls._registry_lock:
+            if key not in cls._registry:
+                cls._registry[key] = cls(**kwargs)
+            return cls._registry[key]
+
+    def p95(self) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def acquire(self):
+        """Bloqueia até haver vaga dentro do limite atual."""
+        with self._cond:
+            while self.inflight >= int(self.limit):
+                self._cond.wait()
+            self.inflight += 1
+
+    def release(self, latency: float, congested: bool = False):
+        """Libera a vaga e ajusta o limite com o resultado da requisição."""
+        with self._cond:
+            self.inflight -= 1
+            if not congested:
+                self._latencies.append(latency)
+                self._since_check += 1
+                # p95 avaliado a cada meia janela de amostras novas
+                if self._since_check >= self._latencies.maxlen // 2:
+                    self._since_check = 0
+                    p95 = self.p95()
+                    if self.baseline is None or p95 < self.baseline:
+                        self.baseline = p95
+                    else:
+                        # a referência acompanha mudanças permanentes, devagar
+                        self.baseline += (p95 - self.baseline) * 0.05
+                    congested = p95 > self.baseline * self.latency_tolerance
+            now = time.monotonic()
+            if congested:
+                # só reduz de novo por requisições iniciadas após a última redução
+                if now - latency >= self._last_decrease:
+                    self.limit = max(float(self.min_limit), self.limit / 2)
+                    self._last_decrease = now
+                    self._latencies.clear()
+                    self._since_check = 0
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"limit": int(self.limit), "inflight": self.inflight,
+                    "p95": self.p95(), "baseline_p95": self.baseline}
+
+
+def _jwt_exp(token: str) -> Optional[float]:
+    """Claim `exp` do JWT (sem validar assinatura), se houver."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return float(exp) if exp else None
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+
+
+class TokenStore:
+    """Cache de tokens JWT em SQLite, compartilhado entre processos e threads.
+
+    Só um processo faz o login por vez: quem vai renovar grava uma reserva
+    (`logins`) numa transação curta, faz o login fora de qualquer transação e
+    grava o token; os demais esperam a reserva sumir e reaproveitam o token
+    recém-gravado. Uma reserva mais velha que `lease` segundos (processo que
+    morreu no meio do login) é assumida pelo próximo. Caminho padrão:
+    $KLINGO_TOKEN_CACHE ou ~/.cache/klingo/tokens.db.
+    """
+
+    def __init__(self, path: str = None, default_ttl: float = 3600.0, margin: float = 60.0,
+                 lease: float = 30.0):
+        self.path = path or os.environ.get("KLINGO_TOKEN_CACHE") or os.path.join(
+            os.path.expanduser("~"), ".cache", "klingo", "tokens.db")
+        self.default_ttl = default_ttl
+        self.margin = margin
+        self.lease = lease
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS tokens "
+                         "(key TEXT PRIMARY KEY, token TEXT NOT NULL, expires_at REAL NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS logins (key TEXT PRIMARY KEY, until REAL NOT NULL)")
+        os.chmod(self.path, 0o600)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=60, isolation_level=None)
+
+    def _valid(self, row) -> Optional[str]:
+        if row and row[1] - self.margin > time.time():
+            return row[0]
+        return None
+
+    def get(self, key: str) -> Optional[str]:
+        """Token ainda válido para a chave, ou None."""
+        conn = self._connect()
+        try:
+            return self._valid(conn.execute(
+                "SELECT token, expires_at FROM tokens WHERE key = ?", (key,)).fetchone())
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _write(self):
+        """Transação de escrita curta (nunca envolve chamada de rede)."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def refresh(self, key: str, stale: Optional[str], fetch) -> tuple:
+        """
+        Renova o token da chave, com um único login entre processos.
+
+        Se outro processo já gravou um token válido diferente de `stale`,
+        devolve esse sem novo login. Senão reserva o login, chama `fetch()`
+        (que faz o login e devolve (token, resposta)) sem transação aberta e
+        grava o resultado.
+
+        Returns:
+            (token, resposta do login ou None quando reaproveitado)
+        """
+        while True:
+            with self._write() as conn:
+                current = self._valid(conn.execute(
+                    "SELECT token, expires_at FROM tokens WHERE key = ?", (key,)).fetchone())
+                if current and current != stale:
+                    return current, None
+                row = conn.execute("SELECT until FROM logins WHERE key = ?", (key,)).fetchone()
+                now = time.time()
+                if row is None or row[0] <= now:
+                    conn.execute("INSERT OR REPLACE INTO logins (key, until) VALUES (?, ?)",
+                                 (key, now + self.lease))
+                    break
+            time.sleep(0.1)  # outro processo está no login
+
+        try:
+            token, data = fetch()
+        except BaseException:
+            with self._write() as conn:
+                conn.execute("DELETE FROM logins WHERE key = ?", (key,))
+            raise
+        expires_at = _jwt_exp(token) or time.time() + self.default_ttl
+        with self._write() as conn:
+            conn.execute("INSERT OR REPLACE INTO tokens (key, token, expires_at) VALUES (?, ?, ?)",
+                         (key, token, expires_at))
+            conn.execute("DELETE FROM logins WHERE key = ?", (key,))
+        return token, data
+
+
+class CircuitBreaker:
+    """
+    Circuito por endpoint (name de AQL).
+
+    Após `failure_threshold` falhas de disponibilidade seguidas o circuito
+    abre e as chamadas falham na hora com CircuitOpenError. Passados
+    `reset_timeout` segundos, uma única chamada de sonda é liberada
+    (meio-aberto): sucesso fecha o circuito, falha reabre.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = {}  # name -> {"failures", "opened_at", "probing"}
+
+    def state(self, name: str) -> str:
+        with self._lock:
+            st = self._state.get(name)
+            if not st or st["opened_at"] is None:
+                return "closed"
+            if st["probing"] or time.monotonic() - st["opened_at"] >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def before(self, name: str):
+        """Levanta CircuitOpenError se o endpoint não pode ser chamado agora."""
+        with self._lock:
+            st = self._state.get(name)
+            if not st or st["opened_at"] is None:
+                return
+            if st["probing"] or time.monotonic() - st["opened_at"] < self.reset_timeout:
+                raise CircuitOpenError(f"Circuito aberto para {name}", status_code=503)
+            st["probing"] = True
+
+    def success(self, name: str):
+        with self._lock:
+            self._state.pop(name, None)
+
+    def failure(self, name: str):
+        with self._lock:
+            st = self._state.setdefault(name, {"failures": 0, "opened_at": None, "probing": False})
+            st["failures"] += 1
+            if st["probing"] or st["failures"] >= self.failure_threshold:
+                st["opened_at"] = time.monotonic()
+                st["probing"] = False
+
+    def release(self, name: str):
+        """Sonda terminou sem sinal de disponibilidade (ex.: erro 4xx)."""
+        with self._lock:
+            st = self._state.get(name)
+            if st and st["probing"]:
+                st["probing"] = False
+                st["opened_at"] = time.monotonic() - self.reset_timeout
+
+    @contextmanager
+    def guard(self, name: str):
+        self.before(name)
+        try:
+            yield
+        except BaseException as e:
+            if _is_outage(e):
+                self.failure(name)
+            elif isinstance(e, GeneratorExit):
+                self.release(name)
+            else:
+                self.success(name)  # o servidor respondeu
+            raise
+        else:
+            self.success(name)
+
+
+class StaleCache:
+    """
+    Cache stale-while-revalidate por consulta (name + parâmetros).
+
+    Dentro do prazo "fresco" responde do cache; depois, até o prazo stale,
+    responde o valor antigo na hora e atualiza em segundo plano. Se a busca
+    síncrona falhar por indisponibilidade (ou circuito aberto), serve o
+    valor antigo se ele ainda estiver dentro da idade máxima de
+    indisponibilidade (3º item do TTL, padrão = prazo stale); mais velho que
+    isso, a falha sobe.
+    """
+
+    def __init__(self, ttls: dict = None, max_entries: int = 1024, workers: int = 2):
+        self.ttls = SWR_TTLS if ttls is None else ttls
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="klingo-swr")
+
+    def _store(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def _refresh(self, key, loader):
+        try:
+            self._store(key, loader())
+        except Exception:
+            pass  # mantém o stale; a próxima leitura tenta de novo
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, name: str, key, loader):
+        fresh, stale, *resto = self.ttls[name]
+        outage = resto[0] if resto else stale
+        with self._lock:
+            entry = self._data.get(key)
+        age = time.monotonic() - entry[0] if entry else None
+        if entry and age < fresh:
+            return copy.deepcopy(entry[1])
+        if entry and age < stale:
+            with self._lock:
+                start = key not in self._refreshing
+                self._refreshing.add(key)
+            if start:
+                self._pool.submit(self._refresh, key, loader)
+            return copy.deepcopy(entry[1])
+        try:
+            value = loader()
+        except Exception as e:
+            if entry and (_is_outage(e) or isinstance(e, CircuitOpenError)) \
+                    and time.monotonic() - entry[0] < outage:
+                return copy.deepcopy(entry[1])
+            raise
+        self._store(key, value)
+        return copy.deepcopy(value)
+
+    def invalidate(self, name: str):
+        with self._lock:
+            for key in [k for k in self._data if k[0] == name]:
+                del self._data[key]
+
+
+@dataclass
+class CallInfo:
+    """Dados de uma chamada à API entregues aos hooks pre/post."""
+    name: str
+    parms: Optional[dict] = None
+    latency: float = 0.0
+    status_code: Optional[int] = None
+    bytes: int = 0
+    attempts: int = 0
+    error: Optional[BaseException] = None
+    result: Any = None  # corpo decodificado da resposta AQL (só no hook "post", em sucesso)
+
+
+class MetricsCollector:
+    """Coletor por `name` de AQL: chamadas, erros, histograma de latência e bytes.
+
+    Uso:
+        metrics = api.enable_metrics()
+        ...
+        metrics.print_summary()              # JSON no fim da extração
+        open("klingo.prom", "w").write(metrics.openmetrics())
+    """
+
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def __call__(self, info: CallInfo):
+        with self._lock:
+            st = self._stats.get(info.name)
+            if st is None:
+                st = self._stats[info.name] = {
+                    "count": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0,
+                    "bytes": 0, "attempts": 0, "buckets": [0] * len(self.BUCKETS),
+                }
+            st["count"] += 1
+            st["errors"] += info.error is not None
+            st["seconds"] += info.latency
+            st["max_seconds"] = max(st["max_seconds"], info.latency)
+            st["bytes"] += info.bytes
+            st["attempts"] += info.attempts
+            for i, le in enumerate(self.BUCKETS):
+                if info.latency <= le:
+                    st["buckets"][i] += 1
+                    break
+
+    def _quantile(self, st: dict, q: float) -> float:
+        """Quantil estimado pelo limite superior do bucket."""
+        target, seen = q * st["count"], 0
+        for le, n in zip(self.BUCKETS, st["buckets"]):
+            seen += n
+            if seen >= target:
+                return st["max_seconds"] if le == float("inf") else le
+        return st["max_seconds"]
+
+    def summary(self) -> dict:
+        """Resumo por name, do maior tempo total para o menor."""
+        with self._lock:
+            stats = {name: dict(st, buckets=list(st["buckets"])) for name, st in self._stats.items()}
+        out = {}
+        for name, st in sorted(stats.items(), key=lambda item: -item[1]["seconds"]):
+            out[name] = {
+                "count": st["count"],
+                "errors": st["errors"],
+                "error_rate": round(st["errors"] / st["count"], 4),
+                "retries": st["attempts"] - st["count"] if st["attempts"] else 0,
+                "total_seconds": round(st["seconds"], 3),
+                "mean_seconds": round(st["seconds"] / st["count"], 4),
+                "p95_seconds_le": self._quantile(st, 0.95),
+                "max_seconds": round(st["max_seconds"], 4),
+                "bytes": st["bytes"],
+                "mean_bytes": st["bytes"] // st["count"],
+            }
+        return out
+
+    def print_summary(self):
+        print(json.dumps(self.summary(), indent=2, ensure_ascii=False))
+
+    def openmetrics(self) -> str:
+        """Exposição no formato OpenMetrics (texto)."""
+        with self._lock:
+            stats = {name: dict(st, buckets=list(st["buckets"])) for name, st in self._stats.items()}
+        lines = [
+            "# TYPE klingo_aql_requests counter",
+            "# HELP klingo_aql_requests Chamadas AQL por name.",
+        ]
+        for name, st in sorted(stats.items()):
+            lines.append(f'klingo_aql_requests_total{{name="{name}"}} {st["count"]}')
+        lines += ["# TYPE klingo_aql_errors counter", "# HELP klingo_aql_errors Chamadas AQL com erro."]
+        for name, st in sorted(stats.items()):
+            lines.append(f'klingo_aql_errors_total{{name="{name}"}} {st["errors"]}')
+        lines += ["# TYPE klingo_aql_response_bytes counter", "# UNIT klingo_aql_response_bytes bytes",
+                  "# HELP klingo_aql_response_bytes Bytes recebidos."]
+        for name, st in sorted(stats.items()):
+            lines.append(f'klingo_aql_response_bytes_total{{name="{name}"}} {st["bytes"]}')
+        lines += ["# TYPE klingo_aql_latency_seconds histogram", "# UNIT klingo_aql_latency_seconds seconds",
+                  "# HELP klingo_aql_latency_seconds Latência da chamada, com novas tentativas."]
+        for name, st in sorted(stats.items()):
+            cumulative = 0
+            for le, n in zip(self.BUCKETS, st["buckets"]):
+                cumulative += n
+                le_txt = "+Inf" if le == float("inf") else repr(le)
+                lines.append(f'klingo_aql_latency_seconds_bucket{{name="{name}",le="{le_txt}"}} {cumulative}')
+            lines.append(f'klingo_aql_latency_seconds_sum{{name="{name}"}} {st["seconds"]:.6f}')
+            lines.append(f'klingo_aql_latency_seconds_count{{name="{name}"}} {st["count"]}')
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _decode(response: requests.Response) -> Any:
+    """Decodifica o corpo JSON a partir dos bytes (uma única passada)."""
+    return _json_loads(response.content)
+
+
+def _decode_or_none(response: requests.Response) -> Any:
+    """Corpo JSON para anexar a erros; None se vazio ou inválido."""
+    if not response.content:
+        return None
+    try:
+        return _decode(response)
+    except ValueError:
+        return None
+
+
+class _CountingReader:
+    """Envolve response.raw contando os bytes lidos (métricas em streaming)."""
+
+    def __init__(self, raw, info: "CallInfo" = None):
+        self._raw = raw
+        self._info = info
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._raw.read(size)
+        if self._info is not None:
+            self._info.bytes += len(chunk)
+        return chunk
+
+
+def _iter_json_items(fp, paths: tuple, top: dict) -> Any:
+    """
+    Gera os elementos dos arrays JSON em `paths` (prefixos ijson, ex.
+    "lista.data") sem materializar o documento. Campos escalares de topo
+    "status"/"error" são guardados em `top` para a checagem de erro ao final.
+    """
+    item_prefixes = {f"{path}.item" for path in paths}
+    builder, depth = None, 0
+    for prefix, event, value in ijson.parse(fp, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+                if depth == 0:
+                    yield builder.value
+                    builder = None
+        elif prefix in item_prefixes:
+            if event in ("start_map", "start_array"):
+                builder, depth = ijson.ObjectBuilder(), 1
+                builder.event(event, value)
+            elif event not in ("end_array", "map_key"):
+                yield value
+        elif prefix in ("status", "error") and event not in ("start_map", "start_array", "map_key"):
+            top[prefix] = value
+
+
+class _MultipartUpload:
+    """
+    Corpo multipart/form-data lido do disco sob demanda.
+
+    Tem tamanho conhecido (o requests envia Content-Length, sem chunked) e
+    volta ao início com seek(0), então pode ser reenviado numa nova tentativa.
+    """
+
+    def __init__(self, file_path: str, fields: dict = None, field_name: str = "file"):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        head = []
+        for key, value in (fields or {}).items():
+            head.append(f'--{self.boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n')
+        filename = os.path.basename(file_path)
+        mime = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        head.append(f'--{self.boundary}\r\nContent-Disposition: form-data; name="{field_name}"; '
+                    f'filename="{filename}"\r\nContent-Type: {mime}\r\n\r\n')
+        self._head = "".join(head).encode("utf-8")
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self._path = file_path
+        self._size = os.path.getsize(file_path)
+        self._fp = None
+        self._pos = 0
+
+    def __len__(self) -> int:
+        return len(self._head) + self._size + len(self._tail)
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(1 << 16)
+            if not chunk:
+                return
+            yield chunk
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        self._pos = {0: offset, 1: self._pos + offset, 2: len(self) + offset}[whence]
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = len(self) - self._pos
+        head_end = len(self._head)
+        file_end = head_end + self._size
+        out = []
+        while size > 0 and self._pos < len(self):
+            if self._pos < head_end:
+                chunk = self._head[self._pos:self._pos + size]
+            elif self._pos < file_end:
+                if self._fp is None:
+                    self._fp = open(self._path, "rb")
+                self._fp.seek(self._pos - head_end)
+                chunk = self._fp.read(min(size, file_end - self._pos))
+            else:
+                start = self._pos - file_end
+                chunk = self._tail[start:start + size]
+            if not chunk:
+                break
+            out.append(chunk)
+            self._pos += len(chunk)
+            size -= len(chunk)
+        return b"".join(out)
+
+    def close(self):
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+
+def _at_path(data: Any, path: str) -> Any:
+    for key in path.split("."):
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+
 class _BaseModule:
     """Classe base para todos os módulos da API."""
 
@@ -144,6 +822,25 @@ class AgendasModule(_BaseModule):
             parms["id_motivo"] = id_motivo
         return self._aql("agendas.destroy", parms, "item")
 
+    def agendar_many(self, lista: list, lote: int = 25, workers: int = 4) -> list:
+        """Cria vários agendamentos em lotes (ver KlingoAPI.aql_many).
+
+        Returns:
+            Lista na ordem de `lista` com {"parms", "result", "error"} por item
+        """
+        return self._client.aql_many("agendas.store", lista, "item", lote, workers)
+
+    def cancelar_many(self, ids: list, id_motivo: int = None, lote: int = 25,
+                      workers: int = 4) -> list:
+        """Cancela vários agendamentos em lotes (ex.: dia inteiro de um médico).
+
+        Returns:
+            Lista na ordem de `ids` com {"parms", "result", "error"} por item
+        """
+        parms = [{"id": id_agenda, "id_motivo": id_motivo} if id_motivo else {"id": id_agenda}
+                 for id_agenda in ids]
+        return self._client.aql_many("agendas.destroy", parms, "item", lote, workers)
+
     def reservar(self, dados: dict) -> dict:
         """Reserva um horário na agenda."""
         return self._aql("agendas.reservar", dados, "item", action="agendas.reservar")
@@ -914,12 +1611,52 @@ class KlingoAPI:
 
     BASE_URL = "https://api.klingo.app/api"
 
-    def __init__(self, domain: str = "irb", unidade: int = 1, portal: int = 0):
+    def __init__(self, domain: str = "irb", unidade: int = 1, portal: int = 0,
+                 pool_size: int = 10, timeout: tuple = (5.0, 60.0),
+                 max_retries: int = 3, backoff: float = 0.5, backoff_max: float = 30.0,
+                 max_concurrency: int = 16, token_store: Union["TokenStore", bool, None] = True,
+                 swr_ttls: dict = None, breaker: CircuitBreaker = None):
+        """
+        Args:
+            domain, unidade, portal: Enviados nos headers X-DOMAIN/X-UNIDADE/X-PORTAL
+            pool_size: Conexões mantidas abertas (use >= nº de threads)
+            timeout: (conexão, leitura) em segundos, aplicado a toda requisição
+            max_retries: Novas tentativas para queries somente leitura
+                (*.index, *.show) em falha de rede ou 429/502/503/504
+            backoff: Espera base da 1ª nova tentativa; dobra a cada tentativa
+            backoff_max: Teto da espera, inclusive quando vem Retry-After
+            max_concurrency: Teto do limite adaptativo de requisições simultâneas
+                por domínio/unidade (ver AdaptiveLimiter)
+            token_store: Cache de tokens entre processos (True = TokenStore padrão,
+                False/None = sem cache; o token fica só na instância)
+            swr_ttls: {name: (fresco, stale)} das consultas com cache
+                stale-while-revalidate (padrão SWR_TTLS; {} desliga)
+            breaker: CircuitBreaker por endpoint (padrão: 5 falhas, 30 s aberto)
+        """
         self.domain = domain
         self.unidade = unidade
         self.portal = portal
         self.token = None
+        if token_store is True:
+            try:
+                token_store = TokenStore()
+            except (OSError, sqlite3.Error):
+                token_store = None  # sem diretório gravável: token só na instância
+        self.token_store = token_store or None
+        self._credentials = None
+        self._auth_lock = threading.Lock()
+        self.hooks = {"pre": [], "post": []}
+        self.breaker = breaker or CircuitBreaker()
+        self.cache = StaleCache(swr_ttls) if swr_ttls != {} else None
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
         self.session = requests.Session()
+        adapter = _TimeoutAdapter(timeout, pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.limiter = AdaptiveLimiter.for_key(domain, unidade, max_limit=max_concurrency)
 
         # Headers padrão
         self.session.headers.update({
@@ -928,6 +1665,7 @@ class KlingoAPI:
             "X-DOMAIN": domain,
             "X-PORTAL": str(portal),
             "X-UNIDADE": str(unidade),
+            "Accept-Encoding": ACCEPT_ENCODING,
         })
 
         # Inicializar módulos
@@ -962,37 +1700,178 @@ class KlingoAPI:
         """
         Realiza login e obtém token JWT.
 
+        Com token_store, reaproveita um token válido de outro processo sem
+        chamar a API. As credenciais ficam na instância para renovar o token
+        automaticamente quando uma chamada receber 401.
+
         Args:
             usuario: Nome de usuário
             senha: Senha
 
         Returns:
             dict com dados do login incluindo token
+            ({"access_token": ..., "cached": True} quando veio do cache)
         """
-        response = self.session.post(f"{self.BASE_URL}/login", json={
-            "login": usuario,
-            "senha": senha,
-        })
-
-        if response.status_code != 200:
-            raise KlingoAPIError(
-                f"Falha no login: {response.status_code}",
-                status_code=response.status_code,
-                response=response.json() if response.text else None
-            )
-
-        data = response.json()
-        self.token = data.get("access_token") or data.get("token")
-        if self.token:
-            self.session.headers["Authorization"] = f"Bearer {self.token}"
+        self._credentials = (usuario, senha)
+        if self.token_store is None:
+            token, data = self._request_token()
+        else:
+            token = self.token_store.get(self._token_key())
+            data = None
+            if not token:
+                token, data = self.token_store.refresh(self._token_key(), None, self._request_token)
+        if token:
+            self.set_token(token)
+        return data if data is not None else {"access_token": token, "cached": True}
+
+    def _token_key(self) -> str:
+        # o hash das credenciais impede que outra senha reaproveite o token
+        usuario, senha = self._credentials
+        segredo = hashlib.sha256(f"{usuario}\0{senha}".encode("utf-8")).hexdigest()
+        return f"{self.domain}:{usuario}:{segredo}"
+
+    def _request_token(self) -> tuple:
+        """POST /login com as credenciais guardadas; devolve (token, resposta)."""
+        usuario, senha = self._credentials
+        with self._instrument("login") as info:
+            response = self._post("login", idempotent=True, info=info, json={
+                "login": usuario,
+                "senha": senha,
+            })
+
+            if response.status_code != 200:
+                raise KlingoAPIError(
+                    f"Falha no login: {response.status_code}",
+                    status_code=response.status_code,
+                    response=_decode_or_none(response)
+                )
 
-        return data
+        data = _decode(response)
+        return data.get("access_token") or data.get("token"), data
+
+    def _reauthenticate(self, stale: Optional[str]):
+        """Renova o token após 401; threads concorrentes fazem um único login."""
+        with self._auth_lock:
+            if self.token != stale:
+                return
+            if self.token_store is None:
+                token, _ = self._request_token()
+            else:
+                token, _ = self.token_store.refresh(self._token_key(), stale, self._request_token)
+            if token:
+                self.set_token(token)
 
     def set_token(self, token: str):
         """Define o token JWT manualmente (útil para reutilizar sessões)."""
         self.token = token
         self.session.headers["Authorization"] = f"Bearer {token}"
 
+    def _retry_delay(self, attempt: int, response=None) -> float:
+        """Espera antes da nova tentativa: Retry-After ou backoff exponencial com jitter."""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return min(max(delay, 0.0), self.backoff_max)
+        delay = self.backoff * (2 ** attempt)
+        return min(delay * random.uniform(0.5, 1.0), self.backoff_max)
+
+    def add_hook(self, event: str, fn):
+        """Registra `fn(info: CallInfo)` em "pre" (antes) ou "post" (depois) de cada chamada."""
+        self.hooks[event].append(fn)
+
+    def enable_metrics(self, collector: MetricsCollector = None) -> MetricsCollector:
+        """Liga o coletor de métricas por name como hook "post" e o devolve."""
+        collector = collector or MetricsCollector()
+        self.add_hook("post", collector)
+        return collector
+
+    def _run_hooks(self, event: str, info: CallInfo):
+        for fn in self.hooks[event]:
+            try:
+                fn(info)
+            except Exception as e:  # instrumentação nunca derruba a chamada
+                warnings.warn(f"hook {event} falhou: {e!r}")
+
+    @contextmanager
+    def _instrument(self, name: str, parms: dict = None):
+        info = CallInfo(name, parms)
+        self._run_hooks("pre", info)
+        started = time.perf_counter()
+        try:
+            yield info
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):  # iter_aql abandonado no meio
+                info.error = e
+            raise
+        finally:
+            info.latency = time.perf_counter() - started
+            self._run_hooks("post", info)
+
+    def _post(self, path: str, idempotent: bool = False, info: CallInfo = None,
+              **kwargs) -> requests.Response:
+        """
+        POST em BASE_URL/path com a política de novas tentativas.
+
+        Um 401 com credenciais conhecidas renova o token (ver login) e repete
+        a requisição uma vez, inclusive escritas.
+
+        Requisições idempotentes são repetidas em erro de conexão, timeout e
+        429/502/503/504. As demais só quando comprovadamente não foram
+        processadas: timeout ao conectar ou 429.
+
+        `info` (de _instrument) recebe status, bytes e nº de tentativas.
+        """
+        url = f"{self.BASE_URL}/{path}"
+        attempt = 0
+        reauthenticated = False
+        body = kwargs.get("data")
+        while True:
+            token = self.token
+            if attempt or reauthenticated:
+                if hasattr(body, "seek"):
+                    body.seek(0)  # corpo em streaming: reenviar do início
+            self.limiter.acquire()
+            started = time.monotonic()
+            congested = True
+            if info is not None:
+                info.attempts += 1
+            try:
+                response = self.session.post(url, **kwargs)
+                congested = response.status_code == 429 or response.status_code >= 500
+                if info is not None:
+                    info.status_code = response.status_code
+                    if not kwargs.get("stream"):
+                        info.bytes += len(response.content)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries or not (idempotent or isinstance(e, requests.ConnectTimeout)):
+                    raise
+                response = None
+            finally:
+                self.limiter.release(time.monotonic() - started, congested)
+
+            if response is not None:
+                # token expirado: a requisição não foi processada, renova e repete uma vez
+                if (response.status_code == 401 and path != "login" and self._credentials
+                        and not reauthenticated):
+                    reauthenticated = True
+                    response.close()
+                    self._reauthenticate(token)
+                    continue
+                retry = response.status_code in RETRY_STATUS if idempotent else response.status_code == 429
+                if not retry or attempt >= self.max_retries:
+                    return response
+                response.close()
+            delay = self._retry_delay(attempt, response)
+            attempt += 1
+            time.sleep(delay)
+
     def _aql(self, name: str, parms: dict = None, id_alias: str = "item",
              action: str = None, page: int = None, configs: list = None,
              lon: str = None) -> Any:
@@ -1010,7 +1889,43 @@ class KlingoAPI:
             page: Número da página para paginação
             configs: Lista de configurações extras a buscar
             lon: Cache key para dados que não mudam frequentemente
+
+        Consultas em SWR_TTLS passam pelo cache stale-while-revalidate.
         """
+        if self.cache is not None and name in self.cache.ttls:
+            key = (name, json.dumps([parms, id_alias, action, page, configs, lon], sort_keys=True, default=str))
+            return self.cache.get(name, key, lambda: self._aql_unwrapped(
+                name, parms, id_alias, action, page, configs, lon))
+        result = self._aql_unwrapped(name, parms, id_alias, action, page, configs, lon)
+        self._invalidate_cache(name)
+        return result
+
+    def _invalidate_cache(self, name: str):
+        """Descarta do cache SWR as consultas que a escrita `name` torna obsoletas."""
+        if self.cache is not None and not name.endswith(READ_ONLY_SUFFIXES):
+            for prefix, names in SWR_INVALIDATES.items():
+                if name.startswith(prefix):
+                    for cached in names:
+                        self.cache.invalidate(cached)
+
+    def _aql_unwrapped(self, name: str, parms: dict = None, id_alias: str = "item",
+                       action: str = None, page: int = None, configs: list = None,
+                       lon: str = None) -> Any:
+        data = self._aql_response(name, parms, id_alias, action, page, configs, lon)
+
+        # Extrair resultado pelo alias
+        if id_alias in data:
+            result = data[id_alias]
+            if isinstance(result, dict) and "data" in result:
+                return result["data"]
+            return result
+
+        return data
+
+    def _aql_response(self, name: str, parms: dict = None, id_alias: str = "item",
+                      action: str = None, page: int = None, configs: list = None,
+                      lon: str = None) -> Any:
+        """Envia a query e devolve o corpo da resposta, sem desempacotar o alias."""
         query = {"name": name, "id": id_alias}
         if parms:
             query["parms"] = parms
@@ -1019,25 +1934,32 @@ class KlingoAPI:
         if lon is not None:
             query["lon"] = lon
 
-        url = f"{self.BASE_URL}/aql"
         params = {}
         if action:
             params["a"] = action
         if page:
             params["page"] = page
 
-        response = self.session.post(url, json={"q": [query]}, params=params)
+        with self.breaker.guard(name), self._instrument(name, parms) as info:
+            response = self._post("aql", idempotent=name.endswith(READ_ONLY_SUFFIXES), info=info,
+                                  json={"q": [query]}, params=params)
 
-        if response.status_code != 200:
-            raise KlingoAPIError(
-                f"Erro AQL ({name}): {response.status_code}",
-                status_code=response.status_code,
-                response=response.json() if response.text else None
-            )
+            if response.status_code != 200:
+                raise KlingoAPIError(
+                    f"Erro AQL ({name}): {response.status_code}",
+                    status_code=response.status_code,
+                    response=_decode_or_none(response)
+                )
 
-        data = response.json()
+            data = _decode(response)
+            self._check_body_error(name, data)
+            info.result = data
+
+        return data
 
-        # Detectar erros que vêm com HTTP 200 mas com status/error no body
+    @staticmethod
+    def _check_body_error(name: str, data: Any):
+        """Detecta erros que vêm com HTTP 200 mas com status/error no body."""
         if isinstance(data, dict) and "status" in data and "error" in data:
             status = data["status"]
             if isinstance(status, int) and status >= 400 or isinstance(status, str) and status.isdigit() and int(status) >= 400:
@@ -1047,14 +1969,53 @@ class KlingoAPI:
                     response=data
                 )
 
-        # Extrair resultado pelo alias
-        if id_alias in data:
-            result = data[id_alias]
-            if isinstance(result, dict) and "data" in result:
-                return result["data"]
-            return result
+    def iter_aql(self, name: str, parms: dict = None, id_alias: str = "lista",
+                 action: str = None, page: int = None, paths: tuple = None):
+        """
+        Executa a query e gera os registros da lista um a um.
 
-        return data
+        Com ijson instalado a resposta é lida em streaming (já descomprimida),
+        sem montar o array inteiro em memória; sem ele, decodifica tudo e
+        percorre a lista.
+
+        Args:
+            paths: Caminhos do array no corpo, em notação de ponto. Padrão:
+                (id_alias, id_alias + ".data"). Ex. para agendas.index:
+                ("lista.agendas", "lista.data.agendas")
+        """
+        paths = paths or (id_alias, f"{id_alias}.data")
+        if ijson is None:
+            data = self._aql_response(name, parms, id_alias, action or name, page)
+            for path in paths:
+                items = _at_path(data, path)
+                if isinstance(items, list):
+                    yield from items
+                    return
+            return
+
+        query = {"name": name, "id": id_alias}
+        if parms:
+            query["parms"] = parms
+        params = {"a": action or name}
+        if page:
+            params["page"] = page
+
+        with self.breaker.guard(name), self._instrument(name, parms) as info:
+            response = self._post("aql", idempotent=name.endswith(READ_ONLY_SUFFIXES), info=info,
+                                  stream=True, json={"q": [query]}, params=params)
+            try:
+                if response.status_code != 200:
+                    raise KlingoAPIError(
+                        f"Erro AQL ({name}): {response.status_code}",
+                        status_code=response.status_code,
+                        response=_decode_or_none(response)
+                    )
+                response.raw.decode_content = True
+                top = {}
+                yield from _iter_json_items(_CountingReader(response.raw, info), paths, top)
+                self._check_body_error(name, top)
+            finally:
+                response.close()
 
     def _aql_multi(self, queries: list) -> dict:
         """
@@ -1074,15 +2035,69 @@ class KlingoAPI:
             medicos = results["medicos"]["data"]
             especialidades = results["especialidades"]["data"]
         """
-        response = self.session.post(f"{self.BASE_URL}/aql", json={"q": queries})
+        idempotent = all(q.get("name", "").endswith(READ_ONLY_SUFFIXES) for q in queries)
+        with self.breaker.guard("aql.multi"), self._instrument("aql.multi", {"q": queries}) as info:
+            response = self._post("aql", idempotent=idempotent, info=info, json={"q": queries})
+
+            if response.status_code != 200:
+                raise KlingoAPIError(
+                    f"Erro AQL multi: {response.status_code}",
+                    status_code=response.status_code
+                )
 
-        if response.status_code != 200:
-            raise KlingoAPIError(
-                f"Erro AQL multi: {response.status_code}",
-                status_code=response.status_code
-            )
+            info.result = _decode(response)
+            return info.result
 
-        return response.json()
+    def aql_many(self, name: str, parms_list, id_alias: str = "item",
+                 lote: int = 25, workers: int = 4) -> list:
+        """
+        Executa a mesma query para vários parâmetros, em lotes via _aql_multi.
+
+        Os lotes rodam em paralelo (a concorrência real passa pelo limiter
+        adaptativo). Escritas não são repetidas em erro de rede, como em
+        _post: um lote que falha marca todos os seus itens com o erro.
+
+        Args:
+            name: Nome da query (ex: "agendas.store")
+            parms_list: Iterável com os parms de cada item
+            lote: Queries por requisição
+            workers: Lotes simultâneos
+
+        Returns:
+            Lista na ordem de `parms_list` com {"parms", "result", "error"}
+            (error é None quando o item deu certo)
+        """
+        parms_list = list(parms_list)
+        results = [None] * len(parms_list)
+
+        def run(inicio: int):
+            bloco = parms_list[inicio:inicio + lote]
+            queries = [{"name": name, "id": f"{id_alias}{inicio + i}", "parms": parms}
+                       for i, parms in enumerate(bloco)]
+            try:
+                data = self._aql_multi(queries)
+            except Exception as e:
+                for i, parms in enumerate(bloco):
+                    results[inicio + i] = {"parms": parms, "result": None, "error": str(e)}
+                return
+            for i, (parms, query) in enumerate(zip(bloco, queries)):
+                item = data.get(query["id"]) if isinstance(data, dict) else None
+                entry = {"parms": parms, "result": None, "error": None}
+                try:
+                    if item is None:
+                        raise KlingoAPIError(f"Erro AQL ({name}): sem resposta para {query['id']}")
+                    self._check_body_error(name, item)
+                    entry["result"] = item["data"] if isinstance(item, dict) and "data" in item else item
+                except KlingoAPIError as e:
+                    entry["error"] = str(e)
+                results[inicio + i] = entry
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(run, range(0, len(parms_list), lote)))
+        finally:
+            self._invalidate_cache(name)
+        return results
 
     def aql_raw(self, name: str, parms: dict = None, **kwargs) -> dict:
         """
@@ -1097,30 +2112,118 @@ class KlingoAPI:
         """
         return self._aql(name, parms, **kwargs)
 
+    def aql_full(self, name: str, parms: dict = None, id_alias: str = "item",
+                 action: str = None, **kwargs) -> dict:
+        """
+        Como aql_raw, mas devolve o corpo inteiro da resposta ({id_alias: ...}),
+        passando pelas novas tentativas, renovação de token e hooks do cliente.
+        """
+        return self._aql_response(name, parms, id_alias, action or name, **kwargs)
+
     def upload_arquivo(self, file_path: str, id_atendimento: int = None) -> dict:
-        """Faz upload de um arquivo."""
-        with open(file_path, 'rb') as f:
-            files = {'file': f}
-            headers = {k: v for k, v in self.session.headers.items()
-                       if k != 'Content-Type'}
-            response = requests.post(
-                f"{self.BASE_URL}/upload_arquivo_token",
-                files=files,
-                headers=headers,
-                data={"id_atendimento": id_atendimento} if id_atendimento else {}
-            )
-
-        if response.status_code != 200:
-            raise KlingoAPIError(f"Erro upload: {response.status_code}")
-
-        return response.json()
+        """Faz upload de um arquivo.
+
+        O arquivo é enviado em streaming do disco pela sessão (pool de
+        conexões, timeouts e token do cliente), sem carregá-lo em memória.
+        """
+        fields = {"id_atendimento": id_atendimento} if id_atendimento else {}
+        body = _MultipartUpload(file_path, fields)
+        try:
+            with self._instrument("upload_arquivo_token", fields) as info:
+                response = self._post("upload_arquivo_token", info=info, data=body,
+                                      headers={"Content-Type": body.content_type})
+                if response.status_code != 200:
+                    raise KlingoAPIError(f"Erro upload: {response.status_code}",
+                                         status_code=response.status_code)
+        finally:
+            body.close()
+
+        return _decode(response)
 
     def download_arquivo(self, dados: dict) -> bytes:
-        """Faz download de um arquivo."""
-        response = self.session.post(f"{self.BASE_URL}/arq", json=dados)
-        if response.status_code != 200:
-            raise KlingoAPIError(f"Erro download: {response.status_code}")
-        return response.content
+        """Faz download de um arquivo (inteiro em memória; ver download_arquivo_to)."""
+        with self._instrument("arq", dados) as info:
+            response = self._post("arq", idempotent=True, info=info, json=dados)
+            if response.status_code != 200:
+                raise KlingoAPIError(f"Erro download: {response.status_code}")
+            return response.content
+
+    def download_arquivo_to(self, dados: dict, path_or_fileobj, chunk_size: int = 1 << 16) -> int:
+        """
+        Faz download de um arquivo direto para disco, em blocos de `chunk_size`.
+
+        Args:
+            dados: Mesmo payload de download_arquivo
+            path_or_fileobj: Caminho de destino (gravado em .part e renomeado
+                ao concluir) ou objeto com write()
+
+        Returns:
+            Bytes gravados
+        """
+        with self._instrument("arq", dados) as info:
+            response = self._post("arq", idempotent=True, info=info, json=dados, stream=True)
+            try:
+                if response.status_code != 200:
+                    raise KlingoAPIError(f"Erro download: {response.status_code}",
+                                         status_code=response.status_code)
+                if hasattr(path_or_fileobj, "write"):
+                    written = self._write_chunks(response, path_or_fileobj, chunk_size)
+                else:
+                    tmp = f"{os.fspath(path_or_fileobj)}.part"
+                    try:
+                        with open(tmp, "wb") as fp:
+                            written = self._write_chunks(response, fp, chunk_size)
+                        os.replace(tmp, path_or_fileobj)
+                    except BaseException:
+                        if os.path.exists(tmp):
+                            os.remove(tmp)
+                        raise
+                info.bytes += written
+                return written
+            finally:
+                response.close()
+
+    @staticmethod
+    def _write_chunks(response: requests.Response, fp, chunk_size: int) -> int:
+        written = 0
+        for chunk in response.iter_content(chunk_size):
+            fp.write(chunk)
+            written += len(chunk)
+        return written
+
+    def bulk_download(self, items, workers: int = 4, chunk_size: int = 1 << 16) -> list:
+        """
+        Baixa vários arquivos em paralelo direto para disco.
+
+        A memória fica limitada a ~workers x chunk_size: cada download é
+        gravado em blocos e no máximo 2 x workers itens ficam pendentes. A
+        concorrência real ainda passa pelo limiter adaptativo do cliente.
+
+        Args:
+            items: Iterável de (dados, destino), como em download_arquivo_to
+                (ex.: anexos das marcações de um período)
+            workers: Downloads simultâneos
+
+        Returns:
+            Lista na ordem de `items` com {"destino", "bytes", "error"}
+        """
+        results = []
+        pending = deque()
+
+        def collect(future, destino):
+            try:
+                results.append({"destino": destino, "bytes": future.result(), "error": None})
+            except Exception as e:
+                results.append({"destino": destino, "bytes": 0, "error": str(e)})
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for dados, destino in items:
+                pending.append((pool.submit(self.download_arquivo_to, dados, destino, chunk_size), destino))
+                if len(pending) >= 2 * workers:
+                    collect(*pending.popleft())
+            while pending:
+                collect(*pending.popleft())
+        return results
 
     def modulos_acesso(self) -> dict:
         """Lista módulos que o usuário tem acesso.
@@ -1131,6 +2234,535 @@ class KlingoAPI:
         return self._aql("modulos.acesso", {}, "item")
 
 
+# ============================================================================
+# ÍNDICE DE DISPONIBILIDADE
+# ============================================================================
+_HORA = re.compile(r"^\s*(\d{1,2}):(\d{2})")
+
+
+def _parse_horarios(node: Any, dia: str, chave=None):
+    """
+    Extrai (início, slot) do retorno de medicos.horarios.
+
+    Aceita só os formatos vistos na Klingo: lista de "HH:MM", lista de
+    {data, hora, id}, grupos {data, horarios: [...] | {id_horario: "HH:MM"}}
+    e envelopes {"horarios": ...} / {"data": [...]}. Qualquer outra forma é
+    ignorada com aviso, em vez de virar horário livre.
+    """
+    if isinstance(node, str):
+        m = _HORA.match(node)
+        if not m:
+            warnings.warn(f"disponibilidade: hora inválida em {dia}: {node[:40]!r}")
+            return
+        inicio = datetime.strptime(dia[:10], "%Y-%m-%d").replace(hour=int(m[1]), minute=int(m[2]))
+        yield inicio, {"data": inicio.date().isoformat(), "hora": inicio.strftime("%H:%M"),
+                       "id_horario": chave}
+    elif isinstance(node, list):
+        for item in node:
+            yield from _parse_horarios(item, dia)
+    elif isinstance(node, dict):
+        if node.get("livre") is False or node.get("ocupado"):
+            return
+        data = node["data"] if isinstance(node.get("data"), str) else dia
+        if isinstance(node.get("hora"), str):
+            yield from _parse_horarios(node["hora"], data, node.get("id", chave))
+        elif isinstance(node.get("horarios"), dict):
+            for id_horario, hora in node["horarios"].items():
+                yield from _parse_horarios(hora, data, id_horario)
+        elif isinstance(node.get("horarios"), list):
+            yield from _parse_horarios(node["horarios"], data)
+        elif isinstance(node.get("data"), (list, dict)):
+            yield from _parse_horarios(node["data"], dia)
+        else:
+            warnings.warn(f"disponibilidade: formato de horários desconhecido em {dia}: "
+                          f"chaves {sorted(map(str, node))[:8]}")
+    elif node is not None:
+        warnings.warn(f"disponibilidade: formato de horários desconhecido em {dia}: {type(node).__name__}")
+
+
+_DATA = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def _ids_marcacao(body: Any, profundidade: int = 3) -> list:
+    """IDs da marcação criada no retorno de agendas.store/reservar ({"item": {...}})."""
+    if not isinstance(body, dict) or profundidade < 0:
+        return []
+    ids = [body[k] for k in ("id_marcacao", "id_agenda", "id") if body.get(k) is not None]
+    if ids:
+        return ids
+    for valor in body.values():
+        ids = _ids_marcacao(valor, profundidade - 1)
+        if ids:
+            return ids
+    return []
+
+
+def _local_marcacao(item: Any) -> Optional[tuple]:
+    """(id_medico, dia) de uma marcação de marcacoes.show, ou None."""
+    if not isinstance(item, dict):
+        return None
+    marcacao = item.get("marcacao") if isinstance(item.get("marcacao"), dict) else item
+    id_medico = marcacao.get("id_medico", item.get("id_medico"))
+    for campo in ("data", "dt_agenda", "dt_marcacao", "dt_inicio"):
+        valor = marcacao.get(campo, item.get(campo))
+        if isinstance(valor, str) and _DATA.match(valor) and id_medico:
+            return id_medico, valor[:10]
+    return None
+
+
+class DisponibilidadeIndex:
+    """
+    Índice em memória dos horários livres dos médicos ativos nos próximos dias.
+
+    Monta, com uma chamada a medicos.horarios por médico/procedimento/dia, um
+    array ordenado de horários por (médico, procedimento). `proximos_horarios`
+    responde da memória com bisect + merge, sem ir na API.
+
+    Escritas em agendas.* (agendar, reservar, liberar...) feitas pelo mesmo
+    KlingoAPI atualizam só o dia/médico afetado. Escritas que só trazem o id
+    da marcação (cancelar, liberar_reservas) usam o médico/dia aprendido no
+    retorno do agendar ou, sem ele, consultam marcacoes.show. Só o que não
+    se resolve pede uma reconstrução completa, no máximo uma a cada
+    `min_intervalo` segundos (na thread de fundo ou, sem ela, na próxima
+    consulta).
+
+    Uso:
+        disp = DisponibilidadeIndex(api, dias=14, procedimentos={12: [345]})
+        disp.iniciar(intervalo=600)       # reconstrói a cada 10 min
+        disp.proximos_horarios(12, limite=5)
+    """
+
+    def __init__(self, api: KlingoAPI, dias: int = 7, procedimentos: dict = None,
+                 workers: int = 4, min_intervalo: float = 60.0):
+        """
+        Args:
+            api: Cliente já autenticado
+            dias: Janela indexada, a partir de hoje
+            procedimentos: {id_especialidade: [id_procedimento, ...]} consultados
+                para os médicos de cada especialidade (padrão: sem procedimento)
+            workers: Chamadas simultâneas na reconstrução (ainda sob o limiter)
+            min_intervalo: Segundos mínimos entre reconstruções completas
+                pedidas por escritas que não se resolvem em médico/dia
+        """
+        self.api = api
+        self.dias = dias
+        self.procedimentos = procedimentos or {}
+        self.workers = workers
+        self.min_intervalo = min_intervalo
+        self._lock = threading.Lock()
+        self._slots = {}             # (id_medico, id_procedimento) -> ([início], [slot])
+        self._por_especialidade = {}  # id_especialidade -> {id_medico: (id_procedimento, ...)}
+        self._pendentes = set()      # (id_medico, dia) ou None = reconstrução completa
+        self._ids_pendentes = set()  # id de marcação ainda sem médico/dia conhecido
+        self._marcacoes = {}         # id de marcação -> (id_medico, dia)
+        self._ultima_completa = None  # time.monotonic() da última reconstrução
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread = None
+        self.atualizado_em = None
+        api.add_hook("post", self._on_call)
+
+    # --- montagem -------------------------------------------------------
+
+    def _dias(self) -> list:
+        hoje = date.today()
+        return [(hoje + timedelta(days=i)).isoformat() for i in range(self.dias)]
+
+    def _buscar(self, id_medico: int, dia: str, id_procedimento: Optional[int]) -> tuple:
+        """Horários livres do médico no dia, ordenados; ignora o cache SWR."""
+        parms = {"id_medico": id_medico, "data": dia}
+        if id_procedimento:
+            parms["id_procedimento"] = id_procedimento
+        payload = self.api._aql_unwrapped("medicos.horarios", parms, "item")
+        slots = sorted(_parse_horarios(payload, dia), key=lambda s: s[0])
+        for _, slot in slots:
+            slot.update(id_medico=id_medico, id_procedimento=id_procedimento)
+        return [inicio for inicio, _ in slots], [slot for _, slot in slots]
+
+    def _agenda_medicos(self) -> dict:
+        por_especialidade = {}
+        for medico in self.api.medicos.listar() or []:
+            id_medico = medico.get("id_pessoa")
+            for esp in medico.get("medico_especialidade") or []:
+                id_esp = esp.get("id_especialidade") if isinstance(esp, dict) else None
+                if id_medico is None or id_esp is None:
+                    continue
+                procs = tuple(self.procedimentos.get(id_esp, (None,)))
+                atual = por_especialidade.setdefault(id_esp, {}).get(id_medico, ())
+                por_especialidade[id_esp][id_medico] = atual + tuple(p for p in procs if p not in atual)
+        return por_especialidade
+
+    @staticmethod
+    def _faixa(inicios: list, dia: str) -> tuple:
+        comeco = datetime.strptime(dia, "%Y-%m-%d")
+        return bisect.bisect_left(inicios, comeco), bisect.bisect_left(inicios, comeco + timedelta(days=1))
+
+    def atualizar(self) -> int:
+        """Reconstrói o índice inteiro; devolve o nº de horários livres indexados.
+
+        Dias cuja consulta falhar mantêm os horários do índice anterior.
+        """
+        with self._lock:
+            self._pendentes.discard(None)
+            self._ultima_completa = time.monotonic()  # conta mesmo se falhar: sem rajada de retries
+        por_especialidade = self._agenda_medicos()
+        chaves = {(m, p) for medicos in por_especialidade.values() for m, procs in medicos.items() for p in procs}
+        tarefas = [(m, dia, p) for m, p in sorted(chaves, key=str) for dia in self._dias()]
+        novos = {chave: ([], []) for chave in chaves}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futuros = [(t, pool.submit(self._buscar, *t)) for t in tarefas]
+        for (id_medico, dia, id_proc), futuro in futuros:
+            try:
+                inicios, slots = futuro.result()
+            except Exception:
+                with self._lock:
+                    antigos_i, antigos_s = self._slots.get((id_medico, id_proc), ([], []))
+                    lo, hi = self._faixa(antigos_i, dia)
+                    inicios, slots = antigos_i[lo:hi], antigos_s[lo:hi]
+            novos[(id_medico, id_proc)][0].extend(inicios)
+            novos[(id_medico, id_proc)][1].extend(slots)
+        hoje = date.today().isoformat()
+        with self._lock:
+            self._slots = novos
+            self._por_especialidade = por_especialidade
+            self._marcacoes = {k: v for k, v in self._marcacoes.items() if v[1] >= hoje}
+            self.atualizado_em = datetime.now()
+        return sum(len(inicios) for inicios, _ in novos.values())
+
+    def atualizar_dia(self, id_medico: int, dia: str):
+        """Reconsulta só um médico/dia (todos os procedimentos indexados dele)."""
+        dia = dia[:10]
+        with self._lock:
+            procs = [p for m, p in self._slots if m == id_medico]
+        for id_proc in procs:
+            inicios, slots = self._buscar(id_medico, dia, id_proc)
+            with self._lock:
+                atuais_i, atuais_s = self._slots.setdefault((id_medico, id_proc), ([], []))
+                lo, hi = self._faixa(atuais_i, dia)
+                atuais_i[lo:hi] = inicios
+                atuais_s[lo:hi] = slots
+
+    # --- atualização incremental ----------------------------------------
+
+    def _on_call(self, info: CallInfo):
+        """Hook "post": escritas em agendas.* (avulsas ou em lote) marcam o médico/dia afetado."""
+        if info.name == "aql.multi":
+            corpo = info.result if isinstance(info.result, dict) else {}
+            queries = [(q.get("name", ""), q.get("parms"), corpo.get(q.get("id")))
+                       for q in info.parms["q"]]
+        elif info.error is None:
+            queries = [(info.name, info.parms, info.result)]
+        else:
+            return
+        pendentes, ids = set(), set()
+        with self._lock:
+            for name, parms, resultado in queries:
+                if not name.startswith("agendas.") or name.endswith(READ_ONLY_SUFFIXES):
+                    continue
+                parms = parms if isinstance(parms, dict) else {}
+                id_medico, dia = parms.get("id_medico"), parms.get("data")
+                if id_medico and dia:
+                    local = (id_medico, str(dia)[:10])
+                    pendentes.add(local)
+                    for id_marcacao in _ids_marcacao(resultado):
+                        self._marcacoes[id_marcacao] = local
+                    continue
+                alvos = parms.get("ids") or ([parms["id"]] if parms.get("id") is not None else [])
+                if not alvos:
+                    pendentes.add(None)
+                for id_marcacao in alvos:
+                    local = self._marcacoes.get(id_marcacao)
+                    if local:
+                        pendentes.add(local)
+                    else:
+                        ids.add(id_marcacao)
+            self._pendentes |= pendentes
+            self._ids_pendentes |= ids
+        if pendentes or ids:
+            self._acordar.set()
+
+    def _resolver(self, id_marcacao) -> Optional[tuple]:
+        """(id_medico, dia) da marcação via marcacoes.show; None se não der."""
+        try:
+            local = _local_marcacao(self.api.marcacoes.detalhar(id_marcacao))
+        except Exception as e:
+            warnings.warn(f"disponibilidade: marcação {id_marcacao} não consultada: {e!r}")
+            return None
+        if local:
+            with self._lock:
+                self._marcacoes[id_marcacao] = local
+        return local
+
+    def _espera_completa(self) -> float:
+        """Segundos até a próxima reconstrução completa ser permitida (0 = já)."""
+        if self._ultima_completa is None:
+            return 0.0
+        return max(self._ultima_completa + self.min_intervalo - time.monotonic(), 0.0)
+
+    def _processar_pendentes(self):
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, set()
+            ids, self._ids_pendentes = self._ids_pendentes, set()
+        for id_marcacao in ids:
+            pendentes.add(self._resolver(id_marcacao))
+        if None in pendentes:
+            if self._espera_completa() == 0.0:
+                self.atualizar()
+                return
+            with self._lock:
+                self._pendentes.add(None)  # fica para quando o intervalo mínimo passar
+            pendentes.discard(None)
+        for id_medico, dia in pendentes:
+            try:
+                self.atualizar_dia(id_medico, dia)
+            except Exception as e:
+                warnings.warn(f"disponibilidade: falha ao atualizar {id_medico}/{dia}: {e!r}")
+
+    def iniciar(self, intervalo: float = 600.0):
+        """Reconstrói em segundo plano a cada `intervalo` segundos e aplica as
+        atualizações incrementais assim que as escritas acontecem."""
+        if self._thread is not None:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, args=(intervalo,),
+                                        name="klingo-disponibilidade", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self._acordar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self, intervalo: float):
+        proxima = 0.0
+        while not self._parar.is_set():
+            try:
+                if time.monotonic() >= proxima:
+                    self.atualizar()
+                    proxima = time.monotonic() + intervalo
+                self._processar_pendentes()
+            except Exception as e:  # a thread segue; o índice antigo continua servindo
+                warnings.warn(f"disponibilidade: falha na atualização: {e!r}")
+                proxima = time.monotonic() + min(intervalo, 60.0)
+            espera = max(proxima - time.monotonic(), 0.0)
+            if None in self._pendentes:
+                espera = min(espera, self._espera_completa())
+            self._acordar.wait(espera)
+            self._acordar.clear()
+
+    # --- consulta -------------------------------------------------------
+
+    def proximos_horarios(self, especialidade: int, procedimento: int = None,
+                          limite: int = 5, a_partir: datetime = None) -> list:
+        """
+        Próximos horários livres da especialidade, em ordem de início.
+
+        Args:
+            especialidade: id_especialidade
+            procedimento: id_procedimento (None = qualquer indexado)
+            limite: Máximo de horários devolvidos
+            a_partir: Início mínimo (padrão: agora)
+
+        Returns:
+            Lista de {"inicio", "data", "hora", "id_horario", "id_medico", "id_procedimento"}
+        """
+        if self._thread is None and (self._pendentes or self._ids_pendentes):
+            try:
+                self._processar_pendentes()
+            except Exception as e:  # responde com o índice atual
+                warnings.warn(f"disponibilidade: falha na atualização: {e!r}")
+        a_partir = a_partir or datetime.now()
+        with self._lock:
+            candidatos = []
+            for id_medico, procs in self._por_especialidade.get(especialidade, {}).items():
+                for id_proc in procs:
+                    if procedimento is not None and id_proc != procedimento:
+                        continue
+                    inicios, slots = self._slots.get((id_medico, id_proc), ([], []))
+                    i = bisect.bisect_left(inicios, a_partir)
+                    candidatos.append(zip(inicios[i:i + limite], slots[i:i + limite]))
+        return [{"inicio": inicio, **slot}
+                for inicio, slot in islice(heapq.merge(*candidatos, key=lambda s: s[0]), limite)]
+
+
+# ============================================================================
+# FEED DE MUDANÇAS DAS AGENDAS
+# ============================================================================
+def _slots_agenda(payload: Any) -> list:
+    """Slots do retorno de agendas.listar (lista direta ou {"agendas": [...]})."""
+    if isinstance(payload, dict):
+        payload = payload.get("agendas", payload.get("data"))
+    return payload if isinstance(payload, list) else []
+
+
+class AgendasFeed:
+    """
+    Change-data-capture sobre agendas.listar.
+
+    Guarda o último snapshot de cada (dia, médico) e, a cada poll, compara
+    as marcações por id_marcacao + status + hash do slot. Só as diferenças
+    viram eventos:
+
+        {"tipo": "insert" | "update" | "delete", "data", "id_medico",
+         "id_marcacao", "status", "status_anterior", "registro"}
+
+    entregues aos callbacks (`on_change`) e/ou a uma fila local. O primeiro
+    poll de cada dia só forma a base (sem eventos), salvo `emitir_inicial`.
+    Um dia/médico cuja consulta falhar mantém o snapshot anterior e não
+    gera deletes.
+
+    Uso:
+        fila = queue.Queue()
+        feed = AgendasFeed(api, dias=2, fila=fila)
+        feed.iniciar(intervalo=30)
+        evento = fila.get()
+    """
+
+    def __init__(self, api: KlingoAPI, dias: int = 1, medicos: list = None, fila=None,
+                 emitir_inicial: bool = False, workers: int = 4, **filtros):
+        """
+        Args:
+            api: Cliente já autenticado
+            dias: Dias acompanhados, a partir de hoje
+            medicos: IDs de médicos (um listar por médico/dia); None = um
+                listar por dia com todos os médicos
+            fila: queue.Queue (ou qualquer objeto com put) que recebe os eventos
+            emitir_inicial: Emite inserts das marcações já existentes no 1º poll
+            workers: Consultas simultâneas por poll (ainda sob o limiter)
+            **filtros: Repassados a agendas.listar (turno, unidade_operacao...)
+        """
+        self.api = api
+        self.dias = dias
+        self.medicos = medicos
+        self.fila = fila
+        self.emitir_inicial = emitir_inicial
+        self.workers = workers
+        self.filtros = filtros
+        self.callbacks = []
+        self._lock = threading.Lock()
+        self._snapshots = {}  # (dia, id_medico) -> {id_marcacao: (status, hash, slot)}
+        self._vistos = set()  # (dia, filtro de médico) que já têm base
+        self._parar = threading.Event()
+        self._thread = None
+
+    def on_change(self, fn):
+        """Registra `fn(evento)` chamado para cada mudança."""
+        self.callbacks.append(fn)
+
+    @staticmethod
+    def _registro(slot: dict) -> tuple:
+        marcacao = slot["marcacao"]
+        status = slot.get("status", marcacao.get("status"))
+        digest = hashlib.sha1(json.dumps(slot, sort_keys=True, default=str).encode()).hexdigest()
+        return status, digest, slot
+
+    def _buscar(self, dia: str, medico) -> dict:
+        """{(dia, id_medico): {id_marcacao: (status, hash, slot)}} de um listar."""
+        payload = self.api.agendas.listar(data=dia, medico="" if medico is None else str(medico),
+                                          **self.filtros)
+        atual = {}
+        for slot in _slots_agenda(payload):
+            marcacao = slot.get("marcacao") if isinstance(slot, dict) else None
+            if not isinstance(marcacao, dict) or marcacao.get("id_marcacao") is None:
+                continue
+            id_medico = marcacao.get("id_medico", medico)
+            atual.setdefault((dia, id_medico), {})[marcacao["id_marcacao"]] = self._registro(slot)
+        return atual
+
+    def _diff(self, dia: str, medico, atual: dict) -> list:
+        eventos = []
+        with self._lock:
+            chaves = set(atual) | {
+                k for k in self._snapshots if k[0] == dia and (medico is None or k[1] == medico)
+            }
+            base = (dia, medico) not in self._vistos
+            self._vistos.add((dia, medico))
+            for chave in chaves:
+                antes = self._snapshots.get(chave, {})
+                depois = atual.get(chave, {})
+                for id_marcacao, (status, digest, slot) in depois.items():
+                    anterior = antes.get(id_marcacao)
+                    if anterior is None:
+                        tipo = "insert"
+                    elif anterior[1] != digest or anterior[0] != status:
+                        tipo = "update"
+                    else:
+                        continue
+                    eventos.append({"tipo": tipo, "data": dia, "id_medico": chave[1],
+                                    "id_marcacao": id_marcacao, "status": status,
+                                    "status_anterior": anterior[0] if anterior else None,
+                                    "registro": slot})
+                for id_marcacao in antes.keys() - depois.keys():
+                    status, _, slot = antes[id_marcacao]
+                    eventos.append({"tipo": "delete", "data": dia, "id_medico": chave[1],
+                                    "id_marcacao": id_marcacao, "status": None,
+                                    "status_anterior": status, "registro": slot})
+                if depois:
+                    self._snapshots[chave] = depois
+                else:
+                    self._snapshots.pop(chave, None)
+        if base and not self.emitir_inicial:
+            return []
+        return eventos
+
+    def _emitir(self, evento: dict):
+        for fn in self.callbacks:
+            try:
+                fn(evento)
+            except Exception as e:  # um consumidor com erro não para o feed
+                warnings.warn(f"agendas feed: callback falhou: {e!r}")
+        if self.fila is not None:
+            self.fila.put(evento)
+
+    def poll(self) -> list:
+        """Consulta todos os dias/médicos uma vez, emite e devolve os eventos."""
+        hoje = date.today()
+        dias = [(hoje + timedelta(days=i)).isoformat() for i in range(self.dias)]
+        unidades = [(dia, m) for dia in dias for m in (self.medicos or [None])]
+        with self._lock:  # dias que saíram da janela
+            for chave in [k for k in self._snapshots if k[0] not in dias]:
+                del self._snapshots[chave]
+            self._vistos = {k for k in self._vistos if k[0] in dias}
+        eventos = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futuros = [(dia, m, pool.submit(self._buscar, dia, m)) for dia, m in unidades]
+        for dia, medico, futuro in futuros:
+            try:
+                atual = futuro.result()
+            except Exception as e:
+                warnings.warn(f"agendas feed: falha em {dia}/{medico}: {e!r}")
+                continue
+            eventos.extend(self._diff(dia, medico, atual))
+        for evento in eventos:
+            self._emitir(evento)
+        return eventos
+
+    def iniciar(self, intervalo: float = 30.0):
+        """Faz poll a cada `intervalo` segundos numa thread de fundo."""
+        if self._thread is not None:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, args=(intervalo,),
+                                        name="klingo-agendas-feed", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self, intervalo: float):
+        while not self._parar.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                warnings.warn(f"agendas feed: falha no poll: {e!r}")
+            self._parar.wait(intervalo)
+
+
 # ============================================================================
 # EXEMPLO DE USO
 # ============================================================================
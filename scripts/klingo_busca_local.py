@@ -0,0 +1,186 @@
+"""
+Busca local no espelho SQLite da Klingo (FTS5)
+==============================================
+
+Índices de texto completo sobre o banco gerado por `criar_banco_klingo.py`,
+para a recepção e o bot responderem buscas sem ir na API (e continuarem
+funcionando com a Klingo lenta ou fora do ar):
+
+    pacientes_fts       nome, CPF e cartão SUS (só dígitos)
+    procedimentos_fts   nome/código dos procedimentos (procedimentos.index)
+    cids_fts            código e descrição dos CIDs (cids.index)
+
+Nomes são buscados sem acento e por prefixo de cada palavra ("mar sil" acha
+"Maria da Silva"); termos só com dígitos buscam prefixo de CPF/SUS.
+
+Uso:
+    from klingo_busca_local import BuscaLocal
+
+    busca = BuscaLocal("/caminho/klingo_irb.db")
+    busca.pacientes("maria silva")
+    busca.pacientes("123.456")          # prefixo de CPF ou SUS
+    busca.procedimentos("consulta card")
+    busca.cids("J45")
+
+    python klingo_busca_local.py pacientes "maria silva"
+"""
+
+import re
+import sqlite3
+import sys
+
+TOKENIZE = "unicode61 remove_diacritics 2"
+_PALAVRA = re.compile(r"\w+", re.UNICODE)
+_NAO_DIGITO = re.compile(r"\D")
+
+# colunas candidatas de cada catálogo; entram as que existirem na tabela
+CATALOGOS = {
+    "procedimentos_fts": ("procedimentos", ("st_procedimento", "st_codigo", "st_codigo_tuss", "st_sigla")),
+    "cids_fts": ("cids", ("st_cid", "st_codigo", "st_descricao", "st_nome")),
+}
+PACIENTE_NOMES = ("st_nome", "st_nome_social")
+
+
+def _digitos(value) -> str:
+    return _NAO_DIGITO.sub("", str(value)) if value is not None else ""
+
+
+def _colunas(conn: sqlite3.Connection, tabela: str) -> list[str]:
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{tabela}")')]
+
+
+def _tabela_existe(conn: sqlite3.Connection, tabela: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)
+    ).fetchone() is not None
+
+
+def _construir_pacientes(conn: sqlite3.Connection) -> int:
+    conn.execute("DROP TABLE IF EXISTS pacientes_fts")
+    # criada mesmo sem a tabela de origem: busca num espelho parcial volta vazia
+    conn.execute(
+        f"CREATE VIRTUAL TABLE pacientes_fts USING fts5(nome, cpf, sus, tokenize='{TOKENIZE}', prefix='2 3')"
+    )
+    if not _tabela_existe(conn, "pacientes"):
+        return 0
+    colunas = _colunas(conn, "pacientes")
+    nomes = [c for c in PACIENTE_NOMES if c in colunas]
+    nome_sql = " || ' ' || ".join(f"coalesce(p.\"{c}\", '')" for c in nomes) or "''"
+    # CPF e SUS vêm das tabelas filhas da projeção (klingo_schema.PROJECTIONS)
+    joins, cpf_sql, sus_sql = "", "NULL", "NULL"
+    if _tabela_existe(conn, "paciente_cadastros") and "st_cpf" in _colunas(conn, "paciente_cadastros"):
+        joins += " LEFT JOIN paciente_cadastros c ON c.id_paciente = p.id_pessoa"
+        cpf_sql = "c.st_cpf"
+    if _tabela_existe(conn, "paciente_unidades") and "st_sus" in _colunas(conn, "paciente_unidades"):
+        joins += " LEFT JOIN paciente_unidades u ON u.id_paciente = p.id_pessoa"
+        sus_sql = "u.st_sus"
+    rows = conn.execute(f"SELECT p.rowid, {nome_sql}, {cpf_sql}, {sus_sql} FROM pacientes p{joins}").fetchall()
+    conn.executemany(
+        "INSERT INTO pacientes_fts (rowid, nome, cpf, sus) VALUES (?, ?, ?, ?)",
+        ((rowid, nome, _digitos(cpf), _digitos(sus)) for rowid, nome, cpf, sus in rows),
+    )
+    return len(rows)
+
+
+def _construir_catalogo(conn: sqlite3.Connection, fts: str, tabela: str, candidatas: tuple[str, ...]) -> int:
+    conn.execute(f'DROP TABLE IF EXISTS "{fts}"')
+    existentes = _colunas(conn, tabela) if _tabela_existe(conn, tabela) else []
+    colunas = [c for c in candidatas if c in existentes]
+    conn.execute(
+        f'CREATE VIRTUAL TABLE "{fts}" USING fts5({", ".join(colunas or candidatas)}, '
+        f'tokenize=\'{TOKENIZE}\', prefix=\'2 3\')'
+    )
+    if not colunas:
+        return 0
+    cols = ", ".join(f'"{c}"' for c in colunas)
+    conn.execute(f'INSERT INTO "{fts}" (rowid, {cols}) SELECT rowid, {cols} FROM "{tabela}"')
+    return conn.execute(f'SELECT count(*) FROM "{fts}"').fetchone()[0]
+
+
+def construir_indices(conn: sqlite3.Connection) -> dict[str, int]:
+    """(Re)cria as tabelas FTS5 a partir das tabelas do espelho."""
+    contagem = {"pacientes_fts": _construir_pacientes(conn)}
+    for fts, (tabela, candidatas) in CATALOGOS.items():
+        contagem[fts] = _construir_catalogo(conn, fts, tabela, candidatas)
+    conn.commit()
+    return contagem
+
+
+def _consulta_fts(termo: str, colunas: str | None = None) -> str | None:
+    """Converte o texto digitado numa consulta FTS5 de prefixos (AND)."""
+    palavras = _PALAVRA.findall(termo)
+    if not palavras:
+        return None
+    consulta = " ".join(f'"{p}"*' for p in palavras)
+    return f"{{{colunas}}} : ({consulta})" if colunas else consulta
+
+
+class BuscaLocal:
+    """Consultas no espelho local; conexão somente leitura reaproveitada."""
+
+    def __init__(self, db_path: str):
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self):
+        self.conn.close()
+
+    def _disponivel(self, fts: str, tabela: str) -> bool:
+        # espelho sem a tabela de origem ou gerado antes dos índices FTS
+        return _tabela_existe(self.conn, fts) and _tabela_existe(self.conn, tabela)
+
+    def pacientes(self, termo: str, limite: int = 20) -> list[dict]:
+        """Busca por nome (prefixo de cada palavra) ou por prefixo de CPF/SUS."""
+        digitos = _digitos(termo)
+        if digitos and not re.search(r"[^\d\s.\-/]", termo):
+            if len(digitos) < 3:
+                return []
+            consulta = f'{{cpf sus}} : "{digitos}"*'
+        else:
+            consulta = _consulta_fts(termo, "nome")
+            if consulta is None:
+                return []
+        if not self._disponivel("pacientes_fts", "pacientes"):
+            return []
+        rows = self.conn.execute(
+            """
+            SELECT p.*, f.cpf AS _cpf, f.sus AS _sus
+            FROM pacientes_fts f JOIN pacientes p ON p.rowid = f.rowid
+            WHERE pacientes_fts MATCH ?
+            ORDER BY rank LIMIT ?
+            """,
+            (consulta, limite),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _catalogo(self, fts: str, termo: str, limite: int) -> list[dict]:
+        consulta = _consulta_fts(termo)
+        if consulta is None:
+            return []
+        tabela = CATALOGOS[fts][0]
+        if not self._disponivel(fts, tabela):
+            return []
+        rows = self.conn.execute(
+            f'SELECT t.* FROM "{fts}" f JOIN "{tabela}" t ON t.rowid = f.rowid '
+            f'WHERE "{fts}" MATCH ? ORDER BY rank LIMIT ?',
+            (consulta, limite),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def procedimentos(self, termo: str, limite: int = 20) -> list[dict]:
+        """Busca procedimentos por nome ou código."""
+        return self._catalogo("procedimentos_fts", termo, limite)
+
+    def cids(self, termo: str, limite: int = 20) -> list[dict]:
+        """Busca CIDs por código ou descrição."""
+        return self._catalogo("cids_fts", termo, limite)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("pacientes", "procedimentos", "cids"):
+        print("Uso: python klingo_busca_local.py pacientes|procedimentos|cids <termo> [db_path]")
+        sys.exit(1)
+    db = sys.argv[3] if len(sys.argv) > 3 else "/Users/saraiva/Documents/IRB/klingo_irb.db"
+    busca = BuscaLocal(db)
+    for item in getattr(busca, sys.argv[1])(sys.argv[2]):
+        print(item)
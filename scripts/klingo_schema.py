@@ -0,0 +1,304 @@
+"""
+Inferência de schema para as tabelas extraídas da Klingo
+========================================================
+
+Compartilhado por `criar_banco_klingo.py` (SQLite) e `extrair_tudo_klingo.py`
+(PostgreSQL). Tipa todas as colunas numa única passada pelos registros,
+alargando o tipo quando os valores divergem:
+
+    BOOLEAN -> INTEGER -> BIGINT -> REAL -> TEXT
+
+Objetos e listas aninhados viram JSON: JSONB no Postgres (consultável com
+`->`, `->>`, `@>`) e texto JSON no SQLite (consultável com `json_extract`).
+Uma coluna que mistura aninhados e escalares fica JSON.
+
+Estruturas aninhadas conhecidas (`pacientes.show`, `atendimentos.show`,
+`medicos.index`) são projetadas em tabelas filhas com FK e índices, declaradas
+em PROJECTIONS; o que não está declarado continua como JSON.
+
+Uso:
+    schema = Schema.infer(registros)
+    cur.execute(schema.create_table_sql("pacientes", "sqlite"))
+    cur.executemany(schema.insert_sql("pacientes", "sqlite"), schema.rows(registros, "sqlite"))
+
+    for tabela, linhas in project(PROJECTIONS["pacientes"], pacientes).items():
+        schema = Schema.infer(linhas)
+        extra = PROJECTIONS["pacientes"].constraints(tabela, schema)
+        ...
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator
+
+BOOL = "bool"
+INT = "int"
+BIGINT = "bigint"
+REAL = "real"
+TEXT = "text"
+JSON = "json"
+
+# ordem de alargamento dos escalares; JSON absorve qualquer outro tipo
+_RANK = {BOOL: 0, INT: 1, BIGINT: 2, REAL: 3, TEXT: 4}
+_INT32 = 2**31 - 1
+
+DDL = {
+    "sqlite": {BOOL: "BOOLEAN", INT: "INTEGER", BIGINT: "INTEGER", REAL: "REAL", TEXT: "TEXT", JSON: "TEXT"},
+    "postgres": {BOOL: "BOOLEAN", INT: "INTEGER", BIGINT: "BIGINT", REAL: "DOUBLE PRECISION",
+                 TEXT: "TEXT", JSON: "JSONB"},
+}
+PLACEHOLDER = {"sqlite": "?", "postgres": "%s"}
+
+
+def _kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return BOOL
+    if isinstance(value, int):
+        return INT if -_INT32 - 1 <= value <= _INT32 else BIGINT
+    if isinstance(value, float):
+        return REAL
+    if isinstance(value, (dict, list)):
+        return JSON
+    return TEXT
+
+
+def widen(atual: str | None, novo: str) -> str:
+    """Menor tipo que comporta valores dos dois tipos."""
+    if atual is None or atual == novo:
+        return novo
+    if JSON in (atual, novo):
+        return JSON
+    return atual if _RANK[atual] >= _RANK[novo] else novo
+
+
+def to_json(value: Any) -> str:
+    return json.dumps(value, default=str, ensure_ascii=False)
+
+
+def _converter(kind: str, dialect: str) -> Callable[[Any], Any]:
+    if kind == JSON:
+        return lambda v: None if v is None else to_json(v)
+    if kind == TEXT:
+        return lambda v: v if v is None or isinstance(v, str) else (
+            to_json(v) if isinstance(v, (dict, list)) else str(v))
+    if kind == REAL:
+        return lambda v: None if v is None else float(v)
+    if kind in (INT, BIGINT):
+        return lambda v: int(v) if isinstance(v, bool) else v
+    # BOOL: SQLite guarda 0/1
+    if dialect == "sqlite":
+        return lambda v: None if v is None else int(v)
+    return lambda v: v
+
+
+class Schema:
+    """Colunas (ordenadas por nome) e tipo inferido de cada uma."""
+
+    def __init__(self, columns: dict[str, str]):
+        self.columns = dict(sorted(columns.items()))
+
+    @classmethod
+    def infer(cls, rows: Iterable[dict]) -> "Schema":
+        kinds: dict[str, str | None] = {}
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            for col, value in row.items():
+                if value is None:
+                    kinds.setdefault(col, None)
+                else:
+                    kinds[col] = widen(kinds.get(col), _kind(value))
+        return cls({col: kind or TEXT for col, kind in kinds.items()})
+
+    def __bool__(self) -> bool:
+        return bool(self.columns)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def column_defs(self, dialect: str) -> list[str]:
+        return [f'"{col}" {DDL[dialect][kind]}' for col, kind in self.columns.items()]
+
+    def create_table_sql(self, table: str, dialect: str, extra_sql: str = "") -> str:
+        return f'CREATE TABLE IF NOT EXISTS "{table}" ({", ".join(self.column_defs(dialect))}{extra_sql})'
+
+    def column_list(self) -> str:
+        return ", ".join(f'"{col}"' for col in self.columns)
+
+    def insert_sql(self, table: str, dialect: str) -> str:
+        placeholders = ", ".join(PLACEHOLDER[dialect] for _ in self.columns)
+        return f'INSERT INTO "{table}" ({self.column_list()}) VALUES ({placeholders})'
+
+    def rows(self, rows: Iterable[dict], dialect: str) -> Iterable[tuple]:
+        """Valores de cada registro na ordem das colunas, já convertidos ao tipo."""
+        converters = [(col, _converter(kind, dialect)) for col, kind in self.columns.items()]
+        for row in rows:
+            if isinstance(row, dict):
+                yield tuple(conv(row.get(col)) for col, conv in converters)
+
+
+# ============================================================
+# PROJEÇÃO RELACIONAL
+# ============================================================
+
+@dataclass(frozen=True)
+class Child:
+    """Campo aninhado explodido numa tabela filha.
+
+    `fk` recebe a chave do registro pai. `many` indica lista de objetos; sem
+    ele o campo é um objeto 1:1. `key` é a chave própria da filha, exigida
+    quando ela tem filhas (`children`).
+    """
+    field: str
+    table: str
+    fk: str
+    many: bool = False
+    key: str | None = None
+    children: tuple["Child", ...] = ()
+    indexes: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Tabela raiz, sua chave, filhas e objetos 1:1 achatados em colunas.
+
+    `inline` achata objetos de referência pequenos (ex.: `conselho`) como
+    colunas `<campo>__<coluna>` da própria tabela raiz.
+    """
+    table: str
+    key: str
+    children: tuple[Child, ...] = ()
+    inline: tuple[str, ...] = ()
+    indexes: tuple[str, ...] = ()
+
+    def tables(self) -> Iterator[tuple[str, str | None, str | None, str | None, tuple[str, ...]]]:
+        """(tabela, chave própria, tabela pai, coluna FK, índices), pais antes das filhas."""
+        yield self.table, self.key, None, None, self.indexes
+        stack = [(child, self.table) for child in self.children]
+        while stack:
+            child, parent = stack.pop(0)
+            yield child.table, child.key, parent, child.fk, child.indexes
+            stack.extend((grandchild, child.table) for grandchild in child.children)
+
+    def _parent_keys(self) -> dict[str, str]:
+        return {table: key for table, key, *_ in self.tables() if key}
+
+    def constraints(self, table: str, schema: Schema, prefix: str = "") -> str:
+        """UNIQUE da chave e FOREIGN KEY para o pai, como sufixo do CREATE TABLE."""
+        keys = self._parent_keys()
+        for name, key, parent, fk, _ in self.tables():
+            if name != table:
+                continue
+            sql = ""
+            if key and key in schema.columns:
+                sql += f', UNIQUE ("{key}")'
+            if parent and fk in schema.columns:
+                sql += f', FOREIGN KEY ("{fk}") REFERENCES "{prefix}{parent}" ("{keys[parent]}")'
+            return sql
+        return ""
+
+    def index_sql(self, table: str, schema: Schema, prefix: str = "") -> list[str]:
+        """Índices da FK e dos campos declarados que existem na tabela."""
+        for name, _, parent, fk, indexes in self.tables():
+            if name != table:
+                continue
+            cols = ((fk,) if parent else ()) + indexes
+            return [
+                f'CREATE INDEX IF NOT EXISTS "idx_{prefix}{table}_{col}" ON "{prefix}{table}" ("{col}")'
+                for col in cols if col in schema.columns
+            ]
+        return []
+
+
+def _explode(parents: list[tuple[Any, dict]], children: tuple[Child, ...], out: dict[str, list[dict]]) -> None:
+    """Move as filhas de cada (chave, linha) pai para `out`, um nível por vez.
+
+    Filhas repetidas (mesma `key`) ficam com a última versão, como a raiz em
+    `project`, antes de descer para as netas.
+    """
+    for child in children:
+        by_key: dict[Any, dict] = {}
+        without_key: list[dict] = []
+        for key, row in parents:
+            value = row.get(child.field)
+            if child.many:
+                items = value if isinstance(value, list) else None
+            else:
+                items = [value] if isinstance(value, dict) else None
+            # formato inesperado: o campo fica na tabela pai como JSON
+            if items is None or not all(isinstance(item, dict) for item in items):
+                continue
+            del row[child.field]
+            for item in items:
+                item = dict(item)
+                item[child.fk] = key
+                if child.key and item.get(child.key) is not None:
+                    by_key[item[child.key]] = item
+                else:
+                    without_key.append(item)
+        out[child.table].extend(list(by_key.values()) + without_key)
+        if child.children:
+            _explode(list(by_key.items()), child.children, out)
+
+
+def project(projection: Projection, rows: Iterable[dict]) -> dict[str, list[dict]]:
+    """Separa os registros da raiz nas linhas de cada tabela da projeção.
+
+    Registros repetidos da raiz (mesma chave) ficam com a última versão.
+    """
+    out: dict[str, list[dict]] = {table: [] for table, *_ in projection.tables()}
+    by_key: dict[Any, dict] = {}
+    without_key: list[dict] = []
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        row = dict(row)
+        for field in projection.inline:
+            value = row.get(field)
+            if isinstance(value, dict):
+                del row[field]
+                for col, v in value.items():
+                    row[f"{field}__{col}"] = v
+        key = row.get(projection.key)
+        if key is None:
+            without_key.append(row)
+        else:
+            by_key[key] = row
+    _explode(list(by_key.items()), projection.children, out)
+    out[projection.table] = list(by_key.values()) + without_key
+    return out
+
+
+PROJECTIONS = {
+    # pacientes.show
+    "pacientes": Projection(
+        table="pacientes",
+        key="id_pessoa",
+        children=(
+            Child("cadastro", "paciente_cadastros", fk="id_paciente", indexes=("st_cpf",)),
+            Child("paciente_unidade", "paciente_unidades", fk="id_paciente", indexes=("st_sus",)),
+        ),
+    ),
+    # atendimentos.show
+    "atendimentos": Projection(
+        table="atendimentos",
+        key="id_atendimento",
+        children=(
+            Child(
+                "atendimento_procedimento", "atendimento_procedimentos", fk="id_atendimento",
+                key="id_atendimento_procedimento",
+                children=(Child("anamnese", "anamneses", fk="id_atendimento_procedimento"),),
+            ),
+        ),
+    ),
+    # medicos.index
+    "medicos": Projection(
+        table="medicos",
+        key="id_pessoa",
+        children=(
+            Child("medico_especialidade", "medico_especialidades", fk="id_medico", many=True,
+                  indexes=("id_especialidade",)),
+        ),
+        inline=("conselho", "estado_conselho"),
+    ),
+}